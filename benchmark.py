@@ -0,0 +1,354 @@
+"""Reproducible benchmark of the stages of the recognition on synthetic stamped photos.
+
+Generates JPEG images with the camera stamp in the bottom left corner and the dictionary
+of block-level plots, then times decode, crop, OCR, matching and moving of each image.
+OCR runs with the stub backend by default, so the benchmark works offline without models.
+
+For example:
+    python benchmark.py --images 50 --plots 2000 --output bench_results.json
+    python benchmark.py --images 50 --plots 2000 --baseline bench_results.json
+"""
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from time import perf_counter
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.helpers_func import move_image_to_folder_block_level_plot
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+from helpers.ocr_backends import PaddleOcrBackend, StampTemplateOcrBackend
+from helpers.recognition import crop_region_of_interest, read_image_gray
+
+# Recognizes text on the region of interest of the image, the path is used only by the stub
+RecognizeRegion = Callable[[Path, NDArray[np.uint8]], list[str]]
+
+
+def generate_dict_block_level_plot(amount_plots: int, seed: int = 0) -> dict[str, tuple[str, ...]]:
+    """
+    The function generates the dictionary of block-level plots of the given size.
+
+    Args:
+        amount_plots (int): Amount of plots. For example: 2000
+
+        seed (int): Seed of the random generator. By default 0.
+
+    Returns:
+        dict_block_level_plot (dict[str, tuple[str, ...]]): The dictionary of block-level plots.
+            For example: {"C_L2_Plot_182": ("WC0218", "WC0219", "EDC0201")}
+    """
+    generator = random.Random(seed)
+    dict_block_level_plot: dict[str, tuple[str, ...]] = {}
+    for plot in range(1, amount_plots + 1):
+        block: str = "ABCDEFGH"[plot % 8]
+        level: int = plot % 12 + 1
+        window_names: tuple[str, ...] = tuple(
+            f"W{block}{level:02d}{generator.randint(0, 99):02d}" for _ in range(generator.randint(3, 9))
+        ) + (f"ED{block}{level:02d}{plot % 100:02d}",)
+        dict_block_level_plot[f"{block}_L{level}_Plot_{plot}"] = window_names
+    return dict_block_level_plot
+
+
+def get_stamp_lines(block_level_plot: str, window_name: str) -> list[str]:
+    """
+    The function returns the lines of the camera stamp of the image.
+
+    Args:
+        block_level_plot (str): Key of the dictionary. For example: "C_L2_Plot_182"
+
+        window_name (str): Window name. For example: "WC0214"
+
+    Returns:
+        stamp_lines (list[str]): Lines of the stamp from top to bottom.
+            For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04", ...]
+    """
+    block, level, _, plot = block_level_plot.split("_")[:4]
+    return [
+        f"{block} {level} {plot} {window_name[0].lower()}{window_name[1:]}",
+        "Time",
+        "Mon, 24/03/2025 16:04",
+        "Address",
+        "265 Burlington Road, New",
+        "Malden,KT3 4NE,England",
+        "Lat/Long",
+        "51.402211N.0.237727W",
+        "Company",
+        "LMB",
+    ]
+
+
+def generate_synthetic_image(
+    img_full_path: Path, stamp_lines: list[str], width: int = 3024, height: int = 4032, seed: int = 0
+) -> None:
+    """
+    The function generates the JPEG photo with the camera stamp in the bottom left corner.
+
+    Args:
+        img_full_path (Path): Path to the generated image.
+            For example: Path("bench/images/IMG_0001.JPG")
+
+        stamp_lines (list[str]): Lines of the stamp from top to bottom.
+            For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"]
+
+        width (int): Width of the image. By default 3024.
+
+        height (int): Height of the image. By default 4032.
+
+        seed (int): Seed of the random generator. By default 0.
+    """
+    generator = np.random.default_rng(seed)
+    # Smooth gradient with noise, so JPEG compresses it like a photo
+    gradient: NDArray[np.float32] = np.linspace(40, 200, width, dtype=np.float32)[None, :] + np.linspace(
+        0, 40, height, dtype=np.float32
+    )[:, None]
+    img: NDArray[np.uint8] = np.clip(
+        gradient[:, :, None] + generator.normal(0, 12, (height, width, 3)), 0, 255
+    ).astype(np.uint8)
+    line_height: int = max(height // 40, 20)
+    font_scale: float = line_height / 30
+    thickness: int = max(line_height // 12, 1)
+    y: int = height - line_height * len(stamp_lines)
+    for line in stamp_lines:
+        cv2.putText(img, line, (line_height, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), thickness + 3)
+        cv2.putText(img, line, (line_height, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255), thickness)
+        y += line_height
+    cv2.imwrite(str(img_full_path), img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+
+def generate_benchmark_data(
+    folder_benchmark: Path, amount_images: int, amount_plots: int, width: int, height: int, seed: int = 0
+) -> tuple[dict[str, tuple[str, ...]], dict[str, list[str]]]:
+    """
+    The function generates the dictionary of block-level plots and the images with stamps of its plots.
+
+    Args:
+        folder_benchmark (Path): Folder for the images. For example: Path("bench")
+
+        amount_images (int): Amount of images. For example: 50
+
+        amount_plots (int): Amount of plots in the dictionary. For example: 2000
+
+        width (int): Width of the images. For example: 3024
+
+        height (int): Height of the images. For example: 4032
+
+        seed (int): Seed of the random generator. By default 0.
+
+    Returns:
+        tuple[dict[str, tuple[str, ...]], dict[str, list[str]]]: The dictionary of block-level plots
+            and the lines of the stamp by the name of the image.
+            For example:
+                (
+                    {"C_L2_Plot_182": ("WC0218", "WC0219", "EDC0201")},
+                    {"IMG_0001.JPG": ["C L2 182 wC0218", "Time", "Mon, 24/03/2025 16:04"]},
+                )
+    """
+    generator = random.Random(seed)
+    dict_block_level_plot: dict[str, tuple[str, ...]] = generate_dict_block_level_plot(amount_plots, seed)
+    keys: list[str] = list(dict_block_level_plot)
+    stamp_lines_by_name: dict[str, list[str]] = {}
+    folder_images: Path = folder_benchmark / "images"
+    folder_images.mkdir(parents=True, exist_ok=True)
+    for index in range(amount_images):
+        key: str = generator.choice(keys)
+        # "C L2 182" - the stamp line which matches the key
+        stamp_lines: list[str] = get_stamp_lines(key, generator.choice(dict_block_level_plot[key]))
+        stamp_lines[0] = " ".join(stamp_lines[0].split()[:3])
+        name: str = f"IMG_{index:04d}.JPG"
+        generate_synthetic_image(folder_images / name, stamp_lines, width, height, seed + index)
+        stamp_lines_by_name[name] = stamp_lines
+    return dict_block_level_plot, stamp_lines_by_name
+
+
+def get_stub_ocr_backend(stamp_lines_by_name: dict[str, list[str]]) -> RecognizeRegion:
+    """
+    The function returns the OCR backend which returns the known stamp lines of the image without a model.
+
+    Args:
+        stamp_lines_by_name (dict[str, list[str]]): Lines of the stamp by the name of the image.
+            For example: {"IMG_0001.JPG": ["C L2 182", "Time", "Mon, 24/03/2025 16:04"]}
+
+    Returns:
+        RecognizeRegion: The stub OCR backend.
+    """
+
+    def recognize_stub(img_full_path: Path, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        return list(stamp_lines_by_name[img_full_path.name])
+
+    return recognize_stub
+
+
+def get_paddle_ocr_backend() -> RecognizeRegion:
+    """
+    The function returns the OCR backend with PaddleOCR.
+
+    Returns:
+        RecognizeRegion: The PaddleOCR backend.
+    """
+    from helpers.recognition import get_paddle_ocr
+
+    ocr_backend = PaddleOcrBackend(get_paddle_ocr())
+
+    def recognize_paddle(img_full_path: Path, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        return ocr_backend.recognize(coordinates_roi)
+
+    return recognize_paddle
+
+
+def get_stamp_ocr_backend() -> RecognizeRegion:
+    """
+    The function returns the OCR backend with the recognizer of the stamp font by templates,
+    created for the FONT_HERSHEY_SIMPLEX font of the generated images.
+
+    Returns:
+        RecognizeRegion: The stamp backend.
+    """
+    ocr_backend = StampTemplateOcrBackend.from_hershey_font()
+
+    def recognize_stamp(img_full_path: Path, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        return ocr_backend.recognize(coordinates_roi)
+
+    return recognize_stamp
+
+
+def run_benchmark(
+    folder_benchmark: Path,
+    dict_block_level_plot: dict[str, tuple[str, ...]],
+    ocr_backend: RecognizeRegion,
+    decode_scale: int = 1,
+) -> dict[str, object]:
+    """
+    The function times each stage of the recognition of the generated images.
+
+    Args:
+        folder_benchmark (Path): Folder with the generated images. For example: Path("bench")
+
+        dict_block_level_plot (dict[str, tuple[str, ...]]): The dictionary of block-level plots.
+
+        ocr_backend (RecognizeRegion): The OCR backend.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+    Returns:
+        results (dict[str, object]): Results of the benchmark.
+            For example:
+                {
+                    "images": 50,
+                    "matched": 50,
+                    "wall_time": 12.4,
+                    "images_per_second": 4.03,
+                    "stages": {"read_decode": {"count": 50, "sum": 9.1, ...}, ...},
+                }
+    """
+    metrics = StageMetrics()
+    with metrics.measure("build_matcher"):
+        matcher = BlockLevelPlotMatcher(dict_block_level_plot)
+    folder_images: Path = folder_benchmark / "images"
+    folder_target: Path = folder_benchmark / "folder_by_block_level_plot"
+    for key in dict_block_level_plot:
+        (folder_target / key).mkdir(parents=True, exist_ok=True)
+
+    img_full_paths: list[Path] = sorted(folder_images.iterdir())
+    amount_matched: int = 0
+    start_run: float = perf_counter()
+    for img_full_path in img_full_paths:
+        with metrics.measure("read_decode"):
+            img_gray: NDArray[np.uint8] = read_image_gray(img_full_path, decode_scale)
+        with metrics.measure("crop"):
+            coordinates_roi: NDArray[np.uint8] = crop_region_of_interest(img_gray, decode_scale)
+        with metrics.measure("ocr"):
+            recognized_text_list: list[str] = ocr_backend(img_full_path, coordinates_roi)
+        with metrics.measure("match"):
+            folder_name: str | bool = matcher.get_folder_name(recognized_text_list)
+        if folder_name and type(folder_name) is str:
+            amount_matched += 1
+            with metrics.measure("move"):
+                abs_path_folder = move_image_to_folder_block_level_plot(
+                    img_full_path, folder_name, str(folder_target)
+                )
+            # Move the image back, so the next run works with the same images
+            if abs_path_folder is not None:
+                shutil.move(abs_path_folder / img_full_path.name, img_full_path)
+    wall_time: float = perf_counter() - start_run
+    metrics.print_summary(len(img_full_paths), wall_time)
+
+    return {
+        "images": len(img_full_paths),
+        "matched": amount_matched,
+        "wall_time": wall_time,
+        "images_per_second": len(img_full_paths) / wall_time if wall_time > 0 else 0.0,
+        "stages": metrics.to_dict(),
+    }
+
+
+def compare_with_baseline(results: dict[str, object], baseline: dict[str, object]) -> None:
+    """
+    The function prints the mean duration of each stage compared with the baseline.
+
+    Args:
+        results (dict[str, object]): Results of the benchmark.
+
+        baseline (dict[str, object]): Saved results of the previous benchmark.
+    """
+    print(f"{'stage':<16}{'baseline ms':>14}{'current ms':>14}{'ratio':>10}")
+    for stage, stage_statistics in results["stages"].items():
+        baseline_statistics: dict[str, object] | None = baseline["stages"].get(stage)
+        current_mean: float = stage_statistics["mean"] * 1000
+        if baseline_statistics is None:
+            print(f"{stage:<16}{'-':>14}{current_mean:>14.2f}{'-':>10}")
+            continue
+        baseline_mean: float = baseline_statistics["mean"] * 1000
+        ratio: float = current_mean / baseline_mean if baseline_mean > 0 else float("inf")
+        print(f"{stage:<16}{baseline_mean:>14.2f}{current_mean:>14.2f}{ratio:>10.2f}")
+    print(f"images/sec: baseline {baseline['images_per_second']:.2f}, current {results['images_per_second']:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the recognition on synthetic stamped photos")
+    parser.add_argument("--images", type=int, default=20, help="Amount of generated images")
+    parser.add_argument("--plots", type=int, default=1000, help="Amount of plots in the generated dictionary")
+    parser.add_argument("--width", type=int, default=3024, help="Width of the generated images")
+    parser.add_argument("--height", type=int, default=4032, help="Height of the generated images")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+    parser.add_argument("--decode-scale", type=int, choices=(1, 2, 4, 8), default=1)
+    parser.add_argument("--ocr", choices=("stub", "stamp", "paddle"), default="stub", help="OCR backend")
+    parser.add_argument("--output", type=Path, default=None, help="Path to save the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="Path to the results to compare with")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="recognize_benchmark_") as folder_temporary:
+        folder_benchmark = Path(folder_temporary)
+        dict_block_level_plot, stamp_lines_by_name = generate_benchmark_data(
+            folder_benchmark, arguments.images, arguments.plots, arguments.width, arguments.height, arguments.seed
+        )
+        ocr_backend: RecognizeRegion
+        if arguments.ocr == "stub":
+            ocr_backend = get_stub_ocr_backend(stamp_lines_by_name)
+        elif arguments.ocr == "stamp":
+            ocr_backend = get_stamp_ocr_backend()
+        else:
+            ocr_backend = get_paddle_ocr_backend()
+        results: dict[str, object] = run_benchmark(
+            folder_benchmark, dict_block_level_plot, ocr_backend, arguments.decode_scale
+        )
+    results["parameters"] = {key: str(value) for key, value in vars(arguments).items()}
+
+    print(f"Matched images: {results['matched']} of {results['images']}")
+    if arguments.baseline is not None:
+        with open(arguments.baseline, "r", encoding="utf-8") as file:
+            compare_with_baseline(results, json.load(file))
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""The module contains the adaptive region of interest which grows until the stamp matches the dictionary"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+from helpers.ocr_backends import OcrBackend, recognize_until_match
+from helpers.recognition import read_image_gray
+
+# Width and height of the region of interest in the bottom left corner as parts of the image size,
+# from the small corner to the fixed 1900x1800 block of the 3024x4032 photo, which is not exceeded.
+ROI_EXPANSION_STEPS: tuple[tuple[float, float], ...] = (
+    (0.35, 0.2),
+    (0.5, 0.3),
+    (0.63, 0.45),
+)
+# Images of a resolution start from the smallest step which matched at least this part of its attempts
+MIN_STEP_SUCCESS_RATE: float = 0.9
+# Attempts of the step before its success rate is trusted, until then the images start from this step
+MIN_STEP_ATTEMPTS: int = 10
+# The counts of the step are halved after this amount of attempts, so the recent images weigh more
+MAX_STEP_ATTEMPTS: int = 20
+# Every this image of a resolution starts one step below the learned step, so a smaller step is tried again,
+# and while these probes match, the next images start from the step below too
+PROBE_INTERVAL: int = 20
+
+
+def get_resolution_key(img_gray: NDArray[np.uint8], decode_scale: int = 1) -> str:
+    """
+    The function returns the key of the camera resolution of the image.
+
+    Args:
+        img_gray (NDArray[np.uint8]): The image in grayscale.
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(4032, 3024), dtype=uint8)
+
+        decode_scale (int): Scale of the reduced decoding of the image. By default 1.
+
+    Returns:
+        resolution_key (str): Width x height at full resolution. For example: '3024x4032'
+    """
+    return f"{img_gray.shape[1] * decode_scale}x{img_gray.shape[0] * decode_scale}"
+
+
+def crop_corner_region(img_gray: NDArray[np.uint8], width_ratio: float, height_ratio: float) -> NDArray[np.uint8]:
+    """
+    The function crops the bottom left corner of the image by parts of its size.
+
+    Args:
+        img_gray (NDArray[np.uint8]): The image in grayscale.
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(4032, 3024), dtype=uint8)
+
+        width_ratio (float): Width of the corner as a part of the image width. For example: 0.35
+
+        height_ratio (float): Height of the corner as a part of the image height. For example: 0.2
+
+    Returns:
+        roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(806, 1058), dtype=uint8)
+    """
+    img_height, img_width = img_gray.shape[:2]
+    height_block_for_recognition: int = max(int(img_height * height_ratio), 1)
+    width_block_for_recognition: int = max(int(img_width * width_ratio), 1)
+    return img_gray[img_height - height_block_for_recognition:img_height, 0:width_block_for_recognition]
+
+
+class RoiPresets:
+    """
+    Statistics of the steps of ROI_EXPANSION_STEPS by the camera resolution: how many images were
+    recognized on the step and how many of them matched the dictionary, saved to the JSON file.
+    Images of the same camera start from the smallest step which matches MIN_STEP_SUCCESS_RATE of images,
+    so one image with the stamp out of the small corner does not move the start of all next images,
+    and every PROBE_INTERVAL image probes the step below, so the start moves back when its success rate recovers.
+
+    Args:
+        path_to_presets (Path): Relative or absolute path to the JSON file.
+            For example: Path("info/roi_presets.json")
+
+    Values:
+        statistics_by_resolution (dict[str, dict[str, list[float]]]): Resolution -> attempts and matches
+            of each step in ROI_EXPANSION_STEPS.
+            For example: {"3024x4032": {"attempts": [10.0, 0.0, 3.0], "matches": [9.0, 0.0, 3.0]}}
+
+        amount_images_by_resolution (dict[str, int]): Resolution -> images of the run, to probe the step below.
+            For example: {"3024x4032": 13}
+
+        is_probe_matched_by_resolution (dict[str, bool]): Resolution -> the last probe of the step below matched.
+            For example: {"3024x4032": True}
+    """
+
+    def __init__(self, path_to_presets: Path) -> None:
+        self.path_to_presets = path_to_presets
+        self.statistics_by_resolution: dict[str, dict[str, list[float]]] = {}
+        if path_to_presets.exists():
+            with open(path_to_presets, "r", encoding="utf-8") as file:
+                presets: dict[str, object] = json.load(file)
+            # Presets of the previous format kept only the last step, they are learned again
+            self.statistics_by_resolution = {
+                resolution_key: statistics
+                for resolution_key, statistics in presets.items()
+                if isinstance(statistics, dict)
+                and len(statistics.get("attempts", [])) == len(ROI_EXPANSION_STEPS)
+                and len(statistics.get("matches", [])) == len(ROI_EXPANSION_STEPS)
+            }
+        self.amount_images_by_resolution: dict[str, int] = {}
+        self.is_probe_matched_by_resolution: dict[str, bool] = {}
+
+    def get_learned_step(self, resolution_key: str) -> int:
+        """
+        Returns the smallest step which matches MIN_STEP_SUCCESS_RATE of images of the resolution.
+
+        Args:
+            resolution_key (str): For example: '3024x4032'
+
+        Returns:
+            int: Index of the step in ROI_EXPANSION_STEPS, 0 for an unknown resolution. For example: 0
+        """
+        statistics: dict[str, list[float]] | None = self.statistics_by_resolution.get(resolution_key)
+        if statistics is None:
+            return 0
+        for step, (attempts, matches) in enumerate(zip(statistics["attempts"], statistics["matches"])):
+            if attempts < MIN_STEP_ATTEMPTS or matches >= MIN_STEP_SUCCESS_RATE * attempts:
+                return step
+        return len(ROI_EXPANSION_STEPS) - 1
+
+    def get_step(self, resolution_key: str) -> int:
+        """
+        Returns the step to start the next image of the resolution from: the learned step,
+        or the step below it for every PROBE_INTERVAL image and after the probe which matched.
+
+        Args:
+            resolution_key (str): For example: '3024x4032'
+
+        Returns:
+            int: Index of the step in ROI_EXPANSION_STEPS. For example: 1
+        """
+        amount_images: int = self.amount_images_by_resolution.get(resolution_key, 0) + 1
+        self.amount_images_by_resolution[resolution_key] = amount_images
+        learned_step: int = self.get_learned_step(resolution_key)
+        is_probe: bool = amount_images % PROBE_INTERVAL == 0 or self.is_probe_matched_by_resolution.get(
+            resolution_key, False
+        )
+        if learned_step > 0 and is_probe:
+            return learned_step - 1
+        return learned_step
+
+    def learn(self, resolution_key: str, step: int, is_matched: bool) -> None:
+        """
+        Counts the attempt of the step for the resolution and saves the file if the start step changed.
+
+        Args:
+            resolution_key (str): For example: '3024x4032'
+
+            step (int): Index of the step in ROI_EXPANSION_STEPS. For example: 1
+
+            is_matched (bool): The text of the step matched the dictionary. For example: True
+        """
+        start_step: int = self.get_learned_step(resolution_key)
+        if step == start_step - 1:
+            self.is_probe_matched_by_resolution[resolution_key] = is_matched
+        statistics: dict[str, list[float]] = self.statistics_by_resolution.setdefault(
+            resolution_key,
+            {"attempts": [0.0] * len(ROI_EXPANSION_STEPS), "matches": [0.0] * len(ROI_EXPANSION_STEPS)},
+        )
+        statistics["attempts"][step] += 1
+        statistics["matches"][step] += float(is_matched)
+        if statistics["attempts"][step] > MAX_STEP_ATTEMPTS:
+            statistics["attempts"][step] /= 2
+            statistics["matches"][step] /= 2
+        if self.get_learned_step(resolution_key) != start_step:
+            self.save()
+
+    def save(self) -> None:
+        """
+        Saves the statistics to the JSON file.
+        """
+        # Write to the temporary file and replace, so a broken file is never read
+        path_to_temporary_presets: Path = self.path_to_presets.with_name(self.path_to_presets.name + ".tmp")
+        with open(path_to_temporary_presets, "w", encoding="utf-8") as file:
+            json.dump(self.statistics_by_resolution, file, indent=4)
+        path_to_temporary_presets.replace(self.path_to_presets)
+
+
+def recognize_image_with_adaptive_roi(
+    ocr_backend: OcrBackend,
+    img_full_path: Path,
+    matcher: BlockLevelPlotMatcher,
+    roi_presets: RoiPresets,
+    metrics: StageMetrics,
+    decode_scale: int = 1,
+    early_exit: bool = False,
+) -> list[str]:
+    """Function to recognize text on the bottom left corner of the image. Starts from the step learned
+    for the resolution of the image, and if the text does not match the dictionary, recognizes
+    the last step of ROI_EXPANSION_STEPS, the fixed block of recognize_text_from_image.
+    So the image is recognized at most twice, and never on a region larger than the fixed block.
+
+    Args:
+        ocr_backend (OcrBackend): The OCR backend. For example: PaddleOcrBackend
+
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        roi_presets (RoiPresets): Learned steps by the camera resolution.
+
+        metrics (StageMetrics): Metrics to record the durations of the stages.
+
+        decode_scale (int, optional): Decode the image with the resolution reduced by 1, 2, 4 or 8 times.
+            Defaults to 1.
+
+        early_exit (bool, optional): Stop the recognition at the first line which matches the dictionary.
+            Defaults to False.
+
+    Returns:
+        recognized_text_list (list[str]): Recognized text of the matched corner, or of the last step
+            if no corner matched. For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"]
+    """
+    with metrics.measure("read_decode"):
+        img_gray: NDArray[np.uint8] = read_image_gray(img_full_path, decode_scale)
+    # '3024x4032'
+    resolution_key: str = get_resolution_key(img_gray, decode_scale)
+    recognized_text_list: list[str] = []
+    # The learned step and the fixed block, once if the learned step is the last one
+    for step in dict.fromkeys((roi_presets.get_step(resolution_key), len(ROI_EXPANSION_STEPS) - 1)):
+        width_ratio, height_ratio = ROI_EXPANSION_STEPS[step]
+        with metrics.measure("crop"):
+            coordinates_roi: NDArray[np.uint8] = crop_corner_region(img_gray, width_ratio, height_ratio)
+        with metrics.measure("ocr"):
+            recognized_text_list = (
+                recognize_until_match(ocr_backend, coordinates_roi, matcher)
+                if early_exit
+                else ocr_backend.recognize(coordinates_roi)
+            )
+        is_matched: bool = bool(matcher.get_folder_name(recognized_text_list))
+        roi_presets.learn(resolution_key, step, is_matched)
+        if is_matched:
+            break
+        print(f"No match in the corner {width_ratio:.0%} x {height_ratio:.0%} of {img_full_path.name}")
+    return recognized_text_list
@@ -1,4 +1,7 @@
+import argparse
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from pprint import pprint
 
@@ -61,8 +64,129 @@ def remove_all_images_to_one_folder(
             remove_all_images_to_one_folder(path_obj, path_target_folder)
 
 
+def get_flatten_plan(
+    path_src_folder: Path,
+    path_target_folder: Path,
+    format_image: str = ".jpg",
+) -> list[tuple[Path, Path, bool]]:
+    """
+    The function walks the folder path_src_folder with all folders inside once and plans the target names
+    of the images in path_target_folder. Names taken by files of the target folder or by planned images
+    get the suffix "_copy1", "_copy2" and so on, the next number of each name is kept in memory,
+    so the names are not checked on disk.
+
+    Args:
+        path_src_folder (Path): Absolute path to the folder with folders and images inside folders.
+
+        path_target_folder (Path): Absolute path to the target folder.
+
+        format_image (str): Format of image file. By default ".jpg".
+
+    Returns:
+        plan (list[tuple[Path, Path, bool]]): The image, its target path and True if the image is
+            on the file system of the target folder, so it is moved by os.rename.
+            For example:
+                [
+                    (
+                        WindowsPath('D:/recognize_images/images_in_folders/Pictures/AEGO8215.JPG'),
+                        WindowsPath('D:/recognize_images/images_to_recognize/AEGO8215_copy1.JPG'),
+                        True,
+                    )
+                ]
+    """
+    target_device: int = os.stat(path_target_folder).st_dev
+    # Names are compared in lower case, as Windows does not distinguish "AEGO8215.JPG" and "aego8215.jpg"
+    with os.scandir(path_target_folder) as entries:
+        taken_names: set[str] = {entry.name.lower() for entry in entries}
+    # Name in lower case -> the next number of "_copy"
+    next_copy_numbers: dict[str, int] = {}
+    plan: list[tuple[Path, Path, bool]] = []
+    for dir_path, dir_names, file_names in os.walk(path_src_folder):
+        # The target folder inside the source folder is not walked
+        dir_names[:] = [dir_name for dir_name in dir_names if Path(dir_path, dir_name) != path_target_folder]
+        is_same_device: bool = os.stat(dir_path).st_dev == target_device
+        for file_name in file_names:
+            path_obj = Path(dir_path, file_name)
+            if path_obj.suffix.lower() != format_image.lower():
+                continue
+            target_name: str = file_name
+            if target_name.lower() in taken_names:
+                copy_number: int = next_copy_numbers.get(file_name.lower(), 1)
+                while f"{path_obj.stem}_copy{copy_number}{path_obj.suffix}".lower() in taken_names:
+                    copy_number += 1
+                next_copy_numbers[file_name.lower()] = copy_number + 1
+                target_name = f"{path_obj.stem}_copy{copy_number}{path_obj.suffix}"
+            taken_names.add(target_name.lower())
+            plan.append((path_obj, path_target_folder / target_name, is_same_device))
+    return plan
+
+
+def move_planned_image(path_obj: Path, target_file: Path, is_same_device: bool) -> None:
+    """
+    The function moves the image by os.rename on the same file system, otherwise copies and removes it.
+
+    Args:
+        path_obj (Path): The image.
+
+        target_file (Path): The target path of the image.
+
+        is_same_device (bool): The image is on the file system of the target folder.
+    """
+    if is_same_device:
+        os.rename(path_obj, target_file)
+    else:
+        shutil.move(str(path_obj), str(target_file))
+
+
+def flatten_images_to_one_folder(
+    path_src_folder: Path,
+    path_target_folder: Path,
+    format_image: str = ".jpg",
+    max_workers: int = 8,
+) -> int:
+    """
+    Функция переносит все изображения из папки path_src_folder и всех папок внутри неё в папку path_target_folder
+    за один проход по дереву папок, как remove_all_images_to_one_folder.
+    Target names are planned in memory by get_flatten_plan and the images are moved by the thread pool.
+
+    Args:
+        path_src_folder (Path): Relative or absolute path to the folder with folders and images inside folders.
+
+        path_target_folder (Path): Relative or absolute path to the target folder.
+
+        format_image (str): Format of image file. By default ".jpg".
+
+        max_workers (int): Amount of threads which move the images. By default 8.
+
+    Returns:
+        int: Amount of moved images. For example: 120000
+    """
+    path_src_folder = path_src_folder.resolve()
+    path_target_folder = path_target_folder.resolve()
+    path_target_folder.mkdir(parents=True, exist_ok=True)
+
+    plan: list[tuple[Path, Path, bool]] = get_flatten_plan(path_src_folder, path_target_folder, format_image)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # list() re-raises the first error of the moves
+        list(executor.map(lambda planned_move: move_planned_image(*planned_move), plan))
+
+    amount_renamed: int = sum(path_obj.name != target_file.name for path_obj, target_file, _ in plan)
+    print(f"Moved images: {len(plan)}, renamed with '_copy': {amount_renamed}")
+    return len(plan)
+
+
 if __name__ == '__main__':
-    remove_all_images_to_one_folder(
-        path_src_folder=Path("images_in_folders"),
-        path_target_folder=Path("images_to_recognize"),
+    parser = argparse.ArgumentParser(description="Move images from all folders to one folder")
+    parser.add_argument("--src", type=Path, default=Path("images_in_folders"))
+    parser.add_argument("--target", type=Path, default=Path("images_to_recognize"))
+    parser.add_argument(
+        "--per-folder",
+        action="store_true",
+        help="Move the images folder by folder and print every path, as before",
     )
+    parser.add_argument("--workers", type=int, default=8, help="Amount of threads which move the images")
+    arguments = parser.parse_args()
+    if arguments.per_folder:
+        remove_all_images_to_one_folder(path_src_folder=arguments.src, path_target_folder=arguments.target)
+    else:
+        flatten_images_to_one_folder(arguments.src, arguments.target, max_workers=arguments.workers)
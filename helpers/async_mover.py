@@ -0,0 +1,201 @@
+"""The module contains the mover which moves recognized images in background threads while OCR goes on"""
+
+import os
+import shutil
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+# Size of the chunk of the parallel copy between file systems
+COPY_CHUNK_SIZE: int = 8 * 1024 * 1024
+
+
+def copy_file_chunk(path_src_file: Path, path_target_file: Path, offset: int, chunk_size: int) -> None:
+    """
+    The function copies one chunk of the file to the same offset of the target file.
+
+    Args:
+        path_src_file (Path): The file to copy.
+
+        path_target_file (Path): The target file of the size of the source file.
+
+        offset (int): Offset of the chunk in bytes. For example: 8388608
+
+        chunk_size (int): Size of the chunk in bytes. For example: 8388608
+    """
+    with open(path_src_file, "rb") as src_file, open(path_target_file, "r+b") as target_file:
+        src_file.seek(offset)
+        target_file.seek(offset)
+        target_file.write(src_file.read(chunk_size))
+
+
+def copy_file_in_chunks(
+    path_src_file: Path,
+    path_target_file: Path,
+    executor: ThreadPoolExecutor,
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> None:
+    """
+    The function copies the file by chunks in parallel, so several requests to the network share
+    are in flight at the same time. Files of one chunk are copied by shutil.copyfile.
+
+    Args:
+        path_src_file (Path): The file to copy.
+            For example: WindowsPath('D:/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        path_target_file (Path): The target file.
+            For example: WindowsPath('Z:/folder_by_block_level_plot/C_L2_Plot_182/AADC5918.JPG')
+
+        executor (ThreadPoolExecutor): Threads which copy the chunks.
+
+        chunk_size (int): Size of the chunk in bytes. By default COPY_CHUNK_SIZE.
+    """
+    file_size: int = os.stat(path_src_file).st_size
+    if file_size <= chunk_size:
+        shutil.copyfile(path_src_file, path_target_file)
+    else:
+        with open(path_target_file, "wb") as target_file:
+            target_file.truncate(file_size)
+        # list() re-raises the first error of the chunks
+        list(
+            executor.map(
+                lambda offset: copy_file_chunk(path_src_file, path_target_file, offset, chunk_size),
+                range(0, file_size, chunk_size),
+            )
+        )
+    shutil.copystat(path_src_file, path_target_file)
+
+
+class AsyncImageMover:
+    """
+    Mover of recognized images to the folders of their block-level plots in background threads.
+    The folders of the keys of the dictionary are created or checked once at start, instead of
+    the check of the folder for every image. An image is moved by os.rename on the same file system,
+    otherwise it is copied by chunks in parallel to the temporary file, renamed and removed from the source.
+    At most max_pending images wait for moving, submit() blocks when the limit is reached.
+
+    Args:
+        keys (Iterable[str]): Keys of the dictionary of block-level plots.
+            For example: ["C_L2_Plot_182", "A_L1_Plot_101"]
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        create_folders (bool): Create missing folders of the keys. By default False: as
+            move_image_to_folder_block_level_plot, images of keys without a folder are not moved.
+
+        max_workers (int): Amount of threads which move images. By default 4.
+
+        max_pending (int): Max amount of images waiting for moving. By default 32.
+
+        copy_threads (int): Amount of threads which copy chunks of files between file systems. By default 4.
+
+    Values:
+        target_folders (dict[str, Path]): Key -> existing folder of the key.
+            For example:
+                {"C_L2_Plot_182": WindowsPath('D:/recognize_images/folder_by_block_level_plot/C_L2_Plot_182')}
+
+        amount_moved (int): Amount of moved images.
+
+        amount_errors (int): Amount of images which were not moved because of an error.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+        create_folders: bool = False,
+        max_workers: int = 4,
+        max_pending: int = 32,
+        copy_threads: int = 4,
+    ) -> None:
+        # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/folder_by_block_level_plot')
+        path_target_folders: Path = Path().cwd() / folder_with_target_folders_by_location_apartments
+        if create_folders:
+            for key in keys:
+                (path_target_folders / key).mkdir(parents=True, exist_ok=True)
+        existing_folder_names: set[str] = set()
+        if path_target_folders.is_dir():
+            with os.scandir(path_target_folders) as entries:
+                existing_folder_names = {entry.name for entry in entries if entry.is_dir()}
+        self.target_folders: dict[str, Path] = {
+            key: path_target_folders / key for key in keys if key in existing_folder_names
+        }
+        self.target_device: int | None = (
+            os.stat(path_target_folders).st_dev if path_target_folders.is_dir() else None
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.copy_executor = ThreadPoolExecutor(max_workers=copy_threads)
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.amount_moved: int = 0
+        self.amount_errors: int = 0
+
+    def move(self, img_full_path: Path, abs_path_folder_block_level_plot: Path) -> None:
+        """
+        Moves the image to the folder, runs in a thread of the mover.
+
+        Args:
+            img_full_path (Path): Abs path to the image
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+            abs_path_folder_block_level_plot (Path): The existing folder of the block-level plot.
+                WindowsPath('D:/recognize_images/folder_by_block_level_plot/A_L2_Plot_11')
+        """
+        path_target_file: Path = abs_path_folder_block_level_plot / img_full_path.name
+        try:
+            # As shutil.move to the folder, the image does not replace the image with the same name
+            if path_target_file.exists():
+                raise FileExistsError(f"Destination path '{path_target_file}' already exists")
+            if os.stat(img_full_path).st_dev == self.target_device:
+                os.rename(img_full_path, path_target_file)
+            else:
+                path_temporary_file: Path = path_target_file.with_name(path_target_file.name + ".tmp")
+                try:
+                    copy_file_in_chunks(img_full_path, path_temporary_file, self.copy_executor)
+                    os.replace(path_temporary_file, path_target_file)
+                except BaseException:
+                    # The partly copied file is not left in the folder of the block-level plot
+                    path_temporary_file.unlink(missing_ok=True)
+                    raise
+                img_full_path.unlink()
+        except OSError as error:
+            print(f"Error of moving image: {img_full_path}: {error}")
+            with self.lock:
+                self.amount_errors += 1
+            return
+        print(f"Move image: {img_full_path} to folder: {abs_path_folder_block_level_plot}")
+        with self.lock:
+            self.amount_moved += 1
+
+    def submit(self, img_full_path: Path, folder_name_to_remove_image: str) -> Path | None:
+        """
+        Puts the image to the queue of moves, blocks while max_pending images are waiting.
+
+        Args:
+            img_full_path (Path): Abs path to the image
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+            folder_name_to_remove_image (str): The name of the block-level plot folder.
+                For example: 'A_L2_Plot_11'
+
+        Returns:
+            abs_path_folder_block_level_plot (Path | None): The folder the image will be moved to
+                or None if the folder does not exist.
+        """
+        abs_path_folder_block_level_plot: Path | None = self.target_folders.get(folder_name_to_remove_image)
+        if abs_path_folder_block_level_plot is None:
+            return None
+        self.pending.acquire()
+        future: Future = self.executor.submit(self.move, img_full_path, abs_path_folder_block_level_plot)
+        future.add_done_callback(lambda _: self.pending.release())
+        return abs_path_folder_block_level_plot
+
+    def close(self) -> None:
+        """
+        Waits for the moves of all submitted images and stops the threads.
+        """
+        self.executor.shutdown(wait=True)
+        self.copy_executor.shutdown(wait=True)
+        print(f"Moved images in background: {self.amount_moved}, errors: {self.amount_errors}")
@@ -0,0 +1,255 @@
+"""The module contains the reading of regions of interest into reusable buffers with bounded memory"""
+
+import os
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+from helpers.ocr_backends import OcrBackend, PaddleOcrBackend, recognize_until_match
+from helpers.recognition import (
+    HEIGHT_BLOCK_FOR_RECOGNITION,
+    IMREAD_GRAYSCALE_BY_DECODE_SCALE,
+    WIDTH_BLOCK_FOR_RECOGNITION,
+    ImageReadError,
+    crop_region_of_interest,
+    get_text_crops_from_roi,
+    recognize_text_crops,
+)
+
+try:
+    import resource
+except ImportError:
+    # The module is only on Unix, on Windows the peak memory of the process is not reported
+    resource = None
+
+# Markers of the JPEG segments with the size of the frame: SOF0 - SOF15 without DHT, JPG and DAC
+JPEG_START_OF_FRAME_MARKERS: frozenset[int] = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def get_jpeg_size(data: memoryview) -> tuple[int, int] | None:
+    """
+    The function reads the width and the height of the JPEG image from its header without decoding.
+
+    Args:
+        data (memoryview): Bytes of the JPEG file.
+
+    Returns:
+        tuple[int, int] | None: Width and height, None if the data is not JPEG or has no frame header.
+            For example: (3024, 4032)
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+    offset: int = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker: int = data[offset + 1]
+        # Fill bytes before the marker
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in JPEG_START_OF_FRAME_MARKERS:
+            height: int = int.from_bytes(data[offset + 5:offset + 7], "big")
+            width: int = int.from_bytes(data[offset + 7:offset + 9], "big")
+            return width, height
+        offset += 2 + int.from_bytes(data[offset + 2:offset + 4], "big")
+    return None
+
+
+def get_peak_memory_bytes() -> int | None:
+    """
+    The function returns the peak resident memory of the process.
+
+    Returns:
+        int | None: Peak memory in bytes, None on Windows. For example: 734003200
+    """
+    if resource is None:
+        return None
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class RoiBufferPool:
+    """
+    Reader of the regions of interest which reuses its buffers between images. The file is read
+    into the reusable byte buffer, decoded, and only the region of interest is copied into the reusable
+    contiguous array, so the decoded frame is released right after the copy and is not pinned by a view.
+    If the frame of the image with decode_scale is larger than max_frame_bytes, the image is decoded
+    with the next reduced scale, so the memory of the frame is capped for any camera resolution.
+    cv2.imdecode of the Python binding has no output array, so the frame itself is still allocated by OpenCV
+    for each image, the pool bounds its size and keeps only the region of interest.
+
+    Args:
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        max_frame_bytes (int | None): Max size of the decoded grayscale frame in bytes. By default None - no cap.
+            For example: 8 * 1024 * 1024
+
+        file_buffer_size (int): Initial size of the buffer of the file in bytes. By default 16 MB.
+
+    Values:
+        roi_buffer (NDArray[np.uint8]): Contiguous buffer of the region of interest of the full block.
+            For example: array([...], shape=(3420000,), dtype=uint8)
+
+        peak_frame_bytes (int): Size of the largest decoded frame. For example: 12192768
+
+        amount_reduced (int): Amount of images decoded with a larger scale because of max_frame_bytes.
+
+        last_decode_scale (int): The scale of decoding of the last read image. For example: 4
+    """
+
+    def __init__(
+        self, decode_scale: int = 1, max_frame_bytes: int | None = None, file_buffer_size: int = 16 * 1024 * 1024
+    ) -> None:
+        if decode_scale not in IMREAD_GRAYSCALE_BY_DECODE_SCALE:
+            raise ValueError(
+                f"decode_scale must be one of {tuple(IMREAD_GRAYSCALE_BY_DECODE_SCALE)}, not {decode_scale}"
+            )
+        self.decode_scale = decode_scale
+        self.max_frame_bytes = max_frame_bytes
+        self.file_buffer = bytearray(file_buffer_size)
+        self.roi_buffer: NDArray[np.uint8] = np.empty(
+            (HEIGHT_BLOCK_FOR_RECOGNITION // decode_scale) * (WIDTH_BLOCK_FOR_RECOGNITION // decode_scale),
+            dtype=np.uint8,
+        )
+        self.peak_frame_bytes: int = 0
+        self.amount_reduced: int = 0
+        self.last_decode_scale: int = decode_scale
+
+    def get_decode_scale(self, image_size: tuple[int, int] | None) -> int:
+        """
+        Chooses the smallest scale not less than decode_scale whose frame fits into max_frame_bytes.
+
+        Args:
+            image_size (tuple[int, int] | None): Width and height of the image from the header.
+                For example: (3024, 4032)
+
+        Returns:
+            int: The scale of decoding. For example: 2
+        """
+        if self.max_frame_bytes is None or image_size is None:
+            return self.decode_scale
+        width, height = image_size
+        for decode_scale in IMREAD_GRAYSCALE_BY_DECODE_SCALE:
+            if decode_scale < self.decode_scale:
+                continue
+            if -(-width // decode_scale) * -(-height // decode_scale) <= self.max_frame_bytes:
+                return decode_scale
+        return max(IMREAD_GRAYSCALE_BY_DECODE_SCALE)
+
+    def read_region_of_interest(self, img_full_path: Path) -> NDArray[np.uint8]:
+        """
+        Reads the region of interest of the image into the buffer of the pool.
+        The returned array is a view of the buffer, it is valid until the next call.
+
+        Args:
+            img_full_path (Path): Abs path to the image
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        Raises:
+            ImageReadError: If the image can not be read.
+
+        Returns:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+                For example:
+                    array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+        """
+        try:
+            with open(img_full_path, "rb", buffering=0) as file:
+                file_size: int = os.fstat(file.fileno()).st_size
+                if file_size > len(self.file_buffer):
+                    self.file_buffer = bytearray(file_size)
+                amount_read: int = file.readinto(memoryview(self.file_buffer)[:file_size])
+        except OSError as error:
+            raise ImageReadError(f"Image can not be read: {img_full_path}: {error}") from error
+        file_data: memoryview = memoryview(self.file_buffer)[:amount_read]
+
+        decode_scale: int = self.get_decode_scale(get_jpeg_size(file_data))
+        self.last_decode_scale = decode_scale
+        if decode_scale != self.decode_scale:
+            self.amount_reduced += 1
+        img_gray: NDArray[np.uint8] | None = cv2.imdecode(
+            np.frombuffer(file_data, dtype=np.uint8), IMREAD_GRAYSCALE_BY_DECODE_SCALE[decode_scale]
+        )
+        if img_gray is None:
+            raise ImageReadError(f"Image can not be read: {img_full_path}")
+        self.peak_frame_bytes = max(self.peak_frame_bytes, img_gray.nbytes)
+
+        roi_view: NDArray[np.uint8] = crop_region_of_interest(img_gray, decode_scale)
+        coordinates_roi: NDArray[np.uint8] = self.roi_buffer[:roi_view.size].reshape(roi_view.shape)
+        np.copyto(coordinates_roi, roi_view)
+        # The frame is released here, the region of interest does not reference it
+        del img_gray, roi_view
+        return coordinates_roi
+
+    def print_summary(self) -> None:
+        """
+        Prints the memory of the buffers and the peak memory of the process.
+        """
+        megabyte: int = 1024 * 1024
+        print(
+            f"Buffer pool: file buffer {len(self.file_buffer) / megabyte:.1f} MB, "
+            f"ROI buffer {self.roi_buffer.nbytes / megabyte:.1f} MB, "
+            f"peak frame {self.peak_frame_bytes / megabyte:.1f} MB, "
+            f"images decoded with a reduced scale by the cap: {self.amount_reduced}"
+        )
+        peak_memory_bytes: int | None = get_peak_memory_bytes()
+        if peak_memory_bytes is not None:
+            print(f"Peak memory of the process: {peak_memory_bytes / megabyte:.1f} MB")
+
+
+def recognize_image_with_buffer_pool(
+    buffer_pool: RoiBufferPool,
+    paddle_backend: PaddleOcrBackend,
+    img_full_path: Path,
+    metrics: StageMetrics,
+    ocr_backend: OcrBackend | None = None,
+    matcher: BlockLevelPlotMatcher | None = None,
+) -> list[str]:
+    """Function to read the region of interest of the image with the buffer pool and recognize text on it,
+    recording the duration of each stage as recognize_image_with_metrics and recognize_image_with_backend.
+
+    Args:
+        buffer_pool (RoiBufferPool): The pool of buffers of the regions of interest.
+
+        paddle_backend (PaddleOcrBackend): PaddleOCR without the OCR backend, the models are loaded
+            on the first image recognized by it.
+
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        metrics (StageMetrics): Metrics to record the durations of the stages.
+
+        ocr_backend (OcrBackend | None, optional): The OCR backend instead of PaddleOCR. Defaults to None.
+
+        matcher (BlockLevelPlotMatcher | None, optional): Matcher for the early exit of the backend.
+            Defaults to None.
+
+    Returns:
+        recognized_text_list (list[str]): Recognized text of the image.
+            For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"]
+    """
+    with metrics.measure("read_decode"):
+        coordinates_roi: NDArray[np.uint8] = buffer_pool.read_region_of_interest(img_full_path)
+    if ocr_backend is not None:
+        with metrics.measure("ocr"):
+            return (
+                recognize_until_match(ocr_backend, coordinates_roi, matcher)
+                if matcher is not None
+                else ocr_backend.recognize(coordinates_roi)
+            )
+    with metrics.measure("ocr_detection"):
+        text_crops: list[NDArray[np.uint8]] = get_text_crops_from_roi(paddle_backend.get_ocr(), coordinates_roi)
+    with metrics.measure("ocr_recognition"):
+        rec_res: list[tuple[str, float]] = recognize_text_crops(paddle_backend.get_ocr(), text_crops)
+    recognized_text_list: list[str] = [
+        text for text, score in rec_res if score >= paddle_backend.get_ocr().drop_score
+    ]
+    return recognized_text_list
@@ -0,0 +1,334 @@
+"""The module contains the library API which classifies the images of the folder by block-level plots
+and returns the results as records or as a table of columns, without printing and moving the images"""
+
+import argparse
+import csv
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.compiled_data import get_compiled_dict_block_level_plot
+from helpers.fuzzy_matcher import FuzzyBlockLevelPlotMatcher
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.ocr_backends import OcrBackend
+from helpers.recognition import (
+    ImageReadError,
+    get_coordinates_region_of_interest,
+    get_paddle_ocr,
+    recognize_text_from_images,
+)
+from helpers.text_normalization import NormalizedBatch, match_batch
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
+# Fields of the record of the classification and columns of the table
+CLASSIFICATION_FIELDS: tuple[str, ...] = (
+    "path",
+    "key",
+    "matched_line",
+    "confidence",
+    "read_decode",
+    "ocr",
+    "match",
+    "error",
+)
+
+
+class ClassificationRecord:
+    """
+    Result of the classification of one image.
+
+    Values:
+        path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        key (str | None): The key of the block-level plot or None if no key matched. For example: 'C_L2_Plot_182'
+
+        matched_line (str | None): The recognized line which matched the key. For example: 'C L2 182'
+
+        confidence (float): 1.0 for the exact match, the score of FuzzyBlockLevelPlotMatcher for the fuzzy match,
+            0.0 if no key matched. For example: 0.98
+
+        read_decode (float): Duration of reading and decoding the region of interest in seconds. For example: 0.19
+
+        ocr (float): The share of the image in the duration of OCR of its batch in seconds. For example: 0.71
+
+        match (float): The share of the image in the duration of matching of its batch in seconds.
+            For example: 0.00002
+
+        error (str | None): Why the image was not recognized: the error of reading or OCR.
+            For example: 'Image can not be read: ...'
+    """
+
+    __slots__ = CLASSIFICATION_FIELDS
+
+    def __init__(
+        self,
+        path: Path,
+        key: str | None,
+        matched_line: str | None,
+        confidence: float,
+        read_decode: float,
+        ocr: float,
+        match: float,
+        error: str | None = None,
+    ) -> None:
+        self.path = path
+        self.key = key
+        self.matched_line = matched_line
+        self.confidence = confidence
+        self.read_decode = read_decode
+        self.ocr = ocr
+        self.match = match
+        self.error = error
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Returns the record as the dictionary of its fields.
+
+        Returns:
+            dict[str, object]: For example:
+                {"path": WindowsPath('D:/.../AADC5918.JPG'), "key": "C_L2_Plot_182", "matched_line": "C L2 182", ...}
+        """
+        return {field: getattr(self, field) for field in CLASSIFICATION_FIELDS}
+
+    def __repr__(self) -> str:
+        return (
+            f"ClassificationRecord(path={self.path!r}, key={self.key!r}, matched_line={self.matched_line!r}, "
+            f"confidence={self.confidence!r})"
+        )
+
+
+def read_region_of_interest_with_duration(
+    img_full_path: Path, decode_scale: int = 1
+) -> tuple[NDArray[np.uint8] | None, float, str | None]:
+    """
+    The function reads the region of interest of the image in a thread of the classification.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        decode_scale (int): Decode the image with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+    Returns:
+        tuple[NDArray[np.uint8] | None, float, str | None]: The region of interest or None, the duration
+            in seconds and the error of reading or None.
+            For example: (array([[ 95, 100, ...]], shape=(1800, 1900), dtype=uint8), 0.19, None)
+    """
+    start: float = perf_counter()
+    try:
+        coordinates_roi: NDArray[np.uint8] = get_coordinates_region_of_interest(img_full_path, decode_scale)
+    except ImageReadError as error:
+        return None, perf_counter() - start, str(error)
+    return coordinates_roi, perf_counter() - start, None
+
+
+def iter_classify_folder(
+    folder_images_full_path: Path,
+    matcher: BlockLevelPlotMatcher,
+    ocr: "PaddleOCR | None" = None,
+    ocr_backend: OcrBackend | None = None,
+    batch_size: int = 16,
+    decode_scale: int = 1,
+    max_workers: int = 4,
+) -> Iterator[ClassificationRecord]:
+    """
+    Classifies the JPEG images of the folder in batches and yields the record of each image in the order
+    of the names. The regions of interest of the next batch are read by the thread pool while OCR recognizes
+    the current batch, the text lines of the batch are recognized by PaddleOCR together,
+    and the batch is matched with the dictionary at once by match_batch.
+    An error of reading or OCR of an image is recorded in its error and does not stop the classification.
+    The images are not moved and nothing is printed.
+
+    Args:
+        folder_images_full_path (Path): The folder with the images.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots,
+            for example by get_compiled_dict_block_level_plot, or FuzzyBlockLevelPlotMatcher.
+
+        ocr (PaddleOCR | None): Экземпляр класса PaddleOCR. By default None - created by get_paddle_ocr
+            if ocr_backend is None.
+
+        ocr_backend (OcrBackend | None): The OCR backend instead of PaddleOCR, recognizes images one by one.
+            By default None.
+
+        batch_size (int): Amount of images recognized and matched together. By default 16.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        max_workers (int): Amount of threads which read the regions of interest. By default 4.
+
+    Yields:
+        ClassificationRecord: The result of the classification of the image.
+            For example: ClassificationRecord(path=WindowsPath('D:/.../AADC5918.JPG'), key='C_L2_Plot_182', ...)
+    """
+    img_full_paths: list[Path] = sorted(
+        img_full_path for img_full_path in folder_images_full_path.iterdir() if img_full_path.suffix.lower() == ".jpg"
+    )
+    if not img_full_paths:
+        return
+    if ocr is None and ocr_backend is None:
+        ocr = get_paddle_ocr()
+    batches: list[list[Path]] = [
+        img_full_paths[start:start + batch_size] for start in range(0, len(img_full_paths), batch_size)
+    ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures: list[Future] = [
+            executor.submit(read_region_of_interest_with_duration, img_full_path, decode_scale)
+            for img_full_path in batches[0]
+        ]
+        for batch_index, img_full_paths_batch in enumerate(batches):
+            regions: list[tuple[NDArray[np.uint8] | None, float, str | None]] = [
+                future.result() for future in futures
+            ]
+            # Reading of the next batch goes on while OCR recognizes this batch
+            if batch_index + 1 < len(batches):
+                futures = [
+                    executor.submit(read_region_of_interest_with_duration, img_full_path, decode_scale)
+                    for img_full_path in batches[batch_index + 1]
+                ]
+
+            # Indexes of the images whose region of interest was read
+            indexes_to_recognize: list[int] = [
+                index for index, (coordinates_roi, _, _) in enumerate(regions) if coordinates_roi is not None
+            ]
+            recognized_text_lists: list[list[str]] = [[] for _ in img_full_paths_batch]
+            ocr_durations: list[float] = [0.0] * len(img_full_paths_batch)
+            errors: list[str | None] = [error for _, _, error in regions]
+            if ocr_backend is not None:
+                for index in indexes_to_recognize:
+                    start: float = perf_counter()
+                    try:
+                        recognized_text_lists[index] = ocr_backend.recognize(regions[index][0])
+                    except Exception as error:
+                        errors[index] = f"OCR failed: {error}"
+                    ocr_durations[index] = perf_counter() - start
+            elif indexes_to_recognize:
+                start = perf_counter()
+                try:
+                    for index, recognized_text_list in zip(
+                        indexes_to_recognize,
+                        recognize_text_from_images(ocr, [regions[index][0] for index in indexes_to_recognize]),
+                    ):
+                        recognized_text_lists[index] = recognized_text_list
+                except Exception:
+                    # The images of the failed batch are recognized one by one, so only the broken one has the error
+                    for index in indexes_to_recognize:
+                        try:
+                            recognized_text_lists[index] = recognize_text_from_images(ocr, [regions[index][0]])[0]
+                        except Exception as error:
+                            errors[index] = f"OCR failed: {error}"
+                ocr_duration: float = (perf_counter() - start) / len(indexes_to_recognize)
+                for index in indexes_to_recognize:
+                    ocr_durations[index] = ocr_duration
+
+            start = perf_counter()
+            folder_names, matched_lines, confidences = match_batch(NormalizedBatch(recognized_text_lists), matcher)
+            match_duration: float = (perf_counter() - start) / len(img_full_paths_batch)
+
+            for index, img_full_path in enumerate(img_full_paths_batch):
+                _, read_duration, _ = regions[index]
+                yield ClassificationRecord(
+                    img_full_path,
+                    folder_names[index] or None,
+                    matched_lines[index],
+                    confidences[index],
+                    read_duration,
+                    ocr_durations[index],
+                    match_duration,
+                    errors[index],
+                )
+
+
+def classify_folder(
+    folder_images_full_path: Path,
+    matcher: BlockLevelPlotMatcher,
+    ocr: "PaddleOCR | None" = None,
+    ocr_backend: OcrBackend | None = None,
+    batch_size: int = 16,
+    decode_scale: int = 1,
+    max_workers: int = 4,
+) -> dict[str, NDArray]:
+    """
+    Classifies the JPEG images of the folder as iter_classify_folder and returns the table of columns,
+    one row per image, which can be passed to pandas.DataFrame or written to CSV without parsing the output.
+
+    Args:
+        folder_images_full_path (Path): The folder with the images.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        ocr (PaddleOCR | None): Экземпляр класса PaddleOCR. By default None.
+
+        ocr_backend (OcrBackend | None): The OCR backend instead of PaddleOCR. By default None.
+
+        batch_size (int): Amount of images recognized and matched together. By default 16.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        max_workers (int): Amount of threads which read the regions of interest. By default 4.
+
+    Returns:
+        table (dict[str, NDArray]): Column of CLASSIFICATION_FIELDS -> values of the images.
+            "path" is the array of strings, "key", "matched_line" and "error" are arrays of objects with None,
+            "confidence" and the durations in seconds are arrays of floats.
+            For example:
+                {
+                    "path": array(['D:/.../AADC5918.JPG', 'D:/.../AADC5919.JPG'], dtype='<U62'),
+                    "key": array(['C_L2_Plot_182', None], dtype=object),
+                    "confidence": array([1.0, 0.0]),
+                    ...
+                }
+    """
+    columns: dict[str, list[object]] = {field: [] for field in CLASSIFICATION_FIELDS}
+    for record in iter_classify_folder(
+        folder_images_full_path, matcher, ocr, ocr_backend, batch_size, decode_scale, max_workers
+    ):
+        for field in CLASSIFICATION_FIELDS:
+            columns[field].append(getattr(record, field))
+
+    table: dict[str, NDArray] = {"path": np.array([str(path) for path in columns["path"]], dtype=np.str_)}
+    for field in ("key", "matched_line", "error"):
+        table[field] = np.empty(len(columns[field]), dtype=object)
+        table[field][:] = columns[field]
+    for field in ("confidence", "read_decode", "ocr", "match"):
+        table[field] = np.array(columns[field], dtype=np.float64)
+    return {field: table[field] for field in CLASSIFICATION_FIELDS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify the images of the folder and write the table to CSV")
+    parser.add_argument("folder", type=Path, help="The folder with the images")
+    parser.add_argument("output", type=Path, help="Path to the CSV table")
+    parser.add_argument("--dict", type=Path, default=Path("info/locations_apartments_by_window_titles.txt"))
+    parser.add_argument("--fuzzy-match", action="store_true")
+    parser.add_argument("--min-match-score", type=float, default=0.85)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--decode-scale", type=int, choices=(1, 2, 4, 8), default=1)
+    parser.add_argument("--workers", type=int, default=4, help="Amount of threads which read the images")
+    arguments = parser.parse_args()
+
+    dict_block_level_plot, matcher = get_compiled_dict_block_level_plot(arguments.dict)
+    if arguments.fuzzy_match:
+        matcher = FuzzyBlockLevelPlotMatcher(dict_block_level_plot, arguments.min_match_score)
+    with open(arguments.output, "w", encoding="utf-8", newline="") as file:
+        csv_writer = csv.DictWriter(file, fieldnames=CLASSIFICATION_FIELDS)
+        csv_writer.writeheader()
+        for record in iter_classify_folder(
+            arguments.folder.resolve(),
+            matcher,
+            batch_size=arguments.batch_size,
+            decode_scale=arguments.decode_scale,
+            max_workers=arguments.workers,
+        ):
+            csv_writer.writerow(record.to_dict())
@@ -0,0 +1,168 @@
+"""The module contains the compiled artifact of the dictionary of block-level plots"""
+
+import hashlib
+import pickle
+from pathlib import Path
+
+from helpers.data import get_simple_dict_block_level_plot_from_file
+from helpers.matcher import BlockLevelPlotMatcher
+
+# Version of the artifact format. Change it when the content of the artifact
+# or the pickled classes, such as BlockLevelPlotMatcher, change.
+COMPILED_DICT_BLOCK_LEVEL_PLOT_VERSION: int = 3
+
+
+def get_source_hash(path_to_file: Path) -> str:
+    """
+    The function calculates the SHA-256 of the source text file.
+
+    Args:
+        path_to_file (Path): Relative or absolute path to the text file.
+            For example: Path("info/locations_apartments_by_window_titles.txt")
+
+    Returns:
+        source_hash (str): SHA-256 of the file content.
+            For example: '9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'
+    """
+    with open(path_to_file, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def save_artifact(artifact: dict[str, object], path_to_artifact: Path) -> None:
+    """
+    The function saves the artifact to the binary file.
+
+    Args:
+        artifact (dict[str, object]): The version, the modification time, the size and the hash of the text file,
+            the dictionary of block-level plots and its matcher.
+
+        path_to_artifact (Path): Relative or absolute path to the artifact.
+            For example: Path("info/locations_apartments_by_window_titles.pickle")
+    """
+    # Write to the temporary file and replace, so a broken artifact is never read
+    path_to_temporary_artifact: Path = path_to_artifact.with_name(path_to_artifact.name + ".tmp")
+    with open(path_to_temporary_artifact, "wb") as file:
+        pickle.dump(artifact, file, protocol=pickle.HIGHEST_PROTOCOL)
+    path_to_temporary_artifact.replace(path_to_artifact)
+
+
+def compile_dict_block_level_plot(
+    path_to_file_with_locations_apartments_by_window_titles: Path, path_to_artifact: Path
+) -> dict[str, object]:
+    """
+    The function parses the text file with window names by block, level and plot,
+    builds the matcher and saves both to the binary artifact.
+
+    Args:
+        path_to_file_with_locations_apartments_by_window_titles (Path): Relative or absolute path to the text file.
+            For example: Path("info/locations_apartments_by_window_titles.txt")
+
+        path_to_artifact (Path): Relative or absolute path to the artifact.
+            For example: Path("info/locations_apartments_by_window_titles.pickle")
+
+    Returns:
+        artifact (dict[str, object]): The version, the modification time, the size and the hash of the text file,
+            the dictionary of block-level plots and its matcher.
+            For example:
+                {
+                    "version": 3,
+                    "source_mtime_ns": 1742832240000000000,
+                    "source_size": 48213,
+                    "source_hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+                    "dict_block_level_plot": {"A_L1_Plot_1": ("AV-05-60", "AV-06-60", "WA0124")},
+                    "matcher": <helpers.matcher.BlockLevelPlotMatcher object>,
+                }
+    """
+    dict_block_level_plot: dict[str, tuple[str, ...]] = get_simple_dict_block_level_plot_from_file(
+        path_to_file_with_locations_apartments_by_window_titles
+    )
+    matcher: BlockLevelPlotMatcher = BlockLevelPlotMatcher(dict_block_level_plot)
+    source_stat = path_to_file_with_locations_apartments_by_window_titles.stat()
+    artifact: dict[str, object] = {
+        "version": COMPILED_DICT_BLOCK_LEVEL_PLOT_VERSION,
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "source_size": source_stat.st_size,
+        "source_hash": get_source_hash(path_to_file_with_locations_apartments_by_window_titles),
+        "dict_block_level_plot": dict_block_level_plot,
+        "matcher": matcher,
+    }
+    save_artifact(artifact, path_to_artifact)
+    return artifact
+
+
+def get_compiled_artifact(
+    path_to_file_with_locations_apartments_by_window_titles: Path, path_to_artifact: Path | None = None
+) -> dict[str, object]:
+    """
+    The function loads the artifact of the dictionary of block-level plots, its hash is reused
+    by the key of the OCR cache without hashing the text file again.
+    The artifact is compiled again if the text file was changed: the modification time and size
+    are checked first, and the content hash only if they differ. If only the modification time or the size
+    changed, for example after a copy of the file, the artifact is saved with them, so the file is not hashed
+    on every run.
+
+    Args:
+        path_to_file_with_locations_apartments_by_window_titles (Path): Relative or absolute path to the text file.
+            For example: Path("info/locations_apartments_by_window_titles.txt")
+
+        path_to_artifact (Path | None): Relative or absolute path to the artifact.
+            By default the text file with the suffix ".pickle".
+
+    Returns:
+        artifact (dict[str, object]): The artifact of compile_dict_block_level_plot for the current text file.
+    """
+    if path_to_artifact is None:
+        # Path('info/locations_apartments_by_window_titles.pickle')
+        path_to_artifact = path_to_file_with_locations_apartments_by_window_titles.with_suffix(".pickle")
+
+    try:
+        with open(path_to_artifact, "rb") as file:
+            artifact: dict[str, object] = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return compile_dict_block_level_plot(
+            path_to_file_with_locations_apartments_by_window_titles, path_to_artifact
+        )
+
+    if artifact.get("version") != COMPILED_DICT_BLOCK_LEVEL_PLOT_VERSION:
+        return compile_dict_block_level_plot(
+            path_to_file_with_locations_apartments_by_window_titles, path_to_artifact
+        )
+    source_stat = path_to_file_with_locations_apartments_by_window_titles.stat()
+    # If the modification time or the size differ, the content hash decides
+    if artifact["source_mtime_ns"] != source_stat.st_mtime_ns or artifact["source_size"] != source_stat.st_size:
+        if artifact["source_hash"] != get_source_hash(path_to_file_with_locations_apartments_by_window_titles):
+            return compile_dict_block_level_plot(
+                path_to_file_with_locations_apartments_by_window_titles, path_to_artifact
+            )
+        artifact["source_mtime_ns"] = source_stat.st_mtime_ns
+        artifact["source_size"] = source_stat.st_size
+        save_artifact(artifact, path_to_artifact)
+    return artifact
+
+
+def get_compiled_dict_block_level_plot(
+    path_to_file_with_locations_apartments_by_window_titles: Path, path_to_artifact: Path | None = None
+) -> tuple[dict[str, tuple[str, ...]], BlockLevelPlotMatcher]:
+    """
+    The function loads the dictionary of block-level plots and its matcher from the binary artifact
+    of get_compiled_artifact.
+
+    Args:
+        path_to_file_with_locations_apartments_by_window_titles (Path): Relative or absolute path to the text file.
+            For example: Path("info/locations_apartments_by_window_titles.txt")
+
+        path_to_artifact (Path | None): Relative or absolute path to the artifact.
+            By default the text file with the suffix ".pickle".
+
+    Returns:
+        tuple[dict[str, tuple[str, ...]], BlockLevelPlotMatcher]: The dictionary of block-level plots and its matcher.
+            For example:
+                (
+                    {"A_L1_Plot_1": ("AV-05-60", "AV-06-60", "WA0124")},
+                    <helpers.matcher.BlockLevelPlotMatcher object>,
+                )
+    """
+    artifact: dict[str, object] = get_compiled_artifact(
+        path_to_file_with_locations_apartments_by_window_titles, path_to_artifact
+    )
+    return artifact["dict_block_level_plot"], artifact["matcher"]
@@ -0,0 +1,238 @@
+"""The module contains the local HTTP daemon which keeps the OCR models loaded between batches"""
+
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.compiled_data import get_compiled_dict_block_level_plot
+from helpers.helpers_func import move_image_to_folder_block_level_plot
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.recognition import (
+    get_coordinates_region_of_interest,
+    get_paddle_ocr,
+    recognize_text_from_image,
+)
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
+
+class RecognitionDaemon(HTTPServer):
+    """
+    Local HTTP server which creates the PaddleOCR instance on the first request
+    and keeps the OCR models loaded for all next requests.
+    Requests are handled one by one, as the PaddleOCR instance is not thread safe.
+
+    Endpoints:
+        GET /health - {"status": "ok", "ocr_loaded": true}
+
+        POST /recognize - {"paths": ["images_for_recognize", "D:/images/AADC5918.JPG"], "move": false}
+            Paths are folders with ".jpg" images or images.
+            Returns {"results": [{"path": ..., "recognized_text_list": [...], "folder_name": "C_L2_Plot_182"}]},
+            the result of an image which failed is {"path": ..., "error": ...}.
+            Returns 400 {"error": ...} for an invalid request and 500 {"error": ...} if the request failed.
+
+    Args:
+        port (int): Port on 127.0.0.1. For example: 8765
+
+        path_to_file_with_locations_apartments_by_window_titles (Path): Path to the text file with window names.
+            For example: Path("info/locations_apartments_by_window_titles.txt")
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        path_to_file_with_locations_apartments_by_window_titles: Path,
+        folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+        decode_scale: int = 1,
+    ) -> None:
+        super().__init__(("127.0.0.1", port), RecognitionRequestHandler)
+        self.path_to_file_with_locations_apartments_by_window_titles = (
+            path_to_file_with_locations_apartments_by_window_titles
+        )
+        self.folder_with_target_folders_by_location_apartments = folder_with_target_folders_by_location_apartments
+        self.decode_scale = decode_scale
+        self.ocr: "PaddleOCR | None" = None
+
+    def get_ocr(self) -> "PaddleOCR":
+        """
+        Returns the PaddleOCR instance, creates it on the first call.
+
+        Returns:
+            ocr (PaddleOCR): Экземпляр класса PaddleOCR
+        """
+        if self.ocr is None:
+            self.ocr = get_paddle_ocr()
+        return self.ocr
+
+    def recognize_paths(self, paths: list[str], move: bool = False) -> list[dict[str, object]]:
+        """
+        Recognizes images from folders and paths and finds the block-level plot folder of each image.
+        An error of reading, OCR or moving of one image is returned in its result and does not stop the others.
+
+        Args:
+            paths (list[str]): Folders with ".jpg" images or images.
+                For example: ["images_for_recognize", "D:/images/AADC5918.JPG"]
+
+            move (bool): Move the images to the folders of their block-level plots. By default False.
+
+        Returns:
+            results (list[dict[str, object]]): Result of each image.
+                For example:
+                    [
+                        {
+                            "path": "D:/images/AADC5918.JPG",
+                            "recognized_text_list": ["C L2 182", "Time"],
+                            "folder_name": "C_L2_Plot_182",
+                        }
+                    ]
+        """
+        # The artifact is compiled again only if the text file was changed
+        matcher: BlockLevelPlotMatcher
+        _, matcher = get_compiled_dict_block_level_plot(
+            self.path_to_file_with_locations_apartments_by_window_titles
+        )
+        img_full_paths: list[Path] = []
+        for path in paths:
+            path_obj: Path = Path(path).resolve()
+            if path_obj.is_dir():
+                img_full_paths.extend(
+                    img_full_path
+                    for img_full_path in sorted(path_obj.iterdir())
+                    if img_full_path.suffix.lower() == ".jpg"
+                )
+            else:
+                img_full_paths.append(path_obj)
+
+        results: list[dict[str, object]] = []
+        for img_full_path in img_full_paths:
+            try:
+                coordinates_roi: NDArray[np.uint8] = get_coordinates_region_of_interest(
+                    img_full_path, self.decode_scale
+                )
+                recognized_text_list: list[str] = recognize_text_from_image(
+                    self.get_ocr(), coordinates_roi, only_horizontal=True
+                )
+                folder_name: str | bool = (
+                    matcher.get_folder_name(recognized_text_list) if len(recognized_text_list) > 0 else False
+                )
+                if move and folder_name and type(folder_name) is str:
+                    move_image_to_folder_block_level_plot(
+                        img_full_path, folder_name, self.folder_with_target_folders_by_location_apartments
+                    )
+            except Exception as error:
+                results.append({"path": str(img_full_path), "error": str(error)})
+                continue
+            results.append(
+                {
+                    "path": str(img_full_path),
+                    "recognized_text_list": recognized_text_list,
+                    "folder_name": folder_name,
+                }
+            )
+        return results
+
+
+class RecognitionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the requests to RecognitionDaemon.
+    """
+
+    server: RecognitionDaemon
+
+    def send_json(self, status: int, body: dict[str, object]) -> None:
+        """
+        Sends the JSON response.
+
+        Args:
+            status (int): HTTP status. For example: 200
+
+            body (dict[str, object]): Body of the response. For example: {"status": "ok"}
+        """
+        body_bytes: bytes = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body_bytes)))
+        self.end_headers()
+        self.wfile.write(body_bytes)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok", "ocr_loaded": self.server.ocr is not None})
+        else:
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/recognize":
+            self.send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length: int = int(self.headers.get("Content-Length", 0))
+            request: dict[str, object] = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise TypeError(f"the request must be an object, not {type(request).__name__}")
+            paths: list[str] = request["paths"]
+            if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+                raise TypeError("paths must be a list of strings")
+            move: bool = request.get("move", False)
+            if not isinstance(move, bool):
+                raise TypeError(f"move must be a boolean, not {type(move).__name__}")
+        except (ValueError, KeyError, TypeError) as error:
+            self.send_json(400, {"error": f"Invalid request: {error}"})
+            return
+        try:
+            results: list[dict[str, object]] = self.server.recognize_paths(paths, move)
+        except Exception as error:
+            # For example, the dictionary can not be read, the daemon keeps serving next requests
+            self.send_json(500, {"error": f"Recognition failed: {error}"})
+            return
+        self.send_json(200, {"results": results})
+
+
+def run_recognition_daemon(
+    port: int,
+    path_to_file_with_locations_apartments_by_window_titles: Path,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    decode_scale: int = 1,
+    warm_start: bool = True,
+) -> None:
+    """
+    Runs the recognition daemon until it is stopped by Ctrl+C.
+
+    Args:
+        port (int): Port on 127.0.0.1. For example: 8765
+
+        path_to_file_with_locations_apartments_by_window_titles (Path): Path to the text file with window names.
+            For example: Path("info/locations_apartments_by_window_titles.txt")
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        warm_start (bool): Load the OCR models before the first request. By default True.
+    """
+    daemon = RecognitionDaemon(
+        port,
+        path_to_file_with_locations_apartments_by_window_titles,
+        folder_with_target_folders_by_location_apartments,
+        decode_scale,
+    )
+    if warm_start:
+        daemon.get_ocr()
+    print(f"Recognition daemon is listening on http://127.0.0.1:{port}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
@@ -97,14 +97,14 @@ def get_simple_dict_block_level_plot_from_file(
                         )
                         # If the block does not exist, create a new dictionary for it
                         if is_block_level_plot_not_exist == "not exist":
-                            dict_simple_block_level_plot[block_level_plot] = ()
+                            dict_simple_block_level_plot[block_level_plot] = []
 
                     elif (
                         len(matches) == 0
                         and len(line_formatted) > 0
                         and "plot" in block_level_plot.lower()
                     ):
-                        dict_simple_block_level_plot[block_level_plot] += tuple(
+                        dict_simple_block_level_plot[block_level_plot].extend(
                             line_formatted.split()
                         )
 
@@ -113,7 +113,7 @@ def get_simple_dict_block_level_plot_from_file(
                         and len(line_formatted) > 0
                         and "shared hallway" in block_level_plot.lower()
                     ):
-                        dict_simple_block_level_plot[block_level_plot] += tuple(
+                        dict_simple_block_level_plot[block_level_plot].extend(
                             line_formatted.split()
                         )
 
@@ -126,7 +126,7 @@ def get_simple_dict_block_level_plot_from_file(
                         plot = "_".join(matches[0].split(" ")).capitalize()
                         # 'A_L1_Plot_1'
                         block_level_plot = block_level + plot
-                        dict_simple_block_level_plot[block_level_plot] = tuple(
+                        dict_simple_block_level_plot[block_level_plot] = list(
                             line_formatted.replace(matches[0], "").strip().split()
                         )
 
@@ -140,9 +140,9 @@ def get_simple_dict_block_level_plot_from_file(
                             block_level_plot, "not exist"
                         )
                         if dict_value_exist == "not exist":
-                            dict_simple_block_level_plot[block_level_plot] = ()
+                            dict_simple_block_level_plot[block_level_plot] = []
                         else:
-                            dict_simple_block_level_plot[block_level_plot] = tuple(
+                            dict_simple_block_level_plot[block_level_plot] = list(
                                 line_formatted.replace(matches[0], "").strip().split()
                             )
 
@@ -156,14 +156,18 @@ def get_simple_dict_block_level_plot_from_file(
                             block_level_plot, "not exist"
                         )
                         if dict_value_exist == "not exist":
-                            dict_simple_block_level_plot[block_level_plot] = tuple(
+                            dict_simple_block_level_plot[block_level_plot] = list(
                                 line_formatted.replace(matches[0], "").strip().split()
                             )
                         else:
-                            dict_simple_block_level_plot[block_level_plot] = tuple(
+                            dict_simple_block_level_plot[block_level_plot] = list(
                                 line_formatted.replace(matches[0], "").strip().split()
                             )
-    return dict_simple_block_level_plot
+    # Window names are collected in lists, extending a tuple on each line is quadratic
+    return {
+        block_level_plot: tuple(window_names)
+        for block_level_plot, window_names in dict_simple_block_level_plot.items()
+    }
 
 
 if __name__ == "__main__":
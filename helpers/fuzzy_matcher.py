@@ -0,0 +1,225 @@
+"""The module contains the matching of recognized text with the dictionary tolerant of OCR errors"""
+
+from helpers.matcher import BlockLevelPlotMatcher
+
+# Characters which OCR confuses with each other, the first character of the group is its canonical form
+CONFUSABLE_CHARACTERS: tuple[str, ...] = ("0OQD", "1IL|", "2Z", "5S", "6G", "8B")
+CANONICAL_CHARACTERS: dict[str, str] = {
+    character: group[0] for group in CONFUSABLE_CHARACTERS for character in group
+}
+# Cost of the substitution of confusable characters, other substitutions, insertions and deletions cost 1
+CONFUSION_COST: float = 0.25
+
+
+def get_canonical_form(text: str) -> str:
+    """
+    The function replaces confusable characters with the canonical character of their group.
+
+    Args:
+        text (str): Text in upper case. For example: 'C_L2_PLOT_I82'
+
+    Returns:
+        str: The canonical form. For example: 'C_12_P10T_182'
+    """
+    return "".join(CANONICAL_CHARACTERS.get(character, character) for character in text)
+
+
+def get_edit_distance(first: str, second: str, confusion_cost: float = 1.0) -> float:
+    """
+    The function calculates the Levenshtein distance, where the substitution of confusable characters
+    costs confusion_cost.
+
+    Args:
+        first (str): For example: 'WC0214'
+
+        second (str): For example: 'WCO214'
+
+        confusion_cost (float): Cost of the substitution of confusable characters. By default 1.0.
+
+    Returns:
+        float: The distance. For example: 0.25 with confusion_cost 0.25
+    """
+    previous_row: list[float] = [float(index) for index in range(len(second) + 1)]
+    for first_index, first_character in enumerate(first, start=1):
+        current_row: list[float] = [float(first_index)]
+        for second_index, second_character in enumerate(second, start=1):
+            if first_character == second_character:
+                substitution_cost: float = 0.0
+            elif CANONICAL_CHARACTERS.get(first_character, first_character) == CANONICAL_CHARACTERS.get(
+                second_character, second_character
+            ):
+                substitution_cost = confusion_cost
+            else:
+                substitution_cost = 1.0
+            current_row.append(
+                min(
+                    previous_row[second_index] + 1,
+                    current_row[second_index - 1] + 1,
+                    previous_row[second_index - 1] + substitution_cost,
+                )
+            )
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def get_match_score(recognized: str, reference: str) -> float:
+    """
+    The function returns the similarity of the recognized text and the reference from 0 to 1.
+
+    Args:
+        recognized (str): For example: 'C_L2_PLOT_I82'
+
+        reference (str): For example: 'C_L2_PLOT_182'
+
+    Returns:
+        float: 1 - confusion-aware distance / length of the longer text. For example: 0.98
+    """
+    length: int = max(len(recognized), len(reference), 1)
+    return max(1.0 - get_edit_distance(recognized, reference, CONFUSION_COST) / length, 0.0)
+
+
+class FuzzyBlockLevelPlotMatcher(BlockLevelPlotMatcher):
+    """
+    Matcher which returns the exact match as BlockLevelPlotMatcher, and otherwise the key whose plot
+    or window name differs from the recognized token only by confusable characters: "O" and "0", "I" and "1"
+    and others of CONFUSABLE_CHARACTERS. Other substitutions, insertions and deletions are not tolerated,
+    as "C L2 183" is the plot 183 and not a typo of 182, and the block and the level must be recognized exactly.
+    The score is calculated for the token, not for the whole key, so min_score does not loosen for long keys.
+    If different keys have the best score, the image is not classified.
+
+    A line matches the key by its first three words, for example "C L2 I82" -> "C_L2_Plot_182",
+    or by a window name of the key among its words when its first two words are the block and the level
+    of this key, for example "C L2 182 wC02I4" -> window "WC0214" of "C_L2_Plot_182".
+
+    Args:
+        dict_block_level_plot (dict[str, tuple[str, ...]]): A dictionary mapping block-level plot keys
+            to tuples of associated window names.
+            For example: {"C_L2_Plot_182": ("WC0218", "WC0219", "EDC0201")}
+
+        min_score (float): Lowest score of the fuzzy match of the token from 0 to 1. By default 0.85.
+
+    Values:
+        canonical_plots (dict[str, dict[str, list[str]]]): Upper case BLOCK_LEVEL -> canonical form
+            of the plot -> keys.
+            For example: {"C_L2": {"182": ["C_L2_Plot_182"]}}
+
+        canonical_window_names (dict[str, dict[str, list[tuple[str, str]]]]): Upper case BLOCK_LEVEL ->
+            canonical form of the window name -> window names with their keys.
+            For example: {"C_L2": {"WC0218": [("WC0218", "C_L2_Plot_182")]}}
+    """
+
+    def __init__(self, dict_block_level_plot: dict[str, tuple[str, ...]], min_score: float = 0.85) -> None:
+        super().__init__(dict_block_level_plot)
+        self.min_score = min_score
+        self.canonical_plots: dict[str, dict[str, list[str]]] = {}
+        self.canonical_window_names: dict[str, dict[str, list[tuple[str, str]]]] = {}
+        for key in self.key_positions:
+            # ['C', 'L2', 'PLOT', '182']
+            key_words: list[str] = key.upper().split("_")
+            block_level: str = "_".join(key_words[:2])
+            self.canonical_plots.setdefault(block_level, {}).setdefault(
+                get_canonical_form(key_words[-1]), []
+            ).append(key)
+            for window_name in dict_block_level_plot[key]:
+                self.canonical_window_names.setdefault(block_level, {}).setdefault(
+                    get_canonical_form(window_name.upper()), []
+                ).append((window_name, key))
+
+    def get_key_candidates(self, recognized_word: str) -> list[tuple[str, float]]:
+        """
+        Finds keys close to one recognized line of text with their scores.
+
+        Args:
+            recognized_word (str): The recognized line of text.
+                For example: "C L2 I82 wC02I4"
+
+        Returns:
+            candidates (list[tuple[str, float]]): Keys and scores of the plot or the window name.
+                For example: [('C_L2_Plot_182', 0.92), ('C_L2_Plot_182', 0.96)]
+        """
+        candidates: list[tuple[str, float]] = []
+        # ['C', 'L2', 'I82', 'WC02I4']
+        recognized_words: list[str] = recognized_word.upper().split()
+        if len(recognized_words) < 3:
+            return candidates
+
+        # 'C_L2', the block and the level are not corrected
+        recognized_block_level: str = "_".join(recognized_words[:2])
+        # 'I82'
+        recognized_plot: str = recognized_words[2]
+        for key in self.canonical_plots.get(recognized_block_level, {}).get(get_canonical_form(recognized_plot), []):
+            candidates.append((key, get_match_score(recognized_plot, key.upper().split("_")[-1])))
+
+        window_names: dict[str, list[tuple[str, str]]] = self.canonical_window_names.get(recognized_block_level, {})
+        for recognized_window_name in recognized_words[2:]:
+            for window_name, key in window_names.get(get_canonical_form(recognized_window_name), []):
+                candidates.append((key, get_match_score(recognized_window_name, window_name.upper())))
+        return candidates
+
+    def get_folder_name_with_score(self, recognized_text_list: list[str]) -> tuple[str | bool, float]:
+        """
+        Determines the folder name and the score of the match.
+        The exact match of BlockLevelPlotMatcher has the score 1.0.
+
+        Args:
+            recognized_text_list (list[str]): A list of recognized text strings from the image.
+                For example: ["C L2 I82", "Time", "Mon, 24/03/2025 16:04"]
+
+        Returns:
+            tuple[str | bool, float]: The name of the folder and the score,
+            or False and the best score below min_score if no key matched.
+                For example:
+                    ('C_L2_Plot_182', 0.98)
+                    (False, 0.0)
+        """
+        # get_matched_keys of this class adds fuzzy matches, the exact match uses the one of the base class
+        folder_name: str | bool = False
+        for recognized_word in recognized_text_list:
+            for key in BlockLevelPlotMatcher.get_matched_keys(self, recognized_word):
+                if folder_name is False or self.key_positions[key] < self.key_positions[folder_name]:
+                    folder_name = key
+        if folder_name:
+            return folder_name, 1.0
+        best_keys: set[str] = set()
+        best_score: float = 0.0
+        for recognized_word in recognized_text_list:
+            for key, score in self.get_key_candidates(recognized_word):
+                if score > best_score:
+                    best_keys, best_score = {key}, score
+                elif score == best_score:
+                    best_keys.add(key)
+        # Different keys with the best score - the match is ambiguous
+        if best_score < self.min_score or len(best_keys) != 1:
+            return False, best_score
+        return best_keys.pop(), best_score
+
+    def get_folder_name(self, recognized_text_list: list[str]) -> str | bool:
+        """
+        Determines the folder name by the exact or the fuzzy match.
+
+        Args:
+            recognized_text_list (list[str]): A list of recognized text strings from the image.
+                For example: ["C L2 I82", "Time", "Mon, 24/03/2025 16:04"]
+
+        Returns:
+            str | bool: The name of the folder or False. For example: 'C_L2_Plot_182'
+        """
+        return self.get_folder_name_with_score(recognized_text_list)[0]
+
+    def get_matched_keys(self, recognized_word: str) -> set[str]:
+        """
+        Finds keys matched by one recognized line of text exactly or with the score not less than min_score.
+
+        Args:
+            recognized_word (str): The recognized line of text.
+                For example: "C L2 I82"
+
+        Returns:
+            matched_keys (set[str]): Keys matched by the recognized line.
+                For example: {'C_L2_Plot_182'}
+        """
+        matched_keys: set[str] = super().get_matched_keys(recognized_word)
+        if matched_keys:
+            return matched_keys
+        folder_name, _ = self.get_folder_name_with_score([recognized_word])
+        return {folder_name} if folder_name else set()
@@ -1,7 +1,13 @@
 """The module contains helper functions for the project and for the tests"""
 
+import shutil
+from contextlib import nullcontext
 from pathlib import Path
 
+from helpers.async_mover import AsyncImageMover
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+
 
 def get_folder_images(folder_images: str) -> Path | None:
     """
@@ -73,6 +79,106 @@ def get_image_full_path(folder_images_full_path: Path, image_name_to_recognize:
     )
 
 
+def move_image_to_folder_block_level_plot(
+    img_full_path: Path,
+    folder_name_to_remove_image: str,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+) -> Path | None:
+    """
+    The function moves the recognized image to the folder of its block-level plot
+    if this folder exists.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        folder_name_to_remove_image (str): The name of the block-level plot folder.
+            For example: 'A_L2_Plot_11'
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+    Returns:
+        abs_path_folder_block_level_plot (Path | None): The folder the image was moved to
+            or None if the folder does not exist.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/folder_by_block_level_plot/A_L2_Plot_11')
+    """
+    # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/folder_by_block_level_plot/A_L2_Plot_11')
+    abs_path_folder_block_level_plot: Path = (
+        Path().cwd()
+        / folder_with_target_folders_by_location_apartments
+        / folder_name_to_remove_image
+    )
+    # Убедиться что папка abs_path_folder_block_level_plot существует
+    # и переместить в неё распознанный файл изображения img_full_path
+    if abs_path_folder_block_level_plot.exists():
+        shutil.move(img_full_path, abs_path_folder_block_level_plot)
+        print(f"Move image: {img_full_path} to folder: {abs_path_folder_block_level_plot}")
+        return abs_path_folder_block_level_plot
+    return None
+
+
+def move_recognized_image(
+    img_full_path: Path,
+    recognized_text_list: list[str],
+    matcher: BlockLevelPlotMatcher,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    metrics: StageMetrics | None = None,
+    mover: AsyncImageMover | None = None,
+    folder_name: str | bool | None = None,
+) -> str | bool:
+    """
+    The function finds the block-level plot folder by the recognized text of the image
+    and moves the image to this folder.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        recognized_text_list (list[str]): Recognized text of the image.
+            For example: ["C L2 182", "Time", "Mon, 24/03/2025 16:04"]
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        metrics (StageMetrics | None): Metrics to record the duration of matching and moving. By default None.
+
+        mover (AsyncImageMover | None): Moves the image in background instead of this thread. By default None.
+
+        folder_name (str | bool | None): The folder matched beforehand, for example by match_batch,
+            the text is not matched again. By default None.
+
+    Returns:
+        folder_name_to_remove_image (str | bool): The name of the block-level plot folder or False.
+            For example: 'A_L2_Plot_11'
+    """
+    folder_name_to_remove_image: str | bool = False
+    if len(recognized_text_list) > 0:
+        print(f"{recognized_text_list=}")
+        if folder_name is not None:
+            folder_name_to_remove_image = folder_name
+        else:
+            with metrics.measure("match") if metrics is not None else nullcontext():
+                # 'A_L2_Plot_11'
+                folder_name_to_remove_image = matcher.get_folder_name(recognized_text_list)
+        print(f"folder_name_to_remove_image: {folder_name_to_remove_image}")
+
+        # Если folder_name_to_remove_image существует и это строка - 'A_L2_Plot_11'
+        if folder_name_to_remove_image and type(folder_name_to_remove_image) is str:
+            with metrics.measure("move") if metrics is not None else nullcontext():
+                if mover is not None:
+                    mover.submit(img_full_path, folder_name_to_remove_image)
+                else:
+                    move_image_to_folder_block_level_plot(
+                        img_full_path,
+                        folder_name_to_remove_image,
+                        folder_with_target_folders_by_location_apartments,
+                    )
+    return folder_name_to_remove_image
+
+
 def main() -> None:
     """
     The main function for testing the module.
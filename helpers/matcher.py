@@ -0,0 +1,169 @@
+"""The module contains the matching of recognized text with the dictionary of block-level plots"""
+
+
+def get_recognized_word_with_plot(recognized_word: str) -> str:
+    """
+    Normalizes a recognized line of text to the form of the dictionary keys.
+    The first two words and the last word of the line are joined with "Plot" between them.
+
+    Args:
+        recognized_word (str): The recognized line of text.
+            For example: "C L2 182"
+
+    Returns:
+        recognized_word_with_plot (str): The normalized line of text.
+            For example: 'C_L2_Plot_182'
+    """
+    # ['C', 'L2', '182']
+    recognized_words: list[str] = recognized_word.upper().split()
+    # 'C_L2_Plot_182'
+    recognized_word_with_plot: str = "_".join(
+        recognized_words[:2] + ["Plot"] + recognized_words[-1:]
+    )
+    return recognized_word_with_plot
+
+
+def check_for_match_block_level_plot(key: str, recognized_word_with_plot: str) -> bool:
+    """
+    Checks if the recognized word with plot matches the given key based on specific criteria.
+
+    Args:
+        key (str): The reference key representing a block-level plot.
+            Example: "C_L2_Plot_182"
+
+        recognized_word_with_plot (str): The recognized word containing plot information.
+            Example: "C_L2_Plot_182_WC0214"
+
+    Returns:
+        bool: True if the recognized word matches the key based on block and level criteria, False otherwise.
+
+    Example:
+        key = "C_L2_Plot_182"
+        recognized_word_with_plot = "C_L2_Plot_182_WC0214"
+        Result: True (if block and level match)
+    """
+    # print(f"{key=}, {recognized_word_with_plot=}")
+
+    # key = "C_L2_Plot_182"
+    # recognized_word_with_plot = "C_L2_Plot_182_WC0214"
+
+    # list_block_level_plot = ["C", "L2", "Plot", "182"]
+    list_block_level_plot: list[str] = key.split("_")
+    # recognized_number_list = ["C", "L2", "Plot", "182", "WC0214"]
+    recognized_number_list: list[str] = recognized_word_with_plot.split()
+
+    # If length of recognized_number_list is 3
+    if len(recognized_number_list) == 3:
+        # letter_block_from_dict='C'
+        letter_block_from_dict: str = list_block_level_plot[0]
+        # letter_block_recognized='C'
+        letter_block_recognized: str | None = (
+            recognized_number_list[0] if recognized_number_list[0].isalpha() else None
+        )
+
+        # level_from_dict='L2'
+        level_from_dict: str = list_block_level_plot[1]
+        # level_recognized='L2'
+        level_recognized: str | None = (
+            recognized_number_list[1]
+            if recognized_number_list[1][0].isalpha()
+            and recognized_number_list[1][1:].isdigit()
+            else None
+        )
+        """
+        If letter_block_recognized and level_recognized are not None and equal to
+        letter_block_from_dict and level_from_dict
+        """
+        if (
+            letter_block_recognized is not None and letter_block_recognized == letter_block_from_dict
+            and level_recognized is not None and level_recognized == level_from_dict
+        ):
+            return True
+        """
+        Else if letter_block_recognized is None and level_recognized is None
+        or level_recognized is not equal to level_from_dict
+        or letter_block_recognized is not equal to letter_block_from_dict
+        """
+        return False
+    # Else if length of recognized_number_list not equal 3 - return False
+    return False
+
+
+class BlockLevelPlotMatcher:
+    """
+    Prebuilt matcher of recognized text with the dictionary of block-level plots.
+    Built once from the result of get_simple_dict_block_level_plot_from_file
+    and returns the same key as get_folder_name_from_dict_block_level_plot,
+    but in time proportional to the number of recognized lines instead of
+    the number of keys * window names * recognized lines.
+    Only the exact key is indexed: get_folder_name_from_dict_block_level_plot joins the line with "_",
+    so its check by window name and check_for_match_block_level_plot, which needs 3 words split
+    by spaces, never match, and the result is the first key of the dictionary equal to a normalized line.
+
+    Args:
+        dict_block_level_plot (dict[str, tuple[str, ...]]): A dictionary mapping block-level plot keys
+            to tuples of associated window names.
+            For example:
+                {
+                    "C_L2_Plot_182": ("WC0218", "WC0219", "EDC0201"),
+                    "A_L1_Plot_101": ("WC0101", "WC0102")
+                }
+
+    Values:
+        key_positions (dict[str, int]): Position of the key in the dictionary.
+            Only keys with window names, as keys without window names never match.
+            For example: {"C_L2_Plot_182": 0, "A_L1_Plot_101": 1}
+    """
+
+    def __init__(self, dict_block_level_plot: dict[str, tuple[str, ...]]) -> None:
+        self.dict_block_level_plot = dict_block_level_plot
+        self.key_positions: dict[str, int] = {
+            key: position
+            for position, (key, window_names) in enumerate(dict_block_level_plot.items())
+            # A key without window names is never checked by get_folder_name_from_dict_block_level_plot
+            if window_names
+        }
+
+    def get_matched_keys(self, recognized_word: str) -> set[str]:
+        """
+        Finds all keys matched by one recognized line of text.
+
+        Args:
+            recognized_word (str): The recognized line of text.
+                For example: "C L2 182"
+
+        Returns:
+            matched_keys (set[str]): Keys matched by the recognized line.
+                For example: {'C_L2_Plot_182'}
+        """
+        # 'C_L2_Plot_182'
+        recognized_word_with_plot: str = get_recognized_word_with_plot(recognized_word)
+        # Check if key is equal to recognized_word_with_plot, the normalized line has no spaces,
+        # so the check by window name of get_folder_name_from_dict_block_level_plot never matches
+        if recognized_word_with_plot in self.key_positions:
+            return {recognized_word_with_plot}
+        return set()
+
+    def get_folder_name(self, recognized_text_list: list[str]) -> str | bool:
+        """
+        Determines the folder name to which an image should be moved based on recognized text.
+        The same result as get_folder_name_from_dict_block_level_plot.
+
+        Args:
+            recognized_text_list (list[str]): A list of recognized text strings from the image.
+                For example: ["C L2 182", "Time", "Mon, 24/03/2025 16:04"]
+
+        Returns:
+            str | bool: The name of the folder to move the image to if a match is found,
+            or False if no match is found.
+                For example:
+                    'C_L2_Plot_182'
+                    False
+        """
+        folder_name: str | bool = False
+        for recognized_word in recognized_text_list:
+            for key in self.get_matched_keys(recognized_word):
+                # The first key of the dictionary wins as in get_folder_name_from_dict_block_level_plot
+                if folder_name is False or self.key_positions[key] < self.key_positions[folder_name]:
+                    folder_name = key
+        return folder_name
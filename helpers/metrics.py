@@ -0,0 +1,209 @@
+"""The module contains the per-stage timing metrics of the recognition and their export"""
+
+import json
+import math
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+# Upper bounds of the histogram buckets in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Percentiles of the stage durations in the export
+PERCENTILES: tuple[float, ...] = (0.5, 0.9, 0.99)
+
+
+def get_percentile(sorted_durations: list[float], percentile: float) -> float:
+    """
+    The function returns the percentile of sorted durations by the nearest-rank method.
+
+    Args:
+        sorted_durations (list[float]): Durations in seconds sorted ascending.
+            For example: [0.1, 0.2, 0.3, 0.4]
+
+        percentile (float): Percentile from 0 to 1. For example: 0.9
+
+    Returns:
+        float: The duration of the percentile. For example: 0.4
+    """
+    if not sorted_durations:
+        return 0.0
+    rank: int = max(math.ceil(percentile * len(sorted_durations)), 1)
+    return sorted_durations[rank - 1]
+
+
+class StageMetrics:
+    """
+    Durations of the stages of the recognition: read/decode, crop, OCR detection,
+    OCR recognition, matching and moving. Exported as JSON or in the Prometheus text format.
+
+    Args:
+        buckets (tuple[float, ...]): Upper bounds of the histogram buckets in seconds.
+            By default DEFAULT_BUCKETS.
+
+    Values:
+        durations (dict[str, list[float]]): Stage -> durations of the stage in seconds.
+            For example: {"read_decode": [0.21, 0.19], "ocr_detection": [0.83, 0.91]}
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.durations: dict[str, list[float]] = {}
+
+    def record(self, stage: str, duration: float) -> None:
+        """
+        Records the duration of the stage.
+
+        Args:
+            stage (str): Name of the stage. For example: "ocr_detection"
+
+            duration (float): Duration in seconds. For example: 0.83
+        """
+        self.durations.setdefault(stage, []).append(duration)
+
+    def merge(self, durations: dict[str, list[float]]) -> None:
+        """
+        Adds durations recorded by another StageMetrics, for example in a worker process.
+
+        Args:
+            durations (dict[str, list[float]]): Stage -> durations of the stage in seconds.
+                For example: {"read_decode": [0.21], "ocr_detection": [0.83]}
+        """
+        for stage, stage_durations in durations.items():
+            self.durations.setdefault(stage, []).extend(stage_durations)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Measures the duration of the code inside the with block and records it.
+
+        Args:
+            stage (str): Name of the stage. For example: "ocr_detection"
+        """
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start)
+
+    def get_total(self, stage: str) -> float:
+        """
+        Returns the total duration of the stage in seconds.
+
+        Args:
+            stage (str): Name of the stage. For example: "ocr_detection"
+
+        Returns:
+            float: Total duration in seconds. For example: 1.74
+        """
+        return sum(self.durations.get(stage, []))
+
+    def to_dict(self) -> dict[str, dict[str, object]]:
+        """
+        Returns the statistics of each stage.
+
+        Returns:
+            dict[str, dict[str, object]]: Stage -> statistics of its durations in seconds.
+                For example:
+                    {
+                        "ocr_detection": {
+                            "count": 2,
+                            "sum": 1.74,
+                            "mean": 0.87,
+                            "max": 0.91,
+                            "percentiles": {"0.5": 0.83, "0.9": 0.91, "0.99": 0.91},
+                            "buckets": {"0.5": 0, "1.0": 2, ..., "+Inf": 2},
+                        }
+                    }
+        """
+        statistics: dict[str, dict[str, object]] = {}
+        for stage, durations in self.durations.items():
+            sorted_durations: list[float] = sorted(durations)
+            # Cumulative counts as in the Prometheus histogram
+            buckets: dict[str, int] = {}
+            index: int = 0
+            for bucket in self.buckets:
+                while index < len(sorted_durations) and sorted_durations[index] <= bucket:
+                    index += 1
+                buckets[str(bucket)] = index
+            buckets["+Inf"] = len(sorted_durations)
+            statistics[stage] = {
+                "count": len(sorted_durations),
+                "sum": sum(sorted_durations),
+                "mean": sum(sorted_durations) / len(sorted_durations) if sorted_durations else 0.0,
+                "max": sorted_durations[-1] if sorted_durations else 0.0,
+                "percentiles": {
+                    str(percentile): get_percentile(sorted_durations, percentile) for percentile in PERCENTILES
+                },
+                "buckets": buckets,
+            }
+        return statistics
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text format: the histogram of the stage durations
+        and the gauge of their percentiles.
+
+        Returns:
+            str: Metrics in the Prometheus text format.
+                For example:
+                    # TYPE recognition_stage_duration_seconds histogram
+                    recognition_stage_duration_seconds_bucket{stage="ocr_detection",le="0.5"} 0
+                    ...
+        """
+        lines: list[str] = [
+            "# HELP recognition_stage_duration_seconds Duration of the stage of the recognition of one image.",
+            "# TYPE recognition_stage_duration_seconds histogram",
+        ]
+        statistics: dict[str, dict[str, object]] = self.to_dict()
+        for stage, stage_statistics in statistics.items():
+            for bucket, count in stage_statistics["buckets"].items():
+                lines.append(f'recognition_stage_duration_seconds_bucket{{stage="{stage}",le="{bucket}"}} {count}')
+            lines.append(f'recognition_stage_duration_seconds_sum{{stage="{stage}"}} {stage_statistics["sum"]}')
+            lines.append(f'recognition_stage_duration_seconds_count{{stage="{stage}"}} {stage_statistics["count"]}')
+        lines.append(
+            "# HELP recognition_stage_duration_percentile_seconds Percentile of the duration of the stage."
+        )
+        lines.append("# TYPE recognition_stage_duration_percentile_seconds gauge")
+        for stage, stage_statistics in statistics.items():
+            for percentile, duration in stage_statistics["percentiles"].items():
+                lines.append(
+                    f'recognition_stage_duration_percentile_seconds{{stage="{stage}",percentile="{percentile}"}} '
+                    f"{duration}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def export(self, path_to_file: Path) -> None:
+        """
+        Writes the metrics to the file: in the Prometheus text format if the suffix is ".prom",
+        otherwise as JSON.
+
+        Args:
+            path_to_file (Path): Relative or absolute path to the file.
+                For example: Path("metrics.prom")
+        """
+        if path_to_file.suffix == ".prom":
+            content: str = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=4)
+        with open(path_to_file, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def print_summary(self, amount_images: int, wall_time: float) -> None:
+        """
+        Prints the throughput of the run and the time of each stage.
+
+        Args:
+            amount_images (int): Amount of processed images. For example: 5000
+
+            wall_time (float): Time of the run in seconds. For example: 1250.5
+        """
+        images_per_second: float = amount_images / wall_time if wall_time > 0 else 0.0
+        print(f"Processed images: {amount_images} in {wall_time:.2f} s ({images_per_second:.2f} images/sec)")
+        for stage, stage_statistics in self.to_dict().items():
+            percentiles: dict[str, float] = stage_statistics["percentiles"]
+            print(
+                f"Stage {stage}: total {stage_statistics['sum']:.2f} s, "
+                f"mean {stage_statistics['mean'] * 1000:.1f} ms, "
+                f"p50 {percentiles['0.5'] * 1000:.1f} ms, p99 {percentiles['0.99'] * 1000:.1f} ms"
+            )
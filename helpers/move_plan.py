@@ -0,0 +1,233 @@
+"""The module contains the plan of moves of recognized images: the manifest written instead of moving the images
+and the bulk apply of the manifest, so OCR and moving can run on different computers"""
+
+import argparse
+import csv
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TextIO
+
+from helpers.fuzzy_matcher import FuzzyBlockLevelPlotMatcher
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+
+# Columns of the CSV manifest, the same fields are written to the JSON Lines manifest
+MOVE_PLAN_FIELDS: tuple[str, ...] = ("source", "key", "matched_line", "confidence")
+
+
+def get_move_plan_record(
+    img_full_path: Path,
+    recognized_text_list: list[str],
+    matcher: BlockLevelPlotMatcher,
+    metrics: StageMetrics | None = None,
+) -> dict[str, object]:
+    """
+    The function finds the block-level plot folder by the recognized text of the image as move_recognized_image,
+    but returns the record of the manifest instead of moving the image.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        recognized_text_list (list[str]): Recognized text of the image.
+            For example: ["C L2 182", "Time", "Mon, 24/03/2025 16:04"]
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        metrics (StageMetrics | None): Metrics to record the duration of matching. By default None.
+
+    Returns:
+        record (dict[str, object]): The name of the image in the folder of images, the key or None,
+            the line which matched the key and the score of the match: 1.0 for the exact match,
+            the score of FuzzyBlockLevelPlotMatcher for the fuzzy match.
+            For example:
+                {"source": "AADC5918.JPG", "key": "C_L2_Plot_182", "matched_line": "C L2 182", "confidence": 1.0}
+    """
+    folder_name: str | bool = False
+    confidence: float = 0.0
+    matched_line: str | None = None
+    with metrics.measure("match") if metrics is not None else nullcontext():
+        if isinstance(matcher, FuzzyBlockLevelPlotMatcher):
+            folder_name, confidence = matcher.get_folder_name_with_score(recognized_text_list)
+            # The best score below min_score is not the confidence of an unmatched image
+            confidence = confidence if folder_name else 0.0
+        else:
+            folder_name = matcher.get_folder_name(recognized_text_list)
+            confidence = 1.0 if folder_name else 0.0
+        if folder_name:
+            matched_line = next(
+                (line for line in recognized_text_list if folder_name in matcher.get_matched_keys(line)), None
+            )
+    print(f"Plan image: {img_full_path.name} to folder: {folder_name}")
+    return {
+        "source": img_full_path.name,
+        "key": folder_name or None,
+        "matched_line": matched_line,
+        "confidence": round(confidence, 4),
+    }
+
+
+class MovePlanWriter:
+    """
+    Writer of the manifest of moves: JSON Lines, or CSV if the file has the suffix ".csv".
+    Each record is flushed, so the manifest of an interrupted run keeps the recognized images.
+
+    Args:
+        path_to_plan (Path): Relative or absolute path to the manifest.
+            For example: Path("move_plan.jsonl")
+    """
+
+    def __init__(self, path_to_plan: Path) -> None:
+        self.path_to_plan = path_to_plan
+        self.file: TextIO = open(path_to_plan, "w", encoding="utf-8", newline="")
+        self.csv_writer: csv.DictWriter | None = None
+        if path_to_plan.suffix.lower() == ".csv":
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=MOVE_PLAN_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, record: dict[str, object]) -> None:
+        """
+        Writes the record to the manifest.
+
+        Args:
+            record (dict[str, object]): The record from get_move_plan_record.
+                For example:
+                    {"source": "AADC5918.JPG", "key": "C_L2_Plot_182", "matched_line": "C L2 182", "confidence": 1.0}
+        """
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(record)
+        else:
+            self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+        Closes the file of the manifest.
+        """
+        self.file.close()
+
+
+def read_move_plan(path_to_plan: Path) -> list[dict[str, object]]:
+    """
+    The function reads the manifest written by MovePlanWriter.
+
+    Args:
+        path_to_plan (Path): Relative or absolute path to the manifest.
+            For example: Path("move_plan.jsonl")
+
+    Returns:
+        records (list[dict[str, object]]): Records of the manifest, the key is None for unmatched images.
+            For example:
+                [{"source": "AADC5918.JPG", "key": "C_L2_Plot_182", "matched_line": "C L2 182", "confidence": 1.0}]
+    """
+    records: list[dict[str, object]] = []
+    with open(path_to_plan, "r", encoding="utf-8", newline="") as file:
+        if path_to_plan.suffix.lower() == ".csv":
+            for row in csv.DictReader(file):
+                records.append(
+                    {
+                        "source": row["source"],
+                        "key": row["key"] or None,
+                        "matched_line": row["matched_line"] or None,
+                        "confidence": float(row["confidence"]),
+                    }
+                )
+        else:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # The last line can be broken if the process was killed while writing it
+                    continue
+    return records
+
+
+def move_image_by_plan(img_full_path: Path, abs_path_folder_block_level_plot: Path) -> bool:
+    """
+    The function moves the image of the manifest to the folder of its block-level plot.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        abs_path_folder_block_level_plot (Path): The existing folder of the block-level plot.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/folder_by_block_level_plot/C_L2_Plot_182')
+
+    Returns:
+        bool: True if the image was moved, False if it is not in the folder of images or is already in the target.
+    """
+    try:
+        shutil.move(img_full_path, abs_path_folder_block_level_plot)
+    except (FileNotFoundError, shutil.Error) as error:
+        print(f"Skip image: {img_full_path.name}: {error}")
+        return False
+    return True
+
+
+def apply_move_plan(
+    path_to_plan: Path,
+    folder_images_full_path: Path,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    max_workers: int = 8,
+) -> int:
+    """
+    Moves the images of the manifest to the folders of their block-level plots.
+    The existing folders are read once, and the images are moved by the thread pool.
+    As in move_image_to_folder_block_level_plot, images of keys without a folder are not moved.
+
+    Args:
+        path_to_plan (Path): Relative or absolute path to the manifest.
+            For example: Path("move_plan.jsonl")
+
+        folder_images_full_path (Path): The folder with the images of the manifest.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        max_workers (int): Amount of threads which move the images. By default 8.
+
+    Returns:
+        int: Amount of moved images. For example: 1250
+    """
+    records: list[dict[str, object]] = read_move_plan(path_to_plan)
+    # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/folder_by_block_level_plot')
+    path_target_folders: Path = Path().cwd() / folder_with_target_folders_by_location_apartments
+    existing_folder_names: set[str] = (
+        {path_obj.name for path_obj in path_target_folders.iterdir() if path_obj.is_dir()}
+        if path_target_folders.is_dir()
+        else set()
+    )
+
+    moves: list[tuple[Path, Path]] = []
+    keys_without_folder: set[str] = set()
+    for record in records:
+        key = record["key"]
+        if not key:
+            continue
+        if key in existing_folder_names:
+            moves.append((folder_images_full_path / str(record["source"]), path_target_folders / str(key)))
+        else:
+            keys_without_folder.add(str(key))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        amount_moved: int = sum(executor.map(lambda move: move_image_by_plan(*move), moves))
+
+    if keys_without_folder:
+        print(f"Keys without folder in {path_target_folders}: {sorted(keys_without_folder)}")
+    amount_not_matched: int = sum(not record["key"] for record in records)
+    print(f"Moved images: {amount_moved} of {len(records)} in the plan, not matched: {amount_not_matched}")
+    return amount_moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move the images of the manifest written by main.py --plan")
+    parser.add_argument("plan", type=Path, help="Path to the manifest, JSON Lines or CSV")
+    parser.add_argument("--images", type=Path, default=Path("images_for_recognize"))
+    parser.add_argument("--target", default="folder_by_block_level_plot")
+    parser.add_argument("--workers", type=int, default=8, help="Amount of threads which move the images")
+    arguments = parser.parse_args()
+    apply_move_plan(arguments.plan, arguments.images.resolve(), arguments.target, arguments.workers)
@@ -0,0 +1,292 @@
+"""The module contains the grouping of nearly identical photos, so OCR recognizes one photo of each group"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.recognition import ImageReadError, crop_region_of_interest, read_image_gray
+from helpers.text_localization import get_binary_text, get_text_line_boxes
+
+# Scale of the reduced decoding of the images for the fingerprints, the first line of the stamp stays readable
+FINGERPRINT_DECODE_SCALE: int = 4
+# The difference hash compares neighbouring pixels of the image reduced to (HASH_SIZE + 1) x HASH_SIZE
+HASH_SIZE: int = 8
+
+
+def get_difference_hash(img_gray: NDArray[np.uint8], hash_size: int = HASH_SIZE) -> int:
+    """
+    The function calculates the difference hash (dHash) of the image: each bit is 1 if the pixel
+    of the reduced image is brighter than its right neighbour. Small shifts, noise and JPEG artifacts
+    change few bits, so nearly identical photos have close hashes.
+
+    Args:
+        img_gray (NDArray[np.uint8]): The image in grayscale.
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1008, 756), dtype=uint8)
+
+        hash_size (int): Amount of rows and compared pairs in a row. By default 8, the hash has 64 bits.
+
+    Returns:
+        int: The hash. For example: 17279655951921913868
+    """
+    img_small: NDArray[np.uint8] = cv2.resize(img_gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits: NDArray[np.bool_] = img_small[:, :-1] > img_small[:, 1:]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def get_hamming_distance(first_hash: int, second_hash: int) -> int:
+    """
+    The function returns the amount of different bits of two hashes.
+
+    Args:
+        first_hash (int): For example: 17279655951921913868
+
+        second_hash (int): For example: 17279655951921913869
+
+    Returns:
+        int: For example: 1
+    """
+    return bin(first_hash ^ second_hash).count("1")
+
+
+def get_stamp_first_line(img_gray: NDArray[np.uint8], decode_scale: int) -> NDArray[np.bool_]:
+    """
+    The function returns the strokes of the first line of the stamp with the block, the level and the plot.
+    The stamp is drawn over the photo, so its strokes do not change between shots of the same window.
+
+    Args:
+        img_gray (NDArray[np.uint8]): The image in grayscale.
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1008, 756), dtype=uint8)
+
+        decode_scale (int): Scale of the reduced decoding of the image. For example: 4
+
+    Returns:
+        NDArray[np.bool_]: True on the strokes in the box of the first line, empty if no line is found.
+            For example: array([[False, True, ...], ...], shape=(17, 207))
+    """
+    binary_text: NDArray[np.uint8] = get_binary_text(crop_region_of_interest(img_gray, decode_scale))
+    boxes: list[tuple[int, int, int, int]] = get_text_line_boxes(binary_text)
+    if not boxes:
+        return np.zeros((0, 0), dtype=np.bool_)
+    start_y, end_y, start_x, end_x = boxes[0]
+    return binary_text[start_y:end_y, start_x:end_x] > 0
+
+
+def get_stamp_difference(first_line: NDArray[np.bool_], second_line: NDArray[np.bool_]) -> float:
+    """
+    The function compares the first lines of two stamps: the part of the strokes which differ.
+    One different character of the line differs by about 0.07, the same line by less than 0.01.
+
+    Args:
+        first_line (NDArray[np.bool_]): Strokes of the first line of the stamp from get_stamp_first_line.
+
+        second_line (NDArray[np.bool_]): Strokes of the first line of the other stamp.
+
+    Returns:
+        float: From 0 for the same strokes to 1, and 1 if a line is not found
+            or the boxes of the lines differ by more than 2 pixels. For example: 0.005
+    """
+    if first_line.size == 0 or second_line.size == 0:
+        return 1.0
+    if abs(first_line.shape[0] - second_line.shape[0]) > 2 or abs(first_line.shape[1] - second_line.shape[1]) > 2:
+        return 1.0
+    height: int = min(first_line.shape[0], second_line.shape[0])
+    width: int = min(first_line.shape[1], second_line.shape[1])
+    first_line, second_line = first_line[:height, :width], second_line[:height, :width]
+    amount_strokes: int = np.count_nonzero(first_line | second_line)
+    return np.count_nonzero(first_line ^ second_line) / amount_strokes if amount_strokes else 1.0
+
+
+class ImageFingerprint:
+    """
+    Fingerprint of the photo for the search of nearly identical photos.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        decode_scale (int): Scale of the reduced decoding of the image. By default FINGERPRINT_DECODE_SCALE.
+
+    Values:
+        image_hash (int | None): The difference hash of the whole photo, None if the image is not readable.
+            For example: 17279655951921913868
+
+        stamp_line (NDArray[np.bool_]): Strokes of the first line of the stamp.
+    """
+
+    def __init__(self, img_full_path: Path, decode_scale: int = FINGERPRINT_DECODE_SCALE) -> None:
+        self.img_full_path = img_full_path
+        self.image_hash: int | None = None
+        self.stamp_line: NDArray[np.bool_] = np.zeros((0, 0), dtype=np.bool_)
+        try:
+            img_gray: NDArray[np.uint8] = read_image_gray(img_full_path, decode_scale)
+        except ImageReadError:
+            return
+        self.image_hash = get_difference_hash(img_gray)
+        self.stamp_line = get_stamp_first_line(img_gray, decode_scale)
+
+
+class MultiIndexHashTable:
+    """
+    Index of hashes for the search within the Hamming distance. The hash is split into max_distance + 1
+    chunks, and hashes within the distance have at least one equal chunk, so the search looks up
+    max_distance + 1 tables instead of comparing with every hash.
+
+    Args:
+        max_distance (int): The largest Hamming distance of the search. For example: 6
+
+        hash_bits (int): Amount of bits of the hashes. By default HASH_SIZE * HASH_SIZE.
+
+    Values:
+        chunk_bounds (list[tuple[int, int]]): The shift and the amount of bits of each chunk.
+            For example: [(0, 10), (10, 9), (19, 9), ...]
+
+        tables (list[dict[int, list[int]]]): Value of the chunk -> indexes of the hashes, for each chunk.
+
+        hashes (list[int]): Added hashes by their index.
+    """
+
+    def __init__(self, max_distance: int, hash_bits: int = HASH_SIZE * HASH_SIZE) -> None:
+        self.max_distance = max_distance
+        amount_chunks: int = min(max_distance + 1, hash_bits)
+        self.chunk_bounds: list[tuple[int, int]] = []
+        shift: int = 0
+        for index in range(amount_chunks):
+            chunk_bits: int = hash_bits // amount_chunks + (1 if index < hash_bits % amount_chunks else 0)
+            self.chunk_bounds.append((shift, chunk_bits))
+            shift += chunk_bits
+        self.tables: list[dict[int, list[int]]] = [{} for _ in self.chunk_bounds]
+        self.hashes: list[int] = []
+
+    def get_chunks(self, hash_value: int) -> list[int]:
+        """
+        Splits the hash into chunks.
+
+        Args:
+            hash_value (int): For example: 17279655951921913868
+
+        Returns:
+            list[int]: Values of the chunks. For example: [524, 913, 301, ...]
+        """
+        return [(hash_value >> shift) & ((1 << chunk_bits) - 1) for shift, chunk_bits in self.chunk_bounds]
+
+    def add(self, hash_value: int) -> int:
+        """
+        Adds the hash to the index.
+
+        Args:
+            hash_value (int): For example: 17279655951921913868
+
+        Returns:
+            int: Index of the hash. For example: 0
+        """
+        index: int = len(self.hashes)
+        self.hashes.append(hash_value)
+        for table, chunk in zip(self.tables, self.get_chunks(hash_value)):
+            table.setdefault(chunk, []).append(index)
+        return index
+
+    def search(self, hash_value: int) -> list[int]:
+        """
+        Finds hashes within max_distance from the hash.
+
+        Args:
+            hash_value (int): For example: 17279655951921913869
+
+        Returns:
+            list[int]: Indexes of the found hashes in the order of adding. For example: [0, 3]
+        """
+        candidates: set[int] = set()
+        for table, chunk in zip(self.tables, self.get_chunks(hash_value)):
+            candidates.update(table.get(chunk, ()))
+        return sorted(
+            index
+            for index in candidates
+            if get_hamming_distance(hash_value, self.hashes[index]) <= self.max_distance
+        )
+
+
+def cluster_near_duplicate_images(
+    img_full_paths: list[Path],
+    max_distance: int = 6,
+    max_stamp_difference: float = 0.03,
+    decode_scale: int = FINGERPRINT_DECODE_SCALE,
+    max_workers: int = 8,
+) -> list[list[Path]]:
+    """
+    Groups nearly identical photos: the difference hashes of the photos are within max_distance
+    and the first lines of the stamps are the same. The first photo of each group is its representative,
+    the other photos of the group are within the distance of it.
+    Fingerprints are calculated in the thread pool from the reduced decoding of the images.
+
+    Args:
+        img_full_paths (list[Path]): Abs paths to the images.
+            For example:
+                [WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')]
+
+        max_distance (int): The largest Hamming distance of the 64-bit hashes. By default 6.
+
+        max_stamp_difference (float): The largest difference of the first lines of the stamps. By default 0.03.
+
+        decode_scale (int): Scale of the reduced decoding of the images. By default FINGERPRINT_DECODE_SCALE.
+
+        max_workers (int): Amount of threads which read the images. By default 8.
+
+    Returns:
+        clusters (list[list[Path]]): Groups of photos in the order of img_full_paths, the representative first.
+            For example:
+                [
+                    [
+                        WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images/IMG_0001.JPG'),
+                        WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images/IMG_0002.JPG'),
+                    ],
+                    [WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images/IMG_0003.JPG')],
+                ]
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fingerprints: list[ImageFingerprint] = list(
+            executor.map(lambda img_full_path: ImageFingerprint(img_full_path, decode_scale), img_full_paths)
+        )
+
+    hash_table = MultiIndexHashTable(max_distance)
+    clusters: list[list[Path]] = []
+    # Fingerprints of the representatives and their clusters by the index of the hash in hash_table
+    representatives: list[ImageFingerprint] = []
+    representative_clusters: list[list[Path]] = []
+    for fingerprint in fingerprints:
+        if fingerprint.image_hash is None:
+            clusters.append([fingerprint.img_full_path])
+            continue
+        for index in hash_table.search(fingerprint.image_hash):
+            stamp_difference: float = get_stamp_difference(representatives[index].stamp_line, fingerprint.stamp_line)
+            if stamp_difference <= max_stamp_difference:
+                representative_clusters[index].append(fingerprint.img_full_path)
+                break
+        else:
+            hash_table.add(fingerprint.image_hash)
+            representatives.append(fingerprint)
+            representative_clusters.append([fingerprint.img_full_path])
+            clusters.append(representative_clusters[-1])
+    return clusters
+
+
+def get_representative_by_path(clusters: list[list[Path]]) -> dict[Path, Path]:
+    """
+    The function maps each photo of the groups to the representative of its group.
+
+    Args:
+        clusters (list[list[Path]]): Groups of photos from cluster_near_duplicate_images.
+
+    Returns:
+        dict[Path, Path]: Photo -> representative. For example:
+            {
+                WindowsPath('D:/images/IMG_0001.JPG'): WindowsPath('D:/images/IMG_0001.JPG'),
+                WindowsPath('D:/images/IMG_0002.JPG'): WindowsPath('D:/images/IMG_0001.JPG'),
+            }
+    """
+    return {img_full_path: cluster[0] for cluster in clusters for img_full_path in cluster}
@@ -0,0 +1,605 @@
+"""The module contains OCR backends which recognize text lines on the region of interest"""
+
+import argparse
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+from helpers.recognition import (
+    crop_region_of_interest,
+    get_paddle_ocr,
+    get_text_crops_from_roi,
+    read_image_gray,
+    recognize_text_crops,
+)
+from helpers.text_localization import get_binary_text, get_text_line_boxes, get_text_line_strips
+
+if TYPE_CHECKING:
+    # PaddleOCR is created by get_paddle_ocr, the stamp backend works without paddleocr
+    from paddleocr import PaddleOCR
+
+# Size of the normalized glyph compared with the templates
+GLYPH_SIZE: int = 20
+# Lines rendered for the templates of the Hershey font, capital letters set the height of punctuation
+STAMP_CHARACTERS: tuple[str, ...] = (
+    "ABCDEFGHIJKLM",
+    "NOPQRSTUVWXYZ",
+    "abcdefghijklm",
+    "nopqrstuvwxyz",
+    "0123456789",
+    "A,B.C/D:E-F",
+)
+
+
+class OcrBackend(Protocol):
+    """
+    Engine which detects and recognizes text lines on the region of interest.
+    """
+
+    def recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> list[tuple[str, float]]:
+        """
+        Recognizes text lines from top to bottom with the confidence of each line from 0 to 1.
+        """
+        ...
+
+    def iter_recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> Iterator[tuple[str, float]]:
+        """
+        Recognizes text lines one by one from top to bottom, the next line only when it is requested.
+        """
+        ...
+
+    def recognize(self, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        """
+        Recognizes text lines from top to bottom.
+        """
+        ...
+
+
+class PaddleOcrBackend:
+    """
+    PaddleOCR with detection of text lines, the angle classifier and the recognizer.
+    The same recognized text as recognize_text_from_image.
+    With localize_text the detector is skipped: the stamp lines are found by get_text_line_strips
+    and only their strips go to the angle classifier and the recognizer.
+
+    Args:
+        ocr (PaddleOCR | None): Экземпляр класса PaddleOCR. By default None - created by get_paddle_ocr
+            on the first recognition, so the models are not loaded if every image is in the cache.
+
+        localize_text (bool): Find the stamp lines without the detector. By default False.
+    """
+
+    def __init__(self, ocr: "PaddleOCR | None" = None, localize_text: bool = False) -> None:
+        self.ocr = ocr
+        self.localize_text = localize_text
+
+    def get_ocr(self) -> "PaddleOCR":
+        """
+        Returns the PaddleOCR instance, creates it on the first call.
+
+        Returns:
+            ocr (PaddleOCR): Экземпляр класса PaddleOCR
+        """
+        if self.ocr is None:
+            self.ocr = get_paddle_ocr()
+        return self.ocr
+
+    def recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> list[tuple[str, float]]:
+        """
+        Recognizes text lines from top to bottom with the score of each line.
+
+        Args:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+                For example:
+                    array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+        Returns:
+            list[tuple[str, float]]: Text and score of each line with the score not less than ocr.drop_score.
+                For example: [('C L2 182 wC0214', 0.98), ('Time', 0.99)]
+        """
+        rec_res: list[tuple[str, float]] = recognize_text_crops(self.get_ocr(), self.get_text_crops(coordinates_roi))
+        return [(text, float(score)) for text, score in rec_res if score >= self.get_ocr().drop_score]
+
+    def iter_recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> Iterator[tuple[str, float]]:
+        """
+        Detects all text lines, then recognizes them one by one from top to bottom.
+        Each line is a separate call of the recognizer, so stopping early skips the recognition of the rest.
+
+        Args:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+                For example:
+                    array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+        Yields:
+            tuple[str, float]: Text and score of the line with the score not less than ocr.drop_score.
+                For example: ('C L2 182 wC0214', 0.98)
+        """
+        for text_crop in self.get_text_crops(coordinates_roi):
+            for text, score in recognize_text_crops(self.get_ocr(), [text_crop]):
+                if score >= self.get_ocr().drop_score:
+                    yield text, float(score)
+
+    def get_text_crops(self, coordinates_roi: NDArray[np.uint8]) -> list[NDArray[np.uint8]]:
+        """
+        Crops text lines from top to bottom by the detector or by get_text_line_strips.
+        If get_text_line_strips finds no usable lines, the detector crops them from the full region.
+
+        Args:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+
+        Returns:
+            text_crops (list[NDArray[np.uint8]]): Crops of text lines.
+                For example:
+                    [array([[[255, 255, 255], ...]], shape=(48, 412, 3), dtype=uint8)]
+        """
+        if self.localize_text:
+            text_strips: list[NDArray[np.uint8]] = get_text_line_strips(coordinates_roi)
+            if text_strips:
+                return text_strips
+        return get_text_crops_from_roi(self.get_ocr(), coordinates_roi)
+
+    def recognize(self, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        return [text for text, _ in self.recognize_with_scores(coordinates_roi)]
+
+
+def get_line_glyphs(binary_line: NDArray[np.uint8]) -> list[tuple[int, int, int, int]]:
+    """
+    The function finds glyphs of the text line. Components which overlap horizontally,
+    for example the dot and the stem of "i", are one glyph.
+
+    Args:
+        binary_line (NDArray[np.uint8]): The band of one text line from get_binary_text.
+
+    Returns:
+        glyphs (list[tuple[int, int, int, int]]): x, y, width and height of each glyph from left to right.
+            For example: [(12, 3, 18, 30), (34, 3, 17, 30)]
+    """
+    amount, _, stats, _ = cv2.connectedComponentsWithStats(binary_line, connectivity=8)
+    min_area: int = max(2, (binary_line.shape[0] // 30) ** 2)
+    boxes: list[list[int]] = sorted(
+        [x, y, x + width, y + height]
+        for x, y, width, height, area in stats[1:amount].tolist()
+        if area >= min_area
+    )
+    glyphs: list[list[int]] = []
+    for box in boxes:
+        if glyphs:
+            last: list[int] = glyphs[-1]
+            overlap: int = min(last[2], box[2]) - max(last[0], box[0])
+            if overlap >= min(last[2] - last[0], box[2] - box[0]) // 2:
+                glyphs[-1] = [min(last[0], box[0]), min(last[1], box[1]), max(last[2], box[2]), max(last[3], box[3])]
+                continue
+        glyphs.append(box)
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in glyphs]
+
+
+def get_glyph_features(
+    binary_line: NDArray[np.uint8], glyphs: list[tuple[int, int, int, int]]
+) -> tuple[NDArray[np.float32], NDArray[np.float32]]:
+    """
+    The function normalizes the glyphs of the text line for the comparison with the templates.
+
+    Args:
+        binary_line (NDArray[np.uint8]): The band of one text line from get_binary_text.
+
+        glyphs (list[tuple[int, int, int, int]]): x, y, width and height of each glyph from get_line_glyphs.
+
+    Returns:
+        tuple[NDArray[np.float32], NDArray[np.float32]]: Zero-mean unit-norm images of the glyphs
+            with the shape (amount, GLYPH_SIZE * GLYPH_SIZE), and the height and the distance from the bottom
+            to the baseline relative to the height of capital letters, with the shape (amount, 2).
+    """
+    heights: NDArray[np.float32] = np.array([height for _, _, _, height in glyphs], dtype=np.float32)
+    bottoms: NDArray[np.float32] = np.array([y + height for _, y, _, height in glyphs], dtype=np.float32)
+    # Most glyphs of the line are capital letters and digits, and most of them stand on the baseline
+    capital_height: float = max(float(np.percentile(heights, 75)), 1.0)
+    baseline: float = float(np.median(bottoms))
+    geometry: NDArray[np.float32] = np.stack(
+        (heights / capital_height, (bottoms - baseline) / capital_height), axis=1
+    )
+
+    images: NDArray[np.float32] = np.zeros((len(glyphs), GLYPH_SIZE * GLYPH_SIZE), dtype=np.float32)
+    for index, (x, y, width, height) in enumerate(glyphs):
+        # Pad to the square with a margin, so the aspect ratio of "0" and "O" is kept
+        # and the glyph which fills its box, as ".", still differs from the background
+        side: int = max(width, height) + max(width, height) // 4 + 2
+        top: int = (side - height) // 2
+        left: int = (side - width) // 2
+        square: NDArray[np.uint8] = np.zeros((side, side), dtype=np.uint8)
+        square[top:top + height, left:left + width] = binary_line[y:y + height, x:x + width]
+        images[index] = cv2.resize(square, (GLYPH_SIZE, GLYPH_SIZE), interpolation=cv2.INTER_AREA).ravel()
+    images -= images.mean(axis=1, keepdims=True)
+    norms: NDArray[np.float32] = np.linalg.norm(images, axis=1, keepdims=True)
+    np.divide(images, norms, out=images, where=norms > 0)
+    return images, geometry
+
+
+class StampTemplateOcrBackend:
+    """
+    Recognizer of the camera stamp by templates of the glyphs of its fixed font.
+    Lines are found by the horizontal projection of the bright strokes, glyphs by connected components,
+    and each glyph is the template with the highest correlation. Takes about 70-90 ms per region of 1900x1800
+    on one CPU core, about half of it in get_binary_text.
+    The confidence of the line is the correlation of its worst glyph, and 0 if the band of the line is much
+    higher than its glyphs, as the band of several merged lines.
+
+    Args:
+        characters (list[str]): Character of each template. For example: ["A", "B", "C"]
+
+        template_images (NDArray[np.float32]): Images of the templates from get_glyph_features.
+
+        template_geometry (NDArray[np.float32]): Height and position of the templates from get_glyph_features.
+
+        space_ratio (float): A gap wider than this part of the height of capital letters is a space.
+            By default 0.45.
+
+        max_line_height_ratio (float): Highest height of the band of the line relative to the height
+            of capital letters. By default 2.0.
+    """
+
+    def __init__(
+        self,
+        characters: list[str],
+        template_images: NDArray[np.float32],
+        template_geometry: NDArray[np.float32],
+        space_ratio: float = 0.45,
+        max_line_height_ratio: float = 2.0,
+    ) -> None:
+        self.characters = characters
+        self.template_images = template_images
+        self.template_geometry = template_geometry
+        self.space_ratio = space_ratio
+        self.max_line_height_ratio = max_line_height_ratio
+
+    @classmethod
+    def from_samples(cls, samples: list[tuple[NDArray[np.uint8], str]]) -> "StampTemplateOcrBackend":
+        """
+        Creates the recognizer with templates cut from images of text lines with known text.
+
+        Args:
+            samples (list[tuple[NDArray[np.uint8], str]]): Image of one text line and its text.
+                For example: [(array([[ 95, 100, ...]], shape=(60, 640), dtype=uint8), "C L2 182 wC0214")]
+
+        Raises:
+            ValueError: If the amount of glyphs found on the sample differs from the amount of characters.
+
+        Returns:
+            StampTemplateOcrBackend: The recognizer.
+        """
+        characters: list[str] = []
+        template_images: list[NDArray[np.float32]] = []
+        template_geometry: list[NDArray[np.float32]] = []
+        # Gaps between glyphs inside words and gaps with spaces, relative to the height of capital letters
+        letter_gaps: list[float] = []
+        space_gaps: list[float] = []
+        for sample, text in samples:
+            # The sample is one line, its strokes are much thinner than its height
+            binary_line: NDArray[np.uint8] = get_binary_text(sample, max(sample.shape[0] // 2, 3))
+            glyphs: list[tuple[int, int, int, int]] = get_line_glyphs(binary_line)
+            text_characters: str = text.replace(" ", "")
+            if len(glyphs) != len(text_characters):
+                raise ValueError(f"Found {len(glyphs)} glyphs on the sample of {len(text_characters)}: {text!r}")
+            images, geometry = get_glyph_features(binary_line, glyphs)
+            characters.extend(text_characters)
+            template_images.append(images)
+            template_geometry.append(geometry)
+            capital_height: float = max(float(np.percentile([glyph[3] for glyph in glyphs], 75)), 1.0)
+            words_lengths: list[int] = [len(word) for word in text.split()]
+            # Indexes of the glyphs which follow a space
+            after_space: set[int] = set(np.cumsum(words_lengths)[:-1].tolist())
+            for index in range(1, len(glyphs)):
+                gap: float = (glyphs[index][0] - glyphs[index - 1][0] - glyphs[index - 1][2]) / capital_height
+                (space_gaps if index in after_space else letter_gaps).append(gap)
+        space_ratio: float = 0.45
+        if letter_gaps and space_gaps:
+            space_ratio = (max(letter_gaps) + min(space_gaps)) / 2
+        return cls(characters, np.concatenate(template_images), np.concatenate(template_geometry), space_ratio)
+
+    @classmethod
+    def from_hershey_font(cls, line_height: int = 60) -> "StampTemplateOcrBackend":
+        """
+        Creates the recognizer for stamps rendered by cv2.putText with the FONT_HERSHEY_SIMPLEX font,
+        as the synthetic images of benchmark.py.
+
+        Args:
+            line_height (int): Height of the rendered lines of the templates. By default 60.
+
+        Returns:
+            StampTemplateOcrBackend: The recognizer.
+        """
+        samples: list[tuple[NDArray[np.uint8], str]] = []
+        for text in STAMP_CHARACTERS + ("C L2 182 wC0214",):
+            font_scale: float = line_height / 30
+            thickness: int = max(line_height // 12, 1)
+            (width, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+            sample: NDArray[np.uint8] = np.zeros((line_height * 2, width + line_height * 2), dtype=np.uint8)
+            cv2.putText(
+                sample, text, (line_height, line_height * 3 // 2), cv2.FONT_HERSHEY_SIMPLEX, font_scale, 255, thickness
+            )
+            samples.append((sample, text))
+        return cls.from_samples(samples)
+
+    @classmethod
+    def from_folder(cls, folder_templates: Path) -> "StampTemplateOcrBackend":
+        """
+        Loads the recognizer saved by save.
+
+        Args:
+            folder_templates (Path): Folder with the templates. For example: Path("info/stamp_templates")
+
+        Returns:
+            StampTemplateOcrBackend: The recognizer.
+        """
+        with open(folder_templates / "templates.json", "r", encoding="utf-8") as file:
+            description: dict[str, object] = json.load(file)
+        data = np.load(folder_templates / "templates.npz")
+        return cls(
+            description["characters"], data["template_images"], data["template_geometry"], description["space_ratio"]
+        )
+
+    def save(self, folder_templates: Path) -> None:
+        """
+        Saves the templates to the folder.
+
+        Args:
+            folder_templates (Path): Folder for the templates. For example: Path("info/stamp_templates")
+        """
+        folder_templates.mkdir(parents=True, exist_ok=True)
+        with open(folder_templates / "templates.json", "w", encoding="utf-8") as file:
+            json.dump({"characters": self.characters, "space_ratio": self.space_ratio}, file, ensure_ascii=False)
+        np.savez_compressed(
+            folder_templates / "templates.npz",
+            template_images=self.template_images,
+            template_geometry=self.template_geometry,
+        )
+
+    def recognize_line(self, binary_line: NDArray[np.uint8]) -> tuple[str, float]:
+        """
+        Recognizes one text line.
+
+        Args:
+            binary_line (NDArray[np.uint8]): The band of one text line from get_binary_text.
+
+        Returns:
+            tuple[str, float]: Text and confidence of the line. For example: ('C L2 182 wC0214', 0.93)
+        """
+        glyphs: list[tuple[int, int, int, int]] = get_line_glyphs(binary_line)
+        if not glyphs:
+            return "", 0.0
+        images, geometry = get_glyph_features(binary_line, glyphs)
+        # Correlation of each glyph with each template, lowered by the difference of the height and position
+        scores: NDArray[np.float32] = images @ self.template_images.T - 0.5 * np.abs(
+            geometry[:, None, :] - self.template_geometry[None, :, :]
+        ).sum(axis=2)
+        best_templates: NDArray[np.intp] = scores.argmax(axis=1)
+        best_scores: NDArray[np.float32] = scores[np.arange(len(glyphs)), best_templates]
+
+        characters: list[str] = [self.characters[template] for template in best_templates]
+        # "I" and "l" are the same stroke in many stamp fonts, the neighbouring letters decide
+        for index, character in enumerate(characters):
+            if character in ("I", "l"):
+                neighbours: list[str] = characters[max(index - 1, 0):index] + characters[index + 1:index + 2]
+                characters[index] = "l" if any(neighbour.islower() for neighbour in neighbours) else "I"
+
+        capital_height: float = max(float(np.percentile([glyph[3] for glyph in glyphs], 75)), 1.0)
+        text: str = characters[0]
+        for index in range(1, len(glyphs)):
+            gap: int = glyphs[index][0] - glyphs[index - 1][0] - glyphs[index - 1][2]
+            if gap > self.space_ratio * capital_height:
+                text += " "
+            text += characters[index]
+        # The band of several lines merged into one is not a line of the stamp
+        if binary_line.shape[0] > self.max_line_height_ratio * capital_height:
+            return text, 0.0
+        return text, float(np.clip(best_scores.min(), 0.0, 1.0))
+
+    def recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> list[tuple[str, float]]:
+        """
+        Recognizes text lines from top to bottom with the confidence of each line.
+
+        Args:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+                For example:
+                    array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+        Returns:
+            list[tuple[str, float]]: Text and confidence of each line.
+                For example: [('C L2 182 wC0214', 0.93), ('Time', 0.95)]
+        """
+        return list(self.iter_recognize_with_scores(coordinates_roi))
+
+    def iter_recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> Iterator[tuple[str, float]]:
+        """
+        Recognizes text lines one by one from top to bottom.
+
+        Args:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+
+        Yields:
+            tuple[str, float]: Text and confidence of the line. For example: ('C L2 182 wC0214', 0.93)
+        """
+        binary_text: NDArray[np.uint8] = get_binary_text(coordinates_roi)
+        for start_y, end_y, start_x, end_x in get_text_line_boxes(binary_text):
+            text, confidence = self.recognize_line(binary_text[start_y:end_y, start_x:end_x])
+            if text:
+                yield text, confidence
+
+    def recognize(self, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        return [text for text, _ in self.recognize_with_scores(coordinates_roi)]
+
+
+class FallbackOcrBackend:
+    """
+    Recognizes with the fast backend and falls back to the accurate backend
+    if the fast one found less than min_lines lines or the confidence of any line is low.
+    The stamp has about ten lines, so one line with high confidence is rather a stroke of the photo,
+    for example a window frame recognized as "I", than the stamp.
+
+    Args:
+        fast_backend (OcrBackend): For example: StampTemplateOcrBackend
+
+        accurate_backend (OcrBackend): For example: PaddleOcrBackend
+
+        min_confidence (float): Lowest confidence of the lines of the fast backend. By default 0.8.
+
+        min_lines (int): Lowest amount of lines of the fast backend. By default 2.
+
+    Values:
+        amount_fallbacks (int): Amount of regions recognized by the accurate backend. For example: 3
+    """
+
+    def __init__(
+        self,
+        fast_backend: OcrBackend,
+        accurate_backend: OcrBackend,
+        min_confidence: float = 0.8,
+        min_lines: int = 2,
+    ) -> None:
+        self.fast_backend = fast_backend
+        self.accurate_backend = accurate_backend
+        self.min_confidence = min_confidence
+        self.min_lines = max(min_lines, 1)
+        self.amount_fallbacks: int = 0
+
+    def recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> list[tuple[str, float]]:
+        lines: list[tuple[str, float]] = self.fast_backend.recognize_with_scores(coordinates_roi)
+        if len(lines) >= self.min_lines and min(confidence for _, confidence in lines) >= self.min_confidence:
+            return lines
+        self.amount_fallbacks += 1
+        return self.accurate_backend.recognize_with_scores(coordinates_roi)
+
+    def iter_recognize_with_scores(self, coordinates_roi: NDArray[np.uint8]) -> Iterator[tuple[str, float]]:
+        """
+        Yields lines of the fast backend until a line with low confidence,
+        then all lines of the accurate backend from the top, so the first lines can be yielded twice.
+        The first min_lines lines are yielded only when all of them are found.
+
+        Args:
+            coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+
+        Yields:
+            tuple[str, float]: Text and confidence of the line. For example: ('C L2 182 wC0214', 0.93)
+        """
+        first_lines: list[tuple[str, float]] = []
+        for text, confidence in self.fast_backend.iter_recognize_with_scores(coordinates_roi):
+            if confidence < self.min_confidence:
+                break
+            if len(first_lines) < self.min_lines:
+                first_lines.append((text, confidence))
+                if len(first_lines) == self.min_lines:
+                    yield from first_lines
+                continue
+            yield text, confidence
+        else:
+            if len(first_lines) >= self.min_lines:
+                return
+        self.amount_fallbacks += 1
+        yield from self.accurate_backend.iter_recognize_with_scores(coordinates_roi)
+
+    def recognize(self, coordinates_roi: NDArray[np.uint8]) -> list[str]:
+        return [text for text, _ in self.recognize_with_scores(coordinates_roi)]
+
+
+def recognize_until_match(
+    ocr_backend: OcrBackend, coordinates_roi: NDArray[np.uint8], matcher: BlockLevelPlotMatcher
+) -> list[str]:
+    """Function to recognize text lines from top to bottom until a line matches a key of the dictionary.
+    The block-level plot line is the first line of the stamp, so the lines under it are not recognized.
+    If several lines match, the key from the first matching line is kept,
+    while get_folder_name checks all lines.
+
+    Args:
+        ocr_backend (OcrBackend): The OCR backend. For example: PaddleOcrBackend
+
+        coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+    Returns:
+        recognized_text_list (list[str]): Recognized lines up to the matching line.
+            For example: ["C L2 182 wC0214"]
+    """
+    recognized_text_list: list[str] = []
+    for text, _ in ocr_backend.iter_recognize_with_scores(coordinates_roi):
+        recognized_text_list.append(text)
+        if matcher.get_matched_keys(text):
+            break
+    return recognized_text_list
+
+
+def recognize_image_with_backend(
+    ocr_backend: OcrBackend,
+    img_full_path: Path,
+    metrics: StageMetrics,
+    decode_scale: int = 1,
+    matcher: BlockLevelPlotMatcher | None = None,
+) -> list[str]:
+    """Function to read the image and recognize text on its region of interest with the OCR backend,
+    recording the duration of each stage: read_decode, crop and ocr.
+    With the matcher the recognition stops at the first line which matches a key of the dictionary.
+
+    Args:
+        ocr_backend (OcrBackend): The OCR backend. For example: FallbackOcrBackend
+
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        metrics (StageMetrics): Metrics to record the durations of the stages.
+
+        decode_scale (int, optional): Decode the image with the resolution reduced by 1, 2, 4 or 8 times.
+            Defaults to 1.
+
+        matcher (BlockLevelPlotMatcher | None, optional): Matcher for the early exit. Defaults to None.
+
+    Returns:
+        recognized_text_list (list[str]): Recognized text of the image.
+            For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"]
+    """
+    with metrics.measure("read_decode"):
+        img_gray: NDArray[np.uint8] = read_image_gray(img_full_path, decode_scale)
+    with metrics.measure("crop"):
+        coordinates_roi: NDArray[np.uint8] = crop_region_of_interest(img_gray, decode_scale)
+    with metrics.measure("ocr"):
+        recognized_text_list: list[str] = (
+            recognize_until_match(ocr_backend, coordinates_roi, matcher)
+            if matcher is not None
+            else ocr_backend.recognize(coordinates_roi)
+        )
+    return recognized_text_list
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save the templates of the stamp font for main.py --ocr-backend stamp")
+    parser.add_argument("folder", type=Path, help="Folder for the templates, for example info/stamp_templates")
+    parser.add_argument(
+        "--samples",
+        type=Path,
+        default=None,
+        help="JSON file: path to the image of one stamp line -> its text. By default the Hershey font of cv2.putText",
+    )
+    parser.add_argument("--line-height", type=int, default=60, help="Height of the lines of the Hershey font")
+    arguments = parser.parse_args()
+
+    if arguments.samples is None:
+        stamp_backend: StampTemplateOcrBackend = StampTemplateOcrBackend.from_hershey_font(arguments.line_height)
+    else:
+        with open(arguments.samples, "r", encoding="utf-8") as file:
+            texts_by_path: dict[str, str] = json.load(file)
+        stamp_backend = StampTemplateOcrBackend.from_samples(
+            [
+                (read_image_gray(arguments.samples.parent / path_to_sample), text)
+                for path_to_sample, text in texts_by_path.items()
+            ]
+        )
+    stamp_backend.save(arguments.folder)
+    print(f"Templates of {len(stamp_backend.characters)} glyphs saved to {arguments.folder}")
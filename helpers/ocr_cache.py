@@ -0,0 +1,223 @@
+"""The module contains the on-disk cache of recognized text keyed by the content hash of the image"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+# Eviction removes entries down to this part of max_size_bytes, so the database is vacuumed once per many entries
+EVICTION_TARGET_RATIO: float = 0.9
+# Bytes of the numbers of the entry in the table and the indexes: the size, the time of the last access and rowids
+ENTRY_NUMBERS_SIZE: int = 32
+# Times of the last access of the read entries are written in one transaction after this amount of reads,
+# so a cache hit does not commit and sync the database
+LAST_ACCESS_FLUSH_INTERVAL: int = 256
+
+
+def get_file_hash(img_full_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    The function calculates the content hash of the file reading it by chunks.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        chunk_size (int): Size of the chunk to read in bytes. By default 1 MB.
+
+    Returns:
+        file_hash (str): SHA-256 of the file content.
+            For example: '9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'
+    """
+    hash_file = hashlib.sha256()
+    with open(img_full_path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            hash_file.update(chunk)
+    return hash_file.hexdigest()
+
+
+def get_entry_size(file_hash: str, parameters_hash: str, recognized_text: str) -> int:
+    """
+    The function returns the size of the entry of the cache in the database: the hashes in the table
+    and in the index of the primary key, the text and the numbers.
+
+    Args:
+        file_hash (str): SHA-256 of the image content.
+
+        parameters_hash (str): Hash of the region of interest and OCR parameters.
+
+        recognized_text (str): Recognized text in JSON. For example: '["C L2 182", "Time"]'
+
+    Returns:
+        int: Size in bytes. For example: 328
+    """
+    return (
+        2 * len(file_hash.encode("utf-8"))
+        + 2 * len(parameters_hash.encode("utf-8"))
+        + len(recognized_text.encode("utf-8"))
+        + ENTRY_NUMBERS_SIZE
+    )
+
+
+def get_parameters_hash(parameters: dict[str, object]) -> str:
+    """
+    The function calculates the hash of the region of interest and OCR parameters.
+
+    Args:
+        parameters (dict[str, object]): Parameters which change the recognized text.
+            For example: {"decode_scale": 1, "width_block_for_recognition": 1900, "lang": "en"}
+
+    Returns:
+        parameters_hash (str): SHA-256 of the parameters.
+            For example: '2c26b46b68ffc68ff99b453c1d30413413422d706483bfa0f98a5e886266e7ae'
+    """
+    parameters_json: str = json.dumps(parameters, sort_keys=True)
+    return hashlib.sha256(parameters_json.encode("utf-8")).hexdigest()
+
+
+class OcrCache:
+    """
+    On-disk cache of recognized text in the SQLite database.
+    The key is the content hash of the image and the hash of the region of interest and OCR parameters,
+    so re-runs skip OCR for unchanged images. When the size of the entries exceeds max_size_bytes,
+    the least recently used entries are removed down to EVICTION_TARGET_RATIO of it
+    and the database is vacuumed, so the file shrinks too. The times of the last access of cache hits
+    are kept in memory and written by flush_last_access, before each write of the cache and on close.
+
+    Args:
+        path_to_db (Path): Relative or absolute path to the SQLite database.
+            For example: Path("ocr_cache.sqlite3")
+
+        max_size_bytes (int): Max size of the entries with their hashes in bytes. By default 64 MB.
+    """
+
+    def __init__(self, path_to_db: Path, max_size_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_size_bytes = max_size_bytes
+        self.connection = sqlite3.connect(path_to_db)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                file_hash TEXT NOT NULL,
+                parameters_hash TEXT NOT NULL,
+                recognized_text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (file_hash, parameters_hash)
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_cache_last_access ON ocr_cache (last_access)"
+        )
+        self.connection.commit()
+        # Size of the entries in bytes
+        self.size_bytes: int = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM ocr_cache"
+        ).fetchone()[0]
+        # (file_hash, parameters_hash) -> time of the last access not written to the database yet
+        self.pending_last_access: dict[tuple[str, str], float] = {}
+
+    def get(self, file_hash: str, parameters_hash: str) -> list[str] | None:
+        """
+        Returns the recognized text of the image from the cache.
+
+        Args:
+            file_hash (str): SHA-256 of the image content.
+
+            parameters_hash (str): Hash of the region of interest and OCR parameters.
+
+        Returns:
+            recognized_text_list (list[str] | None): Recognized text or None if the image is not in the cache.
+                For example: ["C L2 182", "Time", "Mon, 24/03/2025 16:04"]
+        """
+        row: tuple[str] | None = self.connection.execute(
+            "SELECT recognized_text FROM ocr_cache WHERE file_hash = ? AND parameters_hash = ?",
+            (file_hash, parameters_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        self.pending_last_access[(file_hash, parameters_hash)] = time.time()
+        if len(self.pending_last_access) >= LAST_ACCESS_FLUSH_INTERVAL:
+            self.flush_last_access()
+        return json.loads(row[0])
+
+    def flush_last_access(self) -> None:
+        """
+        Writes the times of the last access of the entries read from the cache in one transaction.
+        """
+        if not self.pending_last_access:
+            return
+        self.connection.executemany(
+            "UPDATE ocr_cache SET last_access = ? WHERE file_hash = ? AND parameters_hash = ?",
+            [
+                (last_access, file_hash, parameters_hash)
+                for (file_hash, parameters_hash), last_access in self.pending_last_access.items()
+            ],
+        )
+        self.connection.commit()
+        self.pending_last_access.clear()
+
+    def set(self, file_hash: str, parameters_hash: str, recognized_text_list: list[str]) -> None:
+        """
+        Saves the recognized text of the image to the cache and removes
+        the least recently used entries if the cache is bigger than max_size_bytes.
+
+        Args:
+            file_hash (str): SHA-256 of the image content.
+
+            parameters_hash (str): Hash of the region of interest and OCR parameters.
+
+            recognized_text_list (list[str]): Recognized text of the image.
+                For example: ["C L2 182", "Time", "Mon, 24/03/2025 16:04"]
+        """
+        # The eviction removes the least recently used entries by the written times of the last access
+        self.flush_last_access()
+        recognized_text: str = json.dumps(recognized_text_list, ensure_ascii=False)
+        size: int = get_entry_size(file_hash, parameters_hash, recognized_text)
+        row: tuple[int] | None = self.connection.execute(
+            "SELECT size FROM ocr_cache WHERE file_hash = ? AND parameters_hash = ?",
+            (file_hash, parameters_hash),
+        ).fetchone()
+        if row is not None:
+            self.size_bytes -= row[0]
+        self.connection.execute(
+            "INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?, ?)",
+            (file_hash, parameters_hash, recognized_text, size, time.time()),
+        )
+        self.size_bytes += size
+        self.connection.commit()
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        If the cache is bigger than max_size_bytes, removes the least recently used entries
+        until it is not bigger than EVICTION_TARGET_RATIO of max_size_bytes and vacuums the database.
+        """
+        if self.size_bytes <= self.max_size_bytes:
+            return
+        target_size_bytes: int = int(self.max_size_bytes * EVICTION_TARGET_RATIO)
+        while self.size_bytes > target_size_bytes:
+            rows: list[tuple[str, str, int]] = self.connection.execute(
+                "SELECT file_hash, parameters_hash, size FROM ocr_cache ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.size_bytes = 0
+                break
+            for file_hash, parameters_hash, size in rows:
+                if self.size_bytes <= target_size_bytes:
+                    break
+                self.connection.execute(
+                    "DELETE FROM ocr_cache WHERE file_hash = ? AND parameters_hash = ?",
+                    (file_hash, parameters_hash),
+                )
+                self.size_bytes -= size
+        self.connection.commit()
+        # Deleted entries only free pages inside the file, VACUUM returns them to the file system
+        self.connection.execute("VACUUM")
+
+    def close(self) -> None:
+        """
+        Writes the times of the last access and closes the connection to the SQLite database.
+        """
+        self.flush_last_access()
+        self.connection.close()
@@ -0,0 +1,159 @@
+"""The module contains the process pool runner for the recognition of images"""
+
+import multiprocessing
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from helpers.helpers_func import move_recognized_image
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+from helpers.ocr_cache import OcrCache, get_file_hash, get_parameters_hash
+from helpers.recognition import (
+    ImageReadError,
+    get_paddle_ocr,
+    get_recognition_parameters,
+    recognize_image_with_metrics,
+)
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
+# PaddleOCR instance of the worker process, created once by init_worker_ocr
+worker_ocr: "PaddleOCR | None" = None
+
+
+def init_worker_ocr() -> None:
+    """
+    Initializer of the worker process. Creates the PaddleOCR instance once per worker.
+    """
+    global worker_ocr
+    worker_ocr = get_paddle_ocr()
+
+
+def recognize_image_in_worker(
+    img_full_path: Path, decode_scale: int = 1
+) -> tuple[Path, list[str] | None, dict[str, list[float]], str | None]:
+    """
+    Reads the region of interest of the image and recognizes text on it in the worker process.
+    An image which can not be read is returned with the error instead of the text,
+    so it does not stop the pool, as in main(). Other errors of OCR are raised.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        decode_scale (int): Decode the image with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+    Returns:
+        tuple[Path, list[str] | None, dict[str, list[float]], str | None]: Path to the image, recognized text
+            or None if the image can not be read, durations of stages in seconds and the error of reading.
+            For example:
+                (
+                    WindowsPath('D:/.../images_for_recognize/AADC5918.JPG'),
+                    ["C L2 182", "Time", "Mon, 24/03/2025 16:04"],
+                    {"read_decode": [0.19], "crop": [0.0], "ocr_detection": [0.83], "ocr_recognition": [0.6]},
+                    None,
+                )
+    """
+    metrics = StageMetrics()
+    try:
+        recognized_text_list: list[str] = recognize_image_with_metrics(
+            worker_ocr, img_full_path, metrics, decode_scale
+        )
+    except ImageReadError as error:
+        return img_full_path, None, metrics.durations, str(error)
+    return img_full_path, recognized_text_list, metrics.durations, None
+
+
+def run_parallel_recognition(
+    img_full_paths: list[Path],
+    matcher: BlockLevelPlotMatcher,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    workers: int = 2,
+    decode_scale: int = 1,
+    ocr_cache: OcrCache | None = None,
+    metrics: StageMetrics | None = None,
+) -> dict[Path, str | bool]:
+    """
+    Recognizes images with a pool of worker processes. Each worker creates its own PaddleOCR
+    instance once and takes images from the shared queue of the pool.
+    The parent process matches recognized text and moves the images, so two workers
+    never move images at the same time. Per-image results are the same as in main(),
+    an image which can not be read is logged and skipped.
+
+    Args:
+        img_full_paths (list[Path]): Abs paths to the images.
+            For example:
+                [WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')]
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        workers (int): Amount of worker processes. By default 2.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        ocr_cache (OcrCache | None): Cache of recognized text, images from the cache skip OCR. By default None.
+
+        metrics (StageMetrics | None): Metrics to record the durations of the stages. By default new metrics.
+
+    Returns:
+        folder_names (dict[Path, str | bool]): Path to the image -> matched folder name or False.
+            For example:
+                {WindowsPath('D:/.../images_for_recognize/AADC5918.JPG'): 'C_L2_Plot_182'}
+    """
+    folder_names: dict[Path, str | bool] = {}
+    if metrics is None:
+        metrics = StageMetrics()
+    start_run: float = perf_counter()
+
+    # Images from the cache are matched without OCR
+    file_hashes: dict[Path, str] = {}
+    parameters_hash: str = get_parameters_hash(get_recognition_parameters(decode_scale))
+    img_full_paths_to_recognize: list[Path] = img_full_paths
+    if ocr_cache is not None:
+        img_full_paths_to_recognize = []
+        for img_full_path in img_full_paths:
+            file_hashes[img_full_path] = get_file_hash(img_full_path)
+            recognized_text_list: list[str] | None = ocr_cache.get(
+                file_hashes[img_full_path], parameters_hash
+            )
+            if recognized_text_list is None:
+                img_full_paths_to_recognize.append(img_full_path)
+                continue
+            print(f"Processing image: {img_full_path}")
+            folder_names[img_full_path] = move_recognized_image(
+                img_full_path,
+                recognized_text_list,
+                matcher,
+                folder_with_target_folders_by_location_apartments,
+                metrics=metrics,
+            )
+
+    # Workers load OCR models only if there are images to recognize
+    if len(img_full_paths_to_recognize) > 0:
+        with multiprocessing.Pool(processes=workers, initializer=init_worker_ocr) as pool:
+            for img_full_path, recognized_text_list, worker_durations, error in pool.imap_unordered(
+                partial(recognize_image_in_worker, decode_scale=decode_scale), img_full_paths_to_recognize
+            ):
+                print(f"Processing image: {img_full_path}")
+                metrics.merge(worker_durations)
+                if recognized_text_list is None:
+                    print(f"Error of reading image: {img_full_path}: {error}")
+                    continue
+                if ocr_cache is not None:
+                    ocr_cache.set(file_hashes[img_full_path], parameters_hash, recognized_text_list)
+                folder_names[img_full_path] = move_recognized_image(
+                    img_full_path,
+                    recognized_text_list,
+                    matcher,
+                    folder_with_target_folders_by_location_apartments,
+                    metrics=metrics,
+                )
+
+    metrics.print_summary(len(folder_names), perf_counter() - start_run)
+    return folder_names
@@ -0,0 +1,205 @@
+"""The module contains the streaming pipeline of reading, recognition and moving of images"""
+
+import threading
+from pathlib import Path
+from queue import Queue
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.helpers_func import move_image_to_folder_block_level_plot
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.metrics import StageMetrics
+from helpers.recognition import ImageReadError, get_coordinates_region_of_interest, recognize_text_from_image
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
+# Marker of the end of the work in the queues of the pipeline
+END_OF_QUEUE = None
+
+
+def load_regions_of_interest(
+    img_full_paths_queue: "Queue[Path | None]",
+    rois_queue: "Queue[tuple[Path, NDArray[np.uint8] | Exception] | None]",
+    decode_scale: int = 1,
+    metrics: StageMetrics | None = None,
+) -> None:
+    """
+    Loader stage of the pipeline. Takes paths of images from img_full_paths_queue,
+    reads the region of interest and puts it to rois_queue.
+    put() blocks while rois_queue is full, so only a bounded amount of regions of interest is in memory.
+    An image which can not be read is passed with its error and skipped by the consumer. Any other error
+    is passed too and the loader stops, the consumer raises it, as the serial path does.
+
+    Args:
+        img_full_paths_queue (Queue[Path | None]): Paths of images to read, None - end of the work.
+
+        rois_queue (Queue[tuple[Path, NDArray[np.uint8] | Exception] | None]): Path and region of interest
+            of the image or the error, None - the loader finished the work.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        metrics (StageMetrics | None): Metrics to record the duration of reading and cropping. By default None.
+    """
+    try:
+        while (img_full_path := img_full_paths_queue.get()) is not END_OF_QUEUE:
+            start: float = perf_counter()
+            try:
+                coordinates_roi: NDArray[np.uint8] | Exception = get_coordinates_region_of_interest(
+                    img_full_path, decode_scale
+                )
+            except (ImageReadError, OSError) as error:
+                coordinates_roi = error
+            except Exception as error:
+                rois_queue.put((img_full_path, error))
+                return
+            if metrics is not None:
+                metrics.record("read_decode", perf_counter() - start)
+            rois_queue.put((img_full_path, coordinates_roi))
+    finally:
+        rois_queue.put(END_OF_QUEUE)
+
+
+def move_images(
+    moves_queue: "Queue[tuple[Path, str] | None]",
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    metrics: StageMetrics | None = None,
+) -> None:
+    """
+    Mover stage of the pipeline. Takes images and their block-level plot folders from moves_queue
+    and moves the images.
+
+    Args:
+        moves_queue (Queue[tuple[Path, str] | None]): Path of the image and the name of the folder,
+            None - end of the work.
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        metrics (StageMetrics | None): Metrics to record the duration of moving. By default None.
+    """
+    while (move := moves_queue.get()) is not END_OF_QUEUE:
+        img_full_path, folder_name_to_remove_image = move
+        start: float = perf_counter()
+        try:
+            move_image_to_folder_block_level_plot(
+                img_full_path,
+                folder_name_to_remove_image,
+                folder_with_target_folders_by_location_apartments,
+            )
+        except OSError as error:
+            print(f"Error of moving image: {img_full_path}: {error}")
+        if metrics is not None:
+            metrics.record("move", perf_counter() - start)
+
+
+def run_pipeline_recognition(
+    img_full_paths: list[Path],
+    ocr: "PaddleOCR",
+    matcher: BlockLevelPlotMatcher,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    loader_threads: int = 4,
+    queue_size: int = 8,
+    decode_scale: int = 1,
+    metrics: StageMetrics | None = None,
+) -> dict[Path, str | bool]:
+    """
+    Recognizes images with a staged pipeline: loader threads read and crop the images,
+    the calling thread runs OCR and matching, the mover thread moves the images.
+    The stages are connected by bounded queues, so disk and CPU work at the same time
+    and memory does not grow with the size of the folder.
+
+    Args:
+        img_full_paths (list[Path]): Abs paths to the images.
+            For example:
+                [WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')]
+
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        loader_threads (int): Amount of threads which read and crop the images. By default 4.
+
+        queue_size (int): Max amount of items waiting in each queue. By default 8.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+
+        metrics (StageMetrics | None): Metrics to record the durations of the stages. By default new metrics.
+
+    Returns:
+        folder_names (dict[Path, str | bool]): Path to the image -> matched folder name or False.
+            For example:
+                {WindowsPath('D:/.../images_for_recognize/AADC5918.JPG'): 'C_L2_Plot_182'}
+    """
+    folder_names: dict[Path, str | bool] = {}
+    if metrics is None:
+        metrics = StageMetrics()
+    start_run: float = perf_counter()
+    img_full_paths_queue: "Queue[Path | None]" = Queue()
+    rois_queue: "Queue[tuple[Path, NDArray[np.uint8] | Exception] | None]" = Queue(maxsize=queue_size)
+    moves_queue: "Queue[tuple[Path, str] | None]" = Queue(maxsize=queue_size)
+
+    for img_full_path in img_full_paths:
+        img_full_paths_queue.put(img_full_path)
+    loaders: list[threading.Thread] = []
+    for _ in range(loader_threads):
+        img_full_paths_queue.put(END_OF_QUEUE)
+        loader = threading.Thread(
+            target=load_regions_of_interest,
+            args=(img_full_paths_queue, rois_queue, decode_scale, metrics),
+            daemon=True,
+        )
+        loader.start()
+        loaders.append(loader)
+    mover = threading.Thread(
+        target=move_images,
+        args=(moves_queue, folder_with_target_folders_by_location_apartments, metrics),
+        daemon=True,
+    )
+    mover.start()
+
+    try:
+        finished_loaders: int = 0
+        while finished_loaders < loader_threads:
+            item = rois_queue.get()
+            if item is END_OF_QUEUE:
+                finished_loaders += 1
+                continue
+            img_full_path, coordinates_roi = item
+            print(f"Processing image: {img_full_path}")
+            if isinstance(coordinates_roi, (ImageReadError, OSError)):
+                print(f"Error of reading image: {img_full_path}: {coordinates_roi}")
+                continue
+            if isinstance(coordinates_roi, Exception):
+                raise coordinates_roi
+
+            # recognized_text_list: ['C L2 182', 'Time', 'Mon, 24/03/2025 16:04']
+            with metrics.measure("ocr"):
+                recognized_text_list: list[str] = recognize_text_from_image(
+                    ocr, coordinates_roi, only_horizontal=True
+                )
+            # The region of interest is not needed after OCR
+            del coordinates_roi, item
+
+            folder_name_to_remove_image: str | bool = False
+            if len(recognized_text_list) > 0:
+                print(f"{recognized_text_list=}")
+                # 'A_L2_Plot_11'
+                with metrics.measure("match"):
+                    folder_name_to_remove_image = matcher.get_folder_name(recognized_text_list)
+                print(f"folder_name_to_remove_image: {folder_name_to_remove_image}")
+                # Если folder_name_to_remove_image существует и это строка - 'A_L2_Plot_11'
+                if folder_name_to_remove_image and type(folder_name_to_remove_image) is str:
+                    moves_queue.put((img_full_path, folder_name_to_remove_image))
+            folder_names[img_full_path] = folder_name_to_remove_image
+    finally:
+        moves_queue.put(END_OF_QUEUE)
+        mover.join()
+    metrics.print_summary(len(folder_names), perf_counter() - start_run)
+    return folder_names
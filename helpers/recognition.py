@@ -0,0 +1,441 @@
+"""The module contains functions to read the region of interest from the image and recognize text on it"""
+
+import copy
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.metrics import StageMetrics
+
+if TYPE_CHECKING:
+    # paddleocr is imported by the functions which run OCR, so reading, cropping and the tools work without it
+    from paddleocr import PaddleOCR
+
+# Flags of cv2.imread to decode the image in grayscale with the resolution reduced by the scale.
+# libjpeg decodes JPEG directly to the reduced size, without decoding full resolution.
+IMREAD_GRAYSCALE_BY_DECODE_SCALE: dict[int, int] = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+# Size of the block for recognition in the bottom left corner of the image at full resolution
+WIDTH_BLOCK_FOR_RECOGNITION: int = 1900
+HEIGHT_BLOCK_FOR_RECOGNITION: int = 1800
+
+
+class ImageReadError(ValueError):
+    """
+    The image can not be read: the file is missing, broken or truncated.
+    The run skips such an image, while other errors of recognition are not hidden by it.
+    """
+
+
+def get_paddle_ocr() -> "PaddleOCR":
+    """Function to create the PaddleOCR instance used for recognition.
+
+    Returns:
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+    """
+    from paddleocr import PaddleOCR
+
+    # use_angle_cls - определять угол текста
+    ocr: PaddleOCR = PaddleOCR(use_angle_cls=True, lang="en")
+    return ocr
+
+
+def get_recognition_parameters(
+    decode_scale: int = 1,
+    ocr_backend: str = "paddle",
+    localize_text: bool = False,
+    early_exit: bool = False,
+    adaptive_roi: bool = False,
+    dictionary_hash: str | None = None,
+    min_match_score: float | None = None,
+    max_frame_bytes: int | None = None,
+) -> dict[str, object]:
+    """Function to get the region of interest and OCR parameters which change the recognized text.
+    Used as a part of the key of the cache of recognized text.
+    With early_exit or adaptive_roi the text is recognized until it matches the dictionary,
+    so the text of the same image changes with the dictionary and the matcher, and they are parameters too.
+
+    Args:
+        decode_scale (int, optional): Scale of the reduced decoding of the image. Defaults to 1.
+
+        ocr_backend (str, optional): Name of the OCR backend: "paddle" or "stamp". Defaults to "paddle".
+
+        localize_text (bool, optional): PaddleOCR reads the localized stamp lines without the detector.
+            Defaults to False.
+
+        early_exit (bool, optional): Recognition stops at the first line which matches the dictionary.
+            Defaults to False.
+
+        adaptive_roi (bool, optional): The region of interest grows until the text matches the dictionary.
+            Defaults to False.
+
+        dictionary_hash (str | None, optional): SHA-256 of the text file of the dictionary, a parameter only
+            with early_exit or adaptive_roi. Defaults to None.
+            For example: '9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'
+
+        min_match_score (float | None, optional): Lowest score of the fuzzy matcher, None for the exact matcher,
+            a parameter only with early_exit or adaptive_roi. Defaults to None.
+
+        max_frame_bytes (int | None, optional): Cap of the decoded frame of the buffer pool, larger images
+            are decoded with a reduced scale, a parameter only when it is set. Defaults to None.
+            For example: 8388608
+
+    Returns:
+        recognition_parameters (dict[str, object]): The region of interest and OCR parameters.
+            For example:
+                {
+                    "decode_scale": 1,
+                    "width_block_for_recognition": 1900,
+                    "height_block_for_recognition": 1800,
+                    "use_angle_cls": True,
+                    "lang": "en",
+                    "only_horizontal": True,
+                    "ocr_backend": "paddle",
+                    "localize_text": False,
+                    "early_exit": False,
+                    "adaptive_roi": False,
+                }
+    """
+    recognition_parameters: dict[str, object] = {
+        "decode_scale": decode_scale,
+        "width_block_for_recognition": WIDTH_BLOCK_FOR_RECOGNITION,
+        "height_block_for_recognition": HEIGHT_BLOCK_FOR_RECOGNITION,
+        "use_angle_cls": True,
+        "lang": "en",
+        "only_horizontal": True,
+        "ocr_backend": ocr_backend,
+        "localize_text": localize_text,
+        "early_exit": early_exit,
+        "adaptive_roi": adaptive_roi,
+    }
+    # The partial text of the early exit and the corner of the adaptive ROI depend on the dictionary
+    if early_exit or adaptive_roi:
+        recognition_parameters["dictionary_hash"] = dictionary_hash
+        recognition_parameters["min_match_score"] = min_match_score
+    # Large images are recognized with the reduced resolution under the cap of the frame
+    if max_frame_bytes is not None:
+        recognition_parameters["max_frame_bytes"] = max_frame_bytes
+    return recognition_parameters
+
+
+def recognize_text_from_image(
+    ocr: "PaddleOCR", coordinates_roi: NDArray[np.uint8], only_horizontal: bool = True
+) -> list[str]:
+    """Function to recognize text from image.
+
+    Args:
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([
+                        [ 95, 100, 100, ..., 203, 206, 207],
+                        [ 98,  99,  98, ..., 207, 207, 206],
+                        [100,  99,  97, ..., 211, 209, 208],
+                        ...,
+                        [ 39,  40,  39, ...,  86,  85,  84],
+                        [ 39,  41,  39, ...,  88,  85,  88],
+                        [ 41,  28,  39, ...,  89,  81,  87]
+                    ],
+                        shape=(1800, 1900), dtype=uint8)
+
+        only_horizontal (bool, optional): Опция для распознавания только горизонтального текста.
+            Defaults to True.
+
+    Values:
+        result_recognition (list[list[list[list[float, float], tuple[str, float]]]]):
+            For example:
+                [
+                    [
+                        [
+                            [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], [3.0, 3.0]],
+                            ("text", 0.99),
+                        ]
+                    ]
+                ]
+
+    Returns:
+        list[str]: _description_
+    """
+    result_recognition: list[
+        list[list[list[list[float, float],], tuple[str, float]]]
+    ] = ocr.ocr(coordinates_roi, cls=True, det=True)
+    # print(f"result_recognition in recognize_text_from_image: {result_recognition=}")
+
+    recognized_text_list = []
+    # If result_recognition is not empty and value is not None
+    if len(result_recognition) == 1 and result_recognition[0] is not None:
+        # For now angle - not working
+        if only_horizontal:
+            # Get only horizontal text from result_recognition and add to list recognized_text_list
+            for line in result_recognition:
+                for box, (text, score) in line:
+                    if "angle" in box:
+                        angle = box["angle"]
+                        # print(f"{angle=}")
+                    recognized_text_list.append(text)
+        else:
+            recognized_text_list = [
+                text_info[0] for line in result_recognition for _, text_info in line
+            ]
+    # print(f"recognized_text_list: {recognized_text_list=}")
+    return recognized_text_list
+
+
+def get_text_crops_from_roi(ocr: "PaddleOCR", coordinates_roi: NDArray[np.uint8]) -> list[NDArray[np.uint8]]:
+    """Function to detect text on the region of interest and crop the detected text lines.
+    The same detection, order of boxes and crops as in ocr.ocr(coordinates_roi, det=True).
+
+    Args:
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+    Returns:
+        text_crops (list[NDArray[np.uint8]]): Crops of text lines from top to bottom, left to right.
+            For example:
+                [array([[[255, 255, 255], ...]], shape=(48, 412, 3), dtype=uint8)]
+    """
+    from paddleocr.paddleocr import predict_system
+
+    # PaddleOCR works with BGR images
+    img_bgr: NDArray[np.uint8] = (
+        cv2.cvtColor(coordinates_roi, cv2.COLOR_GRAY2BGR)
+        if len(coordinates_roi.shape) == 2
+        else coordinates_roi
+    )
+    dt_boxes, _ = ocr.text_detector(img_bgr)
+    if dt_boxes is None or len(dt_boxes) == 0:
+        return []
+    text_crops: list[NDArray[np.uint8]] = []
+    for box in predict_system.sorted_boxes(dt_boxes):
+        if ocr.args.det_box_type == "quad":
+            text_crops.append(predict_system.get_rotate_crop_image(img_bgr, copy.deepcopy(box)))
+        else:
+            text_crops.append(predict_system.get_minarea_rect_crop(img_bgr, copy.deepcopy(box)))
+    return text_crops
+
+
+def recognize_text_crops(
+    ocr: "PaddleOCR", text_crops: list[NDArray[np.uint8]], cls: bool = True
+) -> list[tuple[str, float]]:
+    """Function to recognize text on the crops of text lines with the angle classifier and the recognizer.
+
+    Args:
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        text_crops (list[NDArray[np.uint8]]): Crops of text lines from get_text_crops_from_roi.
+            For example:
+                [array([[[255, 255, 255], ...]], shape=(48, 412, 3), dtype=uint8)]
+
+        cls (bool, optional): Use the angle classifier. Defaults to True.
+
+    Returns:
+        rec_res (list[tuple[str, float]]): Text and score of each crop, not filtered by ocr.drop_score.
+            For example: [('C L2 182 wC0214', 0.98), ('Time', 0.99)]
+    """
+    if len(text_crops) == 0:
+        return []
+    if ocr.use_angle_cls and cls:
+        text_crops, _, _ = ocr.text_classifier(text_crops)
+    rec_res: list[tuple[str, float]]
+    rec_res, _ = ocr.text_recognizer(text_crops)
+    return rec_res
+
+
+def recognize_text_from_images(
+    ocr: "PaddleOCR", coordinates_rois: list[NDArray[np.uint8]], cls: bool = True
+) -> list[list[str]]:
+    """Function to recognize text from a batch of images.
+    Detection runs for each region of interest, then text lines of all regions
+    go through the angle classifier and the recognizer together,
+    so the per-call overhead of the models is paid once for the batch.
+
+    Args:
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        coordinates_rois (list[NDArray[np.uint8]]): Regions of interest in the images for recognition
+            For example:
+                [array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)]
+
+        cls (bool, optional): Use the angle classifier. Defaults to True.
+
+    Returns:
+        recognized_text_lists (list[list[str]]): Recognized text for each region of interest in the same order.
+            For example:
+                [
+                    ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"],
+                    [],
+                ]
+    """
+    text_crops: list[NDArray[np.uint8]] = []
+    # Amount of text crops of each region of interest
+    amount_text_crops: list[int] = []
+    for coordinates_roi in coordinates_rois:
+        text_crops_roi: list[NDArray[np.uint8]] = get_text_crops_from_roi(ocr, coordinates_roi)
+        text_crops.extend(text_crops_roi)
+        amount_text_crops.append(len(text_crops_roi))
+
+    # [('C L2 182 wC0214', 0.98), ('Time', 0.99)]
+    rec_res: list[tuple[str, float]] = recognize_text_crops(ocr, text_crops, cls)
+
+    recognized_text_lists: list[list[str]] = []
+    start: int = 0
+    for amount in amount_text_crops:
+        recognized_text_lists.append(
+            [text for text, score in rec_res[start:start + amount] if score >= ocr.drop_score]
+        )
+        start += amount
+    return recognized_text_lists
+
+
+def recognize_image_with_metrics(
+    ocr: "PaddleOCR", img_full_path: Path, metrics: StageMetrics, decode_scale: int = 1
+) -> list[str]:
+    """Function to read the image and recognize text on its region of interest,
+    recording the duration of each stage: read_decode, crop, ocr_detection and ocr_recognition.
+    The same recognized text as recognize_text_from_image.
+
+    Args:
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        metrics (StageMetrics): Metrics to record the durations of the stages.
+
+        decode_scale (int, optional): Decode the image with the resolution reduced by 1, 2, 4 or 8 times.
+            Defaults to 1.
+
+    Returns:
+        recognized_text_list (list[str]): Recognized text of the image.
+            For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"]
+    """
+    with metrics.measure("read_decode"):
+        img_gray: NDArray[np.uint8] = read_image_gray(img_full_path, decode_scale)
+    with metrics.measure("crop"):
+        coordinates_roi: NDArray[np.uint8] = crop_region_of_interest(img_gray, decode_scale)
+    with metrics.measure("ocr_detection"):
+        text_crops: list[NDArray[np.uint8]] = get_text_crops_from_roi(ocr, coordinates_roi)
+    with metrics.measure("ocr_recognition"):
+        rec_res: list[tuple[str, float]] = recognize_text_crops(ocr, text_crops)
+    recognized_text_list: list[str] = [text for text, score in rec_res if score >= ocr.drop_score]
+    return recognized_text_list
+
+
+def get_coordinates_region_of_interest(img_full_path: Path, decode_scale: int = 1) -> NDArray[np.uint8]:
+    """Function to get coordinates of the region of interest
+    in the image for recognition.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        decode_scale (int, optional): Decode the image with the resolution reduced by 1, 2, 4 or 8 times.
+            The region of interest is reduced by the same scale. Defaults to 1.
+
+    Values:
+        width_block_for_recognition (int): Width of the block for recognition
+            1900
+
+        height_block_for_recognition (int): Height of the block for recognition
+            1800
+
+    Raises:
+        ValueError: If decode_scale is not 1, 2, 4 or 8.
+
+    Returns:
+        roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([
+                        [ 95, 100, 100, ..., 203, 206, 207],
+                        [ 98,  99,  98, ..., 207, 207, 206],
+                        [100,  99,  97, ..., 211, 209, 208],
+                        ...,
+                        [ 39,  40,  39, ...,  86,  85,  84],
+                        [ 39,  41,  39, ...,  88,  85,  88],
+                        [ 41,  28,  39, ...,  89,  81,  87]
+                    ],
+                        shape=(1800, 1900), dtype=uint8)
+    """
+    img_gray: NDArray[np.uint8] = read_image_gray(img_full_path, decode_scale)
+    roi: NDArray[np.uint8] = crop_region_of_interest(img_gray, decode_scale)
+    return roi
+
+
+def read_image_gray(img_full_path: Path, decode_scale: int = 1) -> NDArray[np.uint8]:
+    """Function to read the image in grayscale.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            For example:
+                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        decode_scale (int, optional): Decode the image with the resolution reduced by 1, 2, 4 or 8 times.
+            Defaults to 1.
+
+    Raises:
+        ValueError: If decode_scale is not 1, 2, 4 or 8.
+        ImageReadError: If the image can not be read.
+
+    Returns:
+        img_gray (NDArray[np.uint8]): The image in grayscale.
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(4032, 3024), dtype=uint8)
+    """
+    if decode_scale not in IMREAD_GRAYSCALE_BY_DECODE_SCALE:
+        raise ValueError(
+            f"decode_scale must be one of {tuple(IMREAD_GRAYSCALE_BY_DECODE_SCALE)}, not {decode_scale}"
+        )
+    # Read image in grayscale
+    img_gray: NDArray[np.uint8] | None = cv2.imread(
+        str(img_full_path), IMREAD_GRAYSCALE_BY_DECODE_SCALE[decode_scale]
+    )
+    # cv2.imread returns None instead of an error for a missing, broken or truncated file
+    if img_gray is None:
+        raise ImageReadError(f"Image can not be read: {img_full_path}")
+    return img_gray
+
+
+def crop_region_of_interest(img_gray: NDArray[np.uint8], decode_scale: int = 1) -> NDArray[np.uint8]:
+    """Function to crop the region of interest for recognition from the bottom left corner of the image.
+
+    Args:
+        img_gray (NDArray[np.uint8]): The image in grayscale.
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(4032, 3024), dtype=uint8)
+
+        decode_scale (int, optional): Scale of the reduced decoding of the image. Defaults to 1.
+
+    Returns:
+        roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+    """
+    # img_height=4032
+    img_height: int = img_gray.shape[0]
+    # img_width=3024
+    img_width: int = img_gray.shape[1]
+    # Width of the block for recognition
+    width_block_for_recognition: int = WIDTH_BLOCK_FOR_RECOGNITION // decode_scale
+    # Height of the block for recognition
+    height_block_for_recognition: int = HEIGHT_BLOCK_FOR_RECOGNITION // decode_scale
+    # Coordinates for region of interest
+    start_y: int = img_height - height_block_for_recognition
+    end_y: int = img_height
+    start_x: int = 0
+    end_x: int = width_block_for_recognition
+    # <class 'numpy.ndarray'>
+    roi: NDArray[np.uint8] = img_gray[start_y:end_y, start_x:end_x]
+    return roi
@@ -1,7 +1,164 @@
+import argparse
+import hashlib
 import os
 import re
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Size of the first and the last blocks of the file for the partial hash
+PARTIAL_HASH_BLOCK_SIZE: int = 64 * 1024
+# Size of the chunk to read for the full hash
+FULL_HASH_CHUNK_SIZE: int = 1024 * 1024
+
+
+def get_partial_file_hash(path_to_file: Path, block_size: int = PARTIAL_HASH_BLOCK_SIZE) -> str:
+    """
+    The function calculates the hash of the first and the last blocks of the file.
+    Files with different partial hashes differ, so the full hash is needed only for equal partial hashes.
+
+    Args:
+        path_to_file (Path): Abs path to the file
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        block_size (int): Size of each block in bytes. By default 64 KB.
+
+    Returns:
+        partial_hash (str): SHA-256 of the first and the last blocks.
+            For example: '9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'
+    """
+    hash_file = hashlib.sha256()
+    with open(path_to_file, "rb") as file:
+        hash_file.update(file.read(block_size))
+        file_size: int = os.fstat(file.fileno()).st_size
+        if file_size > block_size:
+            file.seek(max(file_size - block_size, block_size))
+            hash_file.update(file.read(block_size))
+    return hash_file.hexdigest()
+
+
+def get_full_file_hash(path_to_file: Path, chunk_size: int = FULL_HASH_CHUNK_SIZE) -> str:
+    """
+    The function calculates the hash of the whole file reading it by chunks.
+    The script runs as python helpers/remove_duplicates.py, so it does not import the package helpers.
+
+    Args:
+        path_to_file (Path): Abs path to the file
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+        chunk_size (int): Size of the chunk to read in bytes. By default 1 MB.
+
+    Returns:
+        full_hash (str): SHA-256 of the file content.
+            For example: '9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08'
+    """
+    hash_file = hashlib.sha256()
+    with open(path_to_file, "rb") as file:
+        while chunk := file.read(chunk_size):
+            hash_file.update(chunk)
+    return hash_file.hexdigest()
+
+
+def group_by_hash(
+    groups: list[list[Path]], get_hash: Callable[[Path], str], executor: ThreadPoolExecutor
+) -> list[list[Path]]:
+    """
+    The function splits each group of files into groups with equal hashes and drops single files.
+
+    Args:
+        groups (list[list[Path]]): Groups of candidates to be duplicates.
+            For example: [[WindowsPath('D:/images/AADC5918.JPG'), WindowsPath('D:/images/photo_1.JPG')]]
+
+        get_hash (Callable[[Path], str]): Function which calculates the hash of the file.
+            For example: get_partial_file_hash
+
+        executor (ThreadPoolExecutor): Threads which read the files.
+
+    Returns:
+        list[list[Path]]: Groups of files with equal hashes, each of at least 2 files.
+    """
+    paths: list[Path] = [path for group in groups for path in group]
+    hashes: list[str] = list(executor.map(get_hash, paths))
+    hash_by_path: dict[Path, str] = dict(zip(paths, hashes))
+    result_groups: list[list[Path]] = []
+    for group in groups:
+        paths_by_hash: dict[str, list[Path]] = {}
+        for path in group:
+            paths_by_hash.setdefault(hash_by_path[path], []).append(path)
+        result_groups.extend(paths for paths in paths_by_hash.values() if len(paths) > 1)
+    return result_groups
+
+
+def find_duplicate_files(path_target_folder: str | Path, max_workers: int = 8) -> list[list[Path]]:
+    """
+    Finds byte-identical files with any names in the folder.
+    Files are grouped by size first, then by the hash of the first and the last blocks,
+    and only files still in a group are read completely for the full hash.
+    Hashes are calculated in the thread pool.
+
+    Args:
+        path_target_folder (str | Path): The target folder containing image files.
+            For example: "images_for_recognize"
+
+        max_workers (int): Amount of threads which read the files. By default 8.
+
+    Returns:
+        duplicate_groups (list[list[Path]]): Groups of identical files. The first file of each group is kept:
+            a file without "copy" in its name, then with the shortest name.
+            For example:
+                [
+                    [
+                        WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images/ADAI3306.JPG'),
+                        WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images/photo_17.JPG'),
+                    ]
+                ]
+    """
+    paths_by_size: dict[int, list[Path]] = {}
+    with os.scandir(Path(path_target_folder).resolve()) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                paths_by_size.setdefault(entry.stat().st_size, []).append(Path(entry.path))
+    groups: list[list[Path]] = [paths for paths in paths_by_size.values() if len(paths) > 1]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        groups = group_by_hash(groups, get_partial_file_hash, executor)
+        groups = group_by_hash(groups, get_full_file_hash, executor)
+
+    return [
+        sorted(group, key=lambda path: ("copy" in path.name.lower(), len(path.name), path.name))
+        for group in groups
+    ]
+
+
+def remove_duplicate_files_by_content(
+    path_target_folder: str | Path, dry_run: bool = False, max_workers: int = 8
+) -> list[list[Path]]:
+    """
+    Removes byte-identical files from the folder, keeping the first file of each group of find_duplicate_files.
+
+    Args:
+        path_target_folder (str | Path): The target folder containing image files.
+            For example: "images_for_recognize"
+
+        dry_run (bool): Only print the report, do not remove files. By default False.
+
+        max_workers (int): Amount of threads which read the files. By default 8.
+
+    Returns:
+        duplicate_groups (list[list[Path]]): Groups of identical files, the first file of each group is kept.
+    """
+    duplicate_groups: list[list[Path]] = find_duplicate_files(path_target_folder, max_workers)
+    amount_duplicates: int = 0
+    for kept_path, *duplicate_paths in duplicate_groups:
+        print(f"Keep: {kept_path}")
+        for duplicate_path in duplicate_paths:
+            print(f"    {'Duplicate' if dry_run else 'Remove'}: {duplicate_path}")
+            if not dry_run:
+                duplicate_path.unlink()
+            amount_duplicates += 1
+    print(f"{'Found' if dry_run else 'Removed'} duplicates: {amount_duplicates} in {len(duplicate_groups)} groups")
+    return duplicate_groups
+
 
 def remove_duplicates_images_from_folder(path_target_folder: str | Path) -> None:
     """
@@ -43,4 +200,21 @@ def remove_duplicates_images_from_folder(path_target_folder: str | Path) -> None
 
 
 if __name__ == '__main__':
-    remove_duplicates_images_from_folder(path_target_folder="images_for_recognize")
+    parser = argparse.ArgumentParser(description="Remove duplicate images from the folder")
+    parser.add_argument("folder", nargs="?", default="images_for_recognize")
+    parser.add_argument(
+        "--by-content",
+        action="store_true",
+        help="Remove byte-identical files with any names, by default only files named '_copy1' or ' - Copy' "
+        "with the size of the original",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only print the report of identical files")
+    parser.add_argument("--workers", type=int, default=8, help="Amount of threads which read the files")
+    arguments = parser.parse_args()
+    if arguments.by_content:
+        remove_duplicate_files_by_content(arguments.folder, arguments.dry_run, arguments.workers)
+    elif arguments.dry_run:
+        # The removal by name has no report, it would remove files despite --dry-run
+        parser.error("--dry-run can be used only with --by-content")
+    else:
+        remove_duplicates_images_from_folder(path_target_folder=arguments.folder)
@@ -0,0 +1,148 @@
+"""The module contains the journal of the run which lets an interrupted run resume where it stopped"""
+
+import json
+import os
+from pathlib import Path
+
+# Statuses of the image in the order of processing
+STATUS_STARTED: str = "started"
+STATUS_RECOGNIZED: str = "recognized"
+STATUS_MATCHED: str = "matched"
+STATUS_MOVED: str = "moved"
+STATUS_FAILED: str = "failed"
+
+
+class RunJournal:
+    """
+    Append-only journal of the statuses of images in the JSON Lines file, like ProcessedFilesJournal
+    of the watch mode. Each status is flushed to the disk, the last status of each file version is kept
+    in memory, so a restart skips finished images and reuses recognized text with one lookup per image.
+
+    Statuses:
+        "started" - the image is being read and recognized. An image left "started" max_attempts times
+            crashed the run, for example by OOM of PaddleOCR, and is skipped.
+        "recognized" - the text is recognized and saved in the journal with the hash of the recognition
+            parameters, a restart with the same parameters does not run OCR again.
+        "matched" - the key is found or not found, the image is not moved: no folder of the key or plan mode.
+            A restart matches the saved text again, without OCR.
+        "moved" - the image is moved to the folder of its key.
+        "failed" - the image can not be read, for example a broken JPEG.
+
+    Args:
+        path_to_journal (Path): Relative or absolute path to the journal.
+            For example: Path("run_journal.jsonl")
+
+        max_attempts (int): Amount of interrupted attempts to recognize the image before it is skipped.
+            By default 2.
+
+    Values:
+        states (dict[str, dict[str, object]]): Key of the file version -> its last status, recognized text
+            and amount of attempts.
+            For example:
+                {
+                    'AADC5918.JPG:2841934:1742832240000000000': {
+                        "status": "moved",
+                        "attempts": 1,
+                        "recognized_text": ["C L2 182 wC0214", "Time"],
+                        "parameters_hash": "5d41402abc4b2a76b9719d911017c592...",
+                        "folder_name": "C_L2_Plot_182",
+                    }
+                }
+    """
+
+    def __init__(self, path_to_journal: Path, max_attempts: int = 2) -> None:
+        self.path_to_journal = path_to_journal
+        self.max_attempts = max_attempts
+        self.states: dict[str, dict[str, object]] = {}
+        if path_to_journal.exists():
+            line: str = ""
+            with open(path_to_journal, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record: dict[str, object] = json.loads(line)
+                        self.update_state(str(record.pop("file_key")), record)
+                    except (ValueError, KeyError):
+                        # The last line can be broken if the process was killed while writing it
+                        continue
+            # The broken last line is ended, so the next status is not appended to it
+            if line and not line.endswith("\n"):
+                with open(path_to_journal, "a", encoding="utf-8") as file:
+                    file.write("\n")
+
+    def update_state(self, file_key: str, record: dict[str, object]) -> None:
+        """
+        Applies the record of the journal to the state of the file version in memory.
+
+        Args:
+            file_key (str): Key of the file version. For example: 'AADC5918.JPG:2841934:1742832240000000000'
+
+            record (dict[str, object]): The status and its values.
+                For example: {"status": "recognized", "recognized_text": ["C L2 182 wC0214", "Time"]}
+        """
+        state: dict[str, object] = self.states.setdefault(file_key, {"attempts": 0})
+        if record["status"] == STATUS_STARTED:
+            state["attempts"] = int(state["attempts"]) + 1
+        state.update(record)
+
+    def add(self, file_key: str, status: str, **values: object) -> None:
+        """
+        Adds the status of the file version to the journal and flushes it to the disk.
+
+        Args:
+            file_key (str): Key of the file version. For example: 'AADC5918.JPG:2841934:1742832240000000000'
+
+            status (str): One of the statuses. For example: "recognized"
+
+            **values (object): Values of the status.
+                For example: recognized_text=["C L2 182 wC0214", "Time"]
+        """
+        record: dict[str, object] = {"status": status, **values}
+        with open(self.path_to_journal, "a", encoding="utf-8") as file:
+            file.write(json.dumps({"file_key": file_key, **record}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.update_state(file_key, record)
+
+    def get_skip_reason(self, file_key: str) -> str | None:
+        """
+        Checks if the image is finished by the previous runs.
+
+        Args:
+            file_key (str): Key of the file version. For example: 'AADC5918.JPG:2841934:1742832240000000000'
+
+        Returns:
+            str | None: Why the image is skipped or None if it must be processed.
+                For example: 'moved to C_L2_Plot_182'
+        """
+        state: dict[str, object] | None = self.states.get(file_key)
+        if state is None:
+            return None
+        if state["status"] == STATUS_MOVED:
+            return f"moved to {state['folder_name']}"
+        if state["status"] == STATUS_FAILED:
+            return f"failed: {state['error']}"
+        if state["status"] == STATUS_STARTED and int(state["attempts"]) >= self.max_attempts:
+            return f"recognition was interrupted {state['attempts']} times"
+        return None
+
+    def get_recognized_text_list(self, file_key: str, parameters_hash: str | None = None) -> list[str] | None:
+        """
+        Returns the text recognized by the previous runs with the same recognition parameters.
+
+        Args:
+            file_key (str): Key of the file version. For example: 'AADC5918.JPG:2841934:1742832240000000000'
+
+            parameters_hash (str | None): Hash of the recognition parameters of this run, the text recognized
+                with other parameters, for example the partial text of the early exit with another dictionary,
+                is not reused. By default None - any parameters.
+
+        Returns:
+            list[str] | None: The recognized text or None if the image was not recognized.
+                For example: ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04"]
+        """
+        state: dict[str, object] | None = self.states.get(file_key)
+        if state is None or "recognized_text" not in state:
+            return None
+        if parameters_hash is not None and state.get("parameters_hash") != parameters_hash:
+            return None
+        return list(state["recognized_text"])
@@ -0,0 +1,165 @@
+"""The module contains the localization of the lines of the stamp on the region of interest"""
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+
+def remove_tall_components(binary_text: NDArray[np.uint8], max_height_ratio: float = 3.0) -> NDArray[np.uint8]:
+    """
+    The function removes bright components much taller than the glyphs, for example a window frame
+    or a pole in the photo. One such stroke would make every row it crosses a row with text,
+    and all stamp lines would be merged into one band. The height of the glyphs is the median height
+    of the components, as the glyphs of the stamp are most of them.
+
+    Args:
+        binary_text (NDArray[np.uint8]): 255 on the strokes of the text, 0 on the background.
+
+        max_height_ratio (float): Components taller than this amount of glyph heights are removed. By default 3.0.
+
+    Returns:
+        binary_text (NDArray[np.uint8]): The strokes without the tall components.
+    """
+    # Grana's block-based labeling computes the statistics of the whole region about twice faster
+    # than the default algorithm on a single core
+    amount_components, labels, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(
+        binary_text, 8, cv2.CV_32S, cv2.CCL_GRANA
+    )
+    # The label 0 is the background, specks lower than 3 rows do not define the height of the glyphs
+    heights: NDArray[np.int32] = stats[1:, cv2.CC_STAT_HEIGHT]
+    glyph_heights: NDArray[np.int32] = heights[heights >= 3]
+    if amount_components <= 1 or len(glyph_heights) == 0:
+        return binary_text
+    max_height: float = max_height_ratio * float(np.median(glyph_heights))
+    tall_labels: NDArray[np.intp] = np.flatnonzero(heights > max_height) + 1
+    if len(tall_labels) == 0:
+        return binary_text
+    return np.where(np.isin(labels, tall_labels), 0, binary_text).astype(np.uint8)
+
+
+def get_binary_text(coordinates_roi: NDArray[np.uint8], kernel_size: int | None = None) -> NDArray[np.uint8]:
+    """
+    The function separates the thin bright strokes of the stamp from the photo under it.
+    Strokes much taller than the glyphs are removed by remove_tall_components.
+
+    Args:
+        coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+        kernel_size (int | None): Size of the kernel of the top-hat, wider than the strokes.
+            By default 1/60 of the height of the region, as the stamp lines are about 1/20 of it.
+
+    Returns:
+        binary_text (NDArray[np.uint8]): 255 on the strokes of the text, 0 on the background.
+    """
+    img_gray: NDArray[np.uint8] = (
+        cv2.cvtColor(coordinates_roi, cv2.COLOR_BGR2GRAY) if len(coordinates_roi.shape) == 3 else coordinates_roi
+    )
+    # The kernel is wider than the strokes, so the top-hat keeps the strokes and removes the photo
+    if kernel_size is None:
+        kernel_size = max(img_gray.shape[0] // 60, 3)
+    kernel: NDArray[np.uint8] = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
+    top_hat: NDArray[np.uint8] = cv2.morphologyEx(img_gray, cv2.MORPH_TOPHAT, kernel)
+    _, binary_text = cv2.threshold(top_hat, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return remove_tall_components(binary_text)
+
+
+def get_text_line_bands(
+    binary_text: NDArray[np.uint8], min_line_height: int = 4, min_row_pixels: int | None = None
+) -> list[tuple[int, int]]:
+    """
+    The function finds horizontal bands of the text lines by the horizontal projection of the strokes.
+    A row is a row with text if it has at least min_row_pixels of strokes, so specks of the noise of the photo
+    in every row do not merge all lines into one band.
+
+    Args:
+        binary_text (NDArray[np.uint8]): 255 on the strokes of the text, 0 on the background.
+
+        min_line_height (int): Lower bands are noise. By default 4.
+
+        min_row_pixels (int | None): Least amount of pixels of strokes in a row with text.
+            By default 1/200 of the width of the region, but at least 3.
+
+    Returns:
+        bands (list[tuple[int, int]]): Start and end rows of each text line from top to bottom.
+            For example: [(1021, 1068), (1122, 1160)]
+    """
+    if min_row_pixels is None:
+        min_row_pixels = max(binary_text.shape[1] // 200, 3)
+    rows_with_text: NDArray[np.bool_] = np.count_nonzero(binary_text, axis=1) >= min_row_pixels
+    # Starts and ends of the runs of rows with text
+    changes: NDArray[np.intp] = np.flatnonzero(np.diff(np.concatenate(([0], rows_with_text.view(np.int8), [0]))))
+    bands: list[tuple[int, int]] = []
+    for start, end in zip(changes[::2].tolist(), changes[1::2].tolist()):
+        # The dot of "i" is a low run separated from the line by a few empty rows
+        if bands:
+            previous_height: int = bands[-1][1] - bands[-1][0]
+            is_dot: bool = min(end - start, previous_height) * 3 <= max(end - start, previous_height)
+        if bands and is_dot and start - bands[-1][1] <= max(2, max(end - start, previous_height) // 4):
+            bands[-1] = (bands[-1][0], end)
+        else:
+            bands.append((start, end))
+    return [(start, end) for start, end in bands if end - start >= min_line_height]
+
+
+def get_text_line_boxes(binary_text: NDArray[np.uint8]) -> list[tuple[int, int, int, int]]:
+    """
+    The function finds boxes of the text lines: the band of the line and the columns with its strokes.
+
+    Args:
+        binary_text (NDArray[np.uint8]): 255 on the strokes of the text, 0 on the background.
+
+    Returns:
+        boxes (list[tuple[int, int, int, int]]): Start and end rows and start and end columns of each line
+            from top to bottom. For example: [(1021, 1068, 57, 640), (1122, 1160, 57, 228)]
+    """
+    boxes: list[tuple[int, int, int, int]] = []
+    for start_y, end_y in get_text_line_bands(binary_text):
+        columns_with_text: NDArray[np.intp] = np.flatnonzero(np.count_nonzero(binary_text[start_y:end_y], axis=0))
+        boxes.append((start_y, end_y, int(columns_with_text[0]), int(columns_with_text[-1]) + 1))
+    return boxes
+
+
+def get_text_line_strips(
+    coordinates_roi: NDArray[np.uint8], padding_ratio: float = 0.25, max_line_height_ratio: float = 0.5
+) -> list[NDArray[np.uint8]]:
+    """
+    The function crops tight strips of the stamp lines from the region of interest,
+    so the recognizer reads them without the detector. If no line is found or a band is higher than
+    max_line_height_ratio of the region, as several lines merged by the texture of the photo,
+    the localization is not usable and no strips are returned.
+
+    Args:
+        coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
+            For example:
+                array([[ 95, 100, 100, ..., 203, 206, 207], ...], shape=(1800, 1900), dtype=uint8)
+
+        padding_ratio (float): Margin around the line as a part of its height. By default 0.25.
+
+        max_line_height_ratio (float): Highest height of the band of a line as a part of the height
+            of the region. By default 0.5.
+
+    Returns:
+        text_strips (list[NDArray[np.uint8]]): BGR strips of the lines from top to bottom, empty if the lines
+            are not localized.
+            For example:
+                [array([[[ 98,  98,  98], ...]], shape=(71, 680, 3), dtype=uint8)]
+    """
+    img_bgr: NDArray[np.uint8] = (
+        cv2.cvtColor(coordinates_roi, cv2.COLOR_GRAY2BGR) if len(coordinates_roi.shape) == 2 else coordinates_roi
+    )
+    roi_height, roi_width = img_bgr.shape[:2]
+    boxes: list[tuple[int, int, int, int]] = get_text_line_boxes(get_binary_text(coordinates_roi))
+    if any(end_y - start_y > max_line_height_ratio * roi_height for start_y, end_y, _, _ in boxes):
+        return []
+    text_strips: list[NDArray[np.uint8]] = []
+    for start_y, end_y, start_x, end_x in boxes:
+        padding: int = max(int((end_y - start_y) * padding_ratio), 2)
+        text_strips.append(
+            img_bgr[
+                max(start_y - padding, 0):min(end_y + padding, roi_height),
+                max(start_x - padding, 0):min(end_x + padding, roi_width),
+            ]
+        )
+    return text_strips
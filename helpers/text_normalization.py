@@ -0,0 +1,154 @@
+"""The module contains the normalization of recognized text into columnar batches,
+so the text of many images is matched with the dictionary by joins instead of per line loops"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.fuzzy_matcher import FuzzyBlockLevelPlotMatcher
+from helpers.matcher import BlockLevelPlotMatcher
+
+
+def get_line_tokens(recognized_word: str) -> tuple[str, ...]:
+    """
+    The function splits the recognized line of text into upper case tokens once.
+
+    Args:
+        recognized_word (str): The recognized line of text.
+            For example: "C L2 182 wC0214"
+
+    Returns:
+        tuple[str, ...]: For example: ('C', 'L2', '182', 'WC0214')
+    """
+    return tuple(recognized_word.upper().split())
+
+
+def get_candidate_key(tokens: tuple[str, ...]) -> str:
+    """
+    The function returns the key which the line can match, as get_recognized_word_with_plot:
+    the first two tokens and the last token joined with "Plot" between them.
+
+    Args:
+        tokens (tuple[str, ...]): Upper case tokens of the line. For example: ('C', 'L2', '182')
+
+    Returns:
+        str: For example: 'C_L2_Plot_182'
+    """
+    return "_".join(tokens[:2] + ("Plot",) + tokens[-1:])
+
+
+class NormalizedBatch:
+    """
+    Recognized text of many images normalized into columns with one row per line.
+
+    Args:
+        recognized_text_lists (list[list[str]]): Recognized text of each image.
+            For example: [["C L2 182", "Time"], ["A L1 101 WC0101"]]
+
+    Values:
+        amount_images (int): For example: 2
+
+        image_indexes (NDArray[np.int32]): Index of the image of the line. For example: array([0, 0, 1])
+
+        line_indexes (NDArray[np.int32]): Index of the line in the recognized text of its image.
+            For example: array([0, 1, 0])
+
+        candidate_keys (NDArray[np.str_]): The key which the line can match.
+            For example: array(['C_L2_Plot_182', 'TIME_Plot_TIME', 'A_L1_Plot_WC0101'])
+
+        lines (list[str]): The recognized lines. For example: ['C L2 182', 'Time', 'A L1 101 WC0101']
+    """
+
+    def __init__(self, recognized_text_lists: list[list[str]]) -> None:
+        self.amount_images: int = len(recognized_text_lists)
+        self.lines: list[str] = [
+            recognized_word
+            for recognized_text_list in recognized_text_lists
+            for recognized_word in recognized_text_list
+        ]
+        amounts_lines: NDArray[np.int64] = np.fromiter(
+            (len(recognized_text_list) for recognized_text_list in recognized_text_lists),
+            dtype=np.int64,
+            count=self.amount_images,
+        )
+        self.image_indexes: NDArray[np.int32] = np.repeat(
+            np.arange(self.amount_images, dtype=np.int32), amounts_lines
+        )
+        # Index of the line = its row - the row of the first line of its image
+        first_rows: NDArray[np.int64] = np.cumsum(amounts_lines) - amounts_lines
+        self.line_indexes: NDArray[np.int32] = (
+            np.arange(len(self.lines), dtype=np.int64) - np.repeat(first_rows, amounts_lines)
+        ).astype(np.int32)
+        self.candidate_keys: NDArray[np.str_] = np.array(
+            [get_candidate_key(get_line_tokens(recognized_word)) for recognized_word in self.lines], dtype=np.str_
+        )
+
+
+def match_batch(
+    normalized_batch: NormalizedBatch, matcher: BlockLevelPlotMatcher
+) -> tuple[list[str | bool], list[str | None], list[float]]:
+    """
+    Matches the recognized text of all images of the batch with the dictionary by the hash join
+    of the unique candidate keys with the keys of the dictionary.
+    The same folder names as BlockLevelPlotMatcher.get_folder_name for each image:
+    the line matches the key equal to its candidate key, and the first key of the dictionary wins.
+    Images without the exact match are matched by matcher.get_folder_name_with_score, so the fuzzy matcher
+    still finds the keys of lines with OCR errors.
+
+    Args:
+        normalized_batch (NormalizedBatch): The normalized recognized text of the images.
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+    Returns:
+        tuple[list[str | bool], list[str | None], list[float]]: The folder name or False, the matched line
+            or None and the score of the match of each image: 1.0 for the exact match,
+            the score of FuzzyBlockLevelPlotMatcher for the fuzzy match, 0.0 if no key matched.
+            For example: (['C_L2_Plot_182', False], ['C L2 182', None], [1.0, 0.0])
+    """
+    amount_images: int = normalized_batch.amount_images
+    # Hash join: one lookup in the dictionary for each unique candidate key
+    unique_keys, inverse = np.unique(normalized_batch.candidate_keys, return_inverse=True)
+    unique_positions: NDArray[np.int64] = np.fromiter(
+        (matcher.key_positions.get(str(key), -1) for key in unique_keys), dtype=np.int64, count=len(unique_keys)
+    )
+    positions: NDArray[np.int64] = unique_positions[inverse.reshape(-1)]
+
+    # The smallest position of the matched keys of each image
+    is_matched: NDArray[np.bool_] = positions >= 0
+    no_match: int = np.iinfo(np.int64).max
+    best_positions: NDArray[np.int64] = np.full(amount_images, no_match, dtype=np.int64)
+    np.minimum.at(best_positions, normalized_batch.image_indexes[is_matched], positions[is_matched])
+
+    key_by_position: dict[int, str] = {position: key for key, position in matcher.key_positions.items()}
+    # The first line of each image with the best key, rows are in the order of the lines
+    matched_rows: NDArray[np.intp] = np.flatnonzero(
+        is_matched & (positions == best_positions[normalized_batch.image_indexes])
+    )
+    matched_lines: list[str | None] = [None] * amount_images
+    for row in matched_rows[::-1].tolist():
+        matched_lines[int(normalized_batch.image_indexes[row])] = normalized_batch.lines[row]
+
+    folder_names: list[str | bool] = [
+        key_by_position[position] if position != no_match else False for position in best_positions.tolist()
+    ]
+    confidences: list[float] = [1.0 if folder_name else 0.0 for folder_name in folder_names]
+    # The fuzzy matcher matches lines which are not equal to keys
+    if isinstance(matcher, FuzzyBlockLevelPlotMatcher):
+        lines_by_image: list[list[str]] = [[] for _ in range(amount_images)]
+        for image_index, recognized_word in zip(normalized_batch.image_indexes.tolist(), normalized_batch.lines):
+            lines_by_image[image_index].append(recognized_word)
+        for image_index, folder_name in enumerate(folder_names):
+            if folder_name is False:
+                folder_names[image_index], score = matcher.get_folder_name_with_score(lines_by_image[image_index])
+                # The best score below min_score is not the confidence of an unmatched image
+                if folder_names[image_index]:
+                    confidences[image_index] = score
+                    matched_lines[image_index] = next(
+                        (
+                            recognized_word
+                            for recognized_word in lines_by_image[image_index]
+                            if folder_names[image_index] in matcher.get_matched_keys(recognized_word)
+                        ),
+                        None,
+                    )
+    return folder_names, matched_lines, confidences
@@ -0,0 +1,262 @@
+"""The module contains the watch mode which recognizes images as soon as they arrive to the folder"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.helpers_func import move_recognized_image
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.recognition import get_coordinates_region_of_interest, recognize_text_from_image
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
+# inotify events of the file which finished writing or was moved to the folder
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_TO: int = 0x00000080
+# struct inotify_event: int wd, uint32_t mask, uint32_t cookie, uint32_t len, char name[len]
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+def get_file_key(img_full_path: Path) -> str:
+    """
+    The function returns the key of the file version for the journal of processed files.
+
+    Args:
+        img_full_path (Path): Abs path to the image
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
+
+    Returns:
+        file_key (str): Name, size and modification time of the file.
+            For example: 'AADC5918.JPG:2841934:1742832240000000000'
+    """
+    stat_result = img_full_path.stat()
+    return f"{img_full_path.name}:{stat_result.st_size}:{stat_result.st_mtime_ns}"
+
+
+class ProcessedFilesJournal:
+    """
+    Append-only journal of processed images in the JSON Lines file.
+    Loaded once at start, so a restart never processes the same version of a file again.
+    Images which failed are journaled with the error, so a broken file is not read again on every event.
+
+    Args:
+        path_to_journal (Path): Relative or absolute path to the journal.
+            For example: Path("processed_images.jsonl")
+    """
+
+    def __init__(self, path_to_journal: Path) -> None:
+        self.path_to_journal = path_to_journal
+        self.processed_file_keys: set[str] = set()
+        if path_to_journal.exists():
+            with open(path_to_journal, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        self.processed_file_keys.add(json.loads(line)["file_key"])
+                    except (ValueError, KeyError):
+                        # The last line can be broken if the process was killed while writing it
+                        continue
+
+    def is_processed(self, file_key: str) -> bool:
+        """
+        Checks if the version of the file was processed.
+
+        Args:
+            file_key (str): Key of the file version. For example: 'AADC5918.JPG:2841934:1742832240000000000'
+
+        Returns:
+            bool: True if the file was processed.
+        """
+        return file_key in self.processed_file_keys
+
+    def add(self, file_key: str, folder_name: str | bool, error: str | None = None) -> None:
+        """
+        Adds the processed file to the journal and flushes it to the disk.
+
+        Args:
+            file_key (str): Key of the file version. For example: 'AADC5918.JPG:2841934:1742832240000000000'
+
+            folder_name (str | bool): The name of the block-level plot folder or False.
+                For example: 'C_L2_Plot_182'
+
+            error (str | None): The error if the image failed. By default None.
+                For example: 'Image can not be read: D:/.../images_for_recognize/AADC5918.JPG'
+        """
+        record: dict[str, object] = {"file_key": file_key, "folder_name": folder_name}
+        if error is not None:
+            record["error"] = error
+        with open(self.path_to_journal, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.processed_file_keys.add(file_key)
+
+
+def iter_inotify_written_files(folder_images_full_path: Path, timeout: float = 1.0) -> Iterator[Path | None]:
+    """
+    Yields files which finished writing or were moved to the folder, using Linux inotify.
+    Yields None every timeout seconds without events.
+
+    Args:
+        folder_images_full_path (Path): Abs path to the watched folder.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
+
+        timeout (float): Seconds to wait for events before yielding None. By default 1.0.
+
+    Raises:
+        OSError: If inotify is not available.
+
+    Yields:
+        Path | None: Abs path to the written file or None.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError("inotify is available only on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    inotify_fd: int = libc.inotify_init1(os.O_CLOEXEC)
+    if inotify_fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    try:
+        watch_descriptor: int = libc.inotify_add_watch(
+            inotify_fd, os.fsencode(folder_images_full_path), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        if watch_descriptor < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder_images_full_path}")
+        while True:
+            readable, _, _ = select.select([inotify_fd], [], [], timeout)
+            if not readable:
+                yield None
+                continue
+            buffer: bytes = os.read(inotify_fd, 64 * 1024)
+            offset: int = 0
+            while offset < len(buffer):
+                _, _, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                name: bytes = buffer[offset:offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if name:
+                    yield folder_images_full_path / os.fsdecode(name)
+    finally:
+        os.close(inotify_fd)
+
+
+def iter_polling_written_files(
+    folder_images_full_path: Path, poll_interval: float = 2.0
+) -> Iterator[Path | None]:
+    """
+    Yields files of the folder which were not modified for poll_interval seconds,
+    so files which are still being written are skipped until the next poll.
+    Yields None after each poll.
+
+    Args:
+        folder_images_full_path (Path): Abs path to the watched folder.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
+
+        poll_interval (float): Seconds between polls of the folder. By default 2.0.
+
+    Yields:
+        Path | None: Abs path to the written file or None.
+    """
+    while True:
+        now: float = time.time()
+        with os.scandir(folder_images_full_path) as entries:
+            for entry in entries:
+                if entry.is_file() and now - entry.stat().st_mtime >= poll_interval:
+                    yield Path(entry.path)
+        yield None
+        time.sleep(poll_interval)
+
+
+def watch_folder(
+    folder_images_full_path: Path,
+    ocr: "PaddleOCR",
+    matcher: BlockLevelPlotMatcher,
+    folder_with_target_folders_by_location_apartments: str = "folder_by_block_level_plot",
+    path_to_journal: Path = Path("processed_images.jsonl"),
+    poll_interval: float = 2.0,
+    decode_scale: int = 1,
+) -> None:
+    """
+    Watches the folder and recognizes each ".jpg" image once it finished writing.
+    Uses inotify on Linux and polling of the folder on other systems.
+    Processed images are written to the journal, so a restart never processes them again.
+    An error of reading, OCR or moving of one image is journaled as failed and does not stop the watch.
+    Runs until it is stopped by Ctrl+C.
+
+    Args:
+        folder_images_full_path (Path): Abs path to the watched folder.
+            WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
+
+        ocr (PaddleOCR): Экземпляр класса PaddleOCR
+
+        matcher (BlockLevelPlotMatcher): Matcher built from the dictionary of block-level plots.
+
+        folder_with_target_folders_by_location_apartments (str): The folder with block-level plot folders.
+            By default "folder_by_block_level_plot".
+
+        path_to_journal (Path): Path to the journal of processed images. By default "processed_images.jsonl".
+
+        poll_interval (float): Seconds between polls when inotify is not available. By default 2.0.
+
+        decode_scale (int): Decode the images with the resolution reduced by 1, 2, 4 or 8 times. By default 1.
+    """
+    journal = ProcessedFilesJournal(path_to_journal)
+
+    def process_image(img_full_path: Path) -> None:
+        if img_full_path.suffix.lower() != ".jpg" or not img_full_path.is_file():
+            return
+        try:
+            file_key: str = get_file_key(img_full_path)
+        except OSError:
+            # The file was moved or removed after the event
+            return
+        if journal.is_processed(file_key):
+            return
+        print(f"Processing image: {img_full_path}")
+        try:
+            coordinates_roi: NDArray[np.uint8] = get_coordinates_region_of_interest(
+                img_full_path, decode_scale
+            )
+            recognized_text_list: list[str] = recognize_text_from_image(
+                ocr, coordinates_roi, only_horizontal=True
+            )
+            folder_name: str | bool = move_recognized_image(
+                img_full_path,
+                recognized_text_list,
+                matcher,
+                folder_with_target_folders_by_location_apartments,
+            )
+        except Exception as error:
+            print(f"Error of processing image: {img_full_path}: {error}")
+            journal.add(file_key, False, error=str(error))
+            return
+        journal.add(file_key, folder_name)
+
+    try:
+        written_files: Iterator[Path | None] = iter_inotify_written_files(folder_images_full_path)
+        # Start inotify before the scan of existing images, so no image is missed between them
+        next(written_files)
+        print(f"Watching folder with inotify: {folder_images_full_path}")
+    except OSError:
+        written_files = iter_polling_written_files(folder_images_full_path, poll_interval)
+        print(f"Watching folder with polling every {poll_interval} s: {folder_images_full_path}")
+
+    # Images which arrived before the start
+    for img_full_path in sorted(folder_images_full_path.iterdir()):
+        process_image(img_full_path)
+    try:
+        for img_full_path in written_files:
+            if img_full_path is not None:
+                process_image(img_full_path)
+    except KeyboardInterrupt:
+        pass
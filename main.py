@@ -1,16 +1,55 @@
+import argparse
 import logging
 import os
 import shutil
 from pathlib import Path
 from pprint import pprint
+from time import perf_counter
 
 import cv2
 import numpy as np
 from numpy.typing import NDArray
-from paddleocr import PaddleOCR
 
-from helpers.data import get_simple_dict_block_level_plot_from_file as get_dict_block_level_plot
-from helpers.helpers_func import get_folder_images
+from helpers.adaptive_roi import RoiPresets, recognize_image_with_adaptive_roi
+from helpers.async_mover import AsyncImageMover
+from helpers.buffer_pool import RoiBufferPool, recognize_image_with_buffer_pool
+from helpers.compiled_data import get_compiled_artifact, get_compiled_dict_block_level_plot
+from helpers.daemon import run_recognition_daemon
+from helpers.fuzzy_matcher import FuzzyBlockLevelPlotMatcher
+from helpers.helpers_func import get_folder_images, move_recognized_image
+from helpers.matcher import BlockLevelPlotMatcher, check_for_match_block_level_plot
+from helpers.metrics import StageMetrics
+from helpers.move_plan import MovePlanWriter, apply_move_plan, get_move_plan_record
+from helpers.near_duplicates import cluster_near_duplicate_images, get_representative_by_path
+from helpers.ocr_backends import (
+    FallbackOcrBackend,
+    OcrBackend,
+    PaddleOcrBackend,
+    StampTemplateOcrBackend,
+    recognize_image_with_backend,
+)
+from helpers.ocr_cache import OcrCache, get_file_hash, get_parameters_hash
+from helpers.parallel_runner import run_parallel_recognition
+from helpers.pipeline import run_pipeline_recognition
+from helpers.recognition import (
+    ImageReadError,
+    get_coordinates_region_of_interest,
+    get_paddle_ocr,
+    get_recognition_parameters,
+    recognize_image_with_metrics,
+    recognize_text_from_image,
+    recognize_text_from_images,
+)
+from helpers.run_journal import (
+    STATUS_FAILED,
+    STATUS_MATCHED,
+    STATUS_MOVED,
+    STATUS_RECOGNIZED,
+    STATUS_STARTED,
+    RunJournal,
+)
+from helpers.text_normalization import NormalizedBatch, match_batch
+from helpers.watch_folder import get_file_key, watch_folder
 
 
 def get_new_image_name(img_full_path: Path, word_modifier: str = "gray"):
@@ -27,186 +66,6 @@ def get_new_image_name(img_full_path: Path, word_modifier: str = "gray"):
     return new_image_name
 
 
-def recognize_text_from_image(
-    ocr: PaddleOCR, coordinates_roi: NDArray[np.uint8], only_horizontal: bool = True
-) -> list[str]:
-    """Function to recognize text from image.
-
-    Args:
-        ocr (PaddleOCR): Экземпляр класса PaddleOCR
-
-        coordinates_roi (NDArray[np.uint8]): Region of interest in the image for recognition
-            For example:
-                array([
-                        [ 95, 100, 100, ..., 203, 206, 207],
-                        [ 98,  99,  98, ..., 207, 207, 206],
-                        [100,  99,  97, ..., 211, 209, 208],
-                        ...,
-                        [ 39,  40,  39, ...,  86,  85,  84],
-                        [ 39,  41,  39, ...,  88,  85,  88],
-                        [ 41,  28,  39, ...,  89,  81,  87]
-                    ],
-                        shape=(1800, 1900), dtype=uint8)
-
-        only_horizontal (bool, optional): Опция для распознавания только горизонтального текста.
-            Defaults to True.
-
-    Values:
-        result_recognition (list[list[list[list[float, float], tuple[str, float]]]]):
-            For example:
-                [
-                    [
-                        [
-                            [[0.0, 0.0], [1.0, 1.0], [2.0, 2.0], [3.0, 3.0]],
-                            ("text", 0.99),
-                        ]
-                    ]
-                ]
-
-    Returns:
-        list[str]: _description_
-    """
-    result_recognition: list[
-        list[list[list[list[float, float],], tuple[str, float]]]
-    ] = ocr.ocr(coordinates_roi, cls=True, det=True)
-    # print(f"result_recognition in recognize_text_from_image: {result_recognition=}")
-
-    recognized_text_list = []
-    # If result_recognition is not empty and value is not None
-    if len(result_recognition) == 1 and result_recognition[0] is not None:
-        # For now angle - not working
-        if only_horizontal:
-            # Get only horizontal text from result_recognition and add to list recognized_text_list
-            for line in result_recognition:
-                for box, (text, score) in line:
-                    if "angle" in box:
-                        angle = box["angle"]
-                        # print(f"{angle=}")
-                    recognized_text_list.append(text)
-        else:
-            recognized_text_list = [
-                text_info[0] for line in result_recognition for _, text_info in line
-            ]
-    # print(f"recognized_text_list: {recognized_text_list=}")
-    return recognized_text_list
-
-
-def get_coordinates_region_of_interest(img_full_path: Path) -> NDArray[np.uint8]:
-    """Function to get coordinates of the region of interest
-    in the image for recognition.
-
-    Args:
-        img_full_path (Path): Abs path to the image
-            For example:
-                WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/AADC5918.JPG')
-
-    Values:
-        width_block_for_recognition (int): Width of the block for recognition
-            1900
-
-        height_block_for_recognition (int): Height of the block for recognition
-            1800
-
-    Returns:
-        roi (NDArray[np.uint8]): Region of interest in the image for recognition
-            For example:
-                array([
-                        [ 95, 100, 100, ..., 203, 206, 207],
-                        [ 98,  99,  98, ..., 207, 207, 206],
-                        [100,  99,  97, ..., 211, 209, 208],
-                        ...,
-                        [ 39,  40,  39, ...,  86,  85,  84],
-                        [ 39,  41,  39, ...,  88,  85,  88],
-                        [ 41,  28,  39, ...,  89,  81,  87]
-                    ],
-                        shape=(1800, 1900), dtype=uint8)
-    """
-    # Read image in grayscale
-    img_gray = cv2.imread(str(img_full_path), cv2.IMREAD_GRAYSCALE)
-    # img_height=4032
-    img_height: int = img_gray.shape[0]
-    # img_width=3024
-    img_width: int = img_gray.shape[1]
-    # Width of the block for recognition
-    width_block_for_recognition: int = 1900
-    # Height of the block for recognition
-    height_block_for_recognition: int = 1800
-    # Coordinates for region of interest
-    start_y: int = img_height - height_block_for_recognition
-    end_y: int = img_height
-    start_x: int = 0
-    end_x: int = width_block_for_recognition
-    # <class 'numpy.ndarray'>
-    roi: NDArray[np.uint8] = img_gray[start_y:end_y, start_x:end_x]
-    return roi
-
-
-def check_for_match_block_level_plot(key: str, recognized_word_with_plot: str) -> bool:
-    """
-    Checks if the recognized word with plot matches the given key based on specific criteria.
-
-    Args:
-        key (str): The reference key representing a block-level plot.
-            Example: "C_L2_Plot_182"
-
-        recognized_word_with_plot (str): The recognized word containing plot information.
-            Example: "C_L2_Plot_182_WC0214"
-
-    Returns:
-        bool: True if the recognized word matches the key based on block and level criteria, False otherwise.
-
-    Example:
-        key = "C_L2_Plot_182"
-        recognized_word_with_plot = "C_L2_Plot_182_WC0214"
-        Result: True (if block and level match)
-    """
-    # print(f"{key=}, {recognized_word_with_plot=}")
-
-    # key = "C_L2_Plot_182"
-    # recognized_word_with_plot = "C_L2_Plot_182_WC0214"
-
-    # list_block_level_plot = ["C", "L2", "Plot", "182"]
-    list_block_level_plot: list[str] = key.split("_")
-    # recognized_number_list = ["C", "L2", "Plot", "182", "WC0214"]
-    recognized_number_list: list[str] = recognized_word_with_plot.split()
-
-    # If length of recognized_number_list is 3
-    if len(recognized_number_list) == 3:
-        # letter_block_from_dict='C'
-        letter_block_from_dict: str = list_block_level_plot[0]
-        # letter_block_recognized='C'
-        letter_block_recognized: str | None = (
-            recognized_number_list[0] if recognized_number_list[0].isalpha() else None
-        )
-
-        # level_from_dict='L2'
-        level_from_dict: str = list_block_level_plot[1]
-        # level_recognized='L2'
-        level_recognized: str | None = (
-            recognized_number_list[1]
-            if recognized_number_list[1][0].isalpha()
-            and recognized_number_list[1][1:].isdigit()
-            else None
-        )
-        """
-        If letter_block_recognized and level_recognized are not None and equal to
-        letter_block_from_dict and level_from_dict
-        """
-        if (
-            letter_block_recognized is not None and letter_block_recognized == letter_block_from_dict
-            and level_recognized is not None and level_recognized == level_from_dict
-        ):
-            return True
-        """
-        Else if letter_block_recognized is None and level_recognized is None
-        or level_recognized is not equal to level_from_dict
-        or letter_block_recognized is not equal to letter_block_from_dict
-        """
-        return False
-    # Else if length of recognized_number_list not equal 3 - return False
-    return False
-
-
 def get_folder_name_from_dict_block_level_plot(
     dict_block_level_plot: dict[str, tuple[str, ...]], recognized_text_list: list[str]
 ) -> str | bool:
@@ -297,23 +156,487 @@ def get_folder_name_from_dict_block_level_plot(
     return all_match
 
 
+def get_arguments() -> argparse.Namespace:
+    """Function to parse the command line arguments of main().
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+            For example: Namespace(workers=4, batch_size=1, decode_scale=2, ocr_cache=None, ...)
+    """
+    parser = argparse.ArgumentParser(description="Recognize images and group them by block-level plot")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Amount of worker processes for OCR. 0 - recognize images one by one in this process",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Amount of images recognized by OCR together in one batch",
+    )
+    parser.add_argument(
+        "--decode-scale",
+        type=int,
+        choices=(1, 2, 4, 8),
+        default=1,
+        help="Decode images with the resolution reduced by this scale, the region of interest is scaled to match",
+    )
+    parser.add_argument(
+        "--ocr-cache",
+        type=Path,
+        default=None,
+        help="Path to the SQLite cache of recognized text, re-runs skip OCR for unchanged images",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Read images, run OCR and move images in parallel stages connected by bounded queues",
+    )
+    parser.add_argument(
+        "--loader-threads",
+        type=int,
+        default=4,
+        help="Amount of threads which read and crop images in the pipeline mode",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the local HTTP daemon which keeps the OCR models loaded between requests",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port of the daemon on 127.0.0.1",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Watch the folder with images and recognize new images as soon as they finish writing",
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        default=Path("processed_images.jsonl"),
+        help="Path to the journal of processed images in the watch mode",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between polls of the folder in the watch mode when inotify is not available",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        default=None,
+        help="Path to export durations of the stages: Prometheus text format for '.prom', otherwise JSON",
+    )
+    parser.add_argument(
+        "--ocr-backend",
+        choices=("paddle", "stamp"),
+        default="paddle",
+        help="OCR of images one by one: PaddleOCR or the fast recognizer of the stamp font with PaddleOCR as fallback",
+    )
+    parser.add_argument(
+        "--stamp-templates",
+        type=Path,
+        default=Path("info/stamp_templates"),
+        help="Folder with the templates of the stamp font saved by python -m helpers.ocr_backends",
+    )
+    parser.add_argument(
+        "--min-stamp-confidence",
+        type=float,
+        default=0.8,
+        help="Images with a line recognized by the stamp backend with a lower confidence are recognized by PaddleOCR",
+    )
+    parser.add_argument(
+        "--localize-text",
+        action="store_true",
+        help="Find the stamp lines by thresholding and pass only their strips to PaddleOCR without the detector",
+    )
+    parser.add_argument(
+        "--early-exit",
+        action="store_true",
+        help="Recognize lines from top to bottom and stop at the first line which matches the dictionary",
+    )
+    parser.add_argument(
+        "--adaptive-roi",
+        action="store_true",
+        help="Start from a small bottom left corner and grow it until the text matches the dictionary",
+    )
+    parser.add_argument(
+        "--roi-presets",
+        type=Path,
+        default=Path("info/roi_presets.json"),
+        help="Path to the corner sizes learned by the camera resolution in the adaptive ROI mode",
+    )
+    parser.add_argument(
+        "--fuzzy-match",
+        action="store_true",
+        help="Match recognized text with the dictionary tolerating OCR confusions as O/0 and I/1 in the plot or window",
+    )
+    parser.add_argument(
+        "--min-match-score",
+        type=float,
+        default=0.85,
+        help="Lowest score from 0 to 1 of the fuzzy match",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Group nearly identical photos with the same stamp and recognize one photo of each group",
+    )
+    parser.add_argument(
+        "--max-hash-distance",
+        type=int,
+        default=6,
+        help="The largest Hamming distance of the 64-bit perceptual hashes of nearly identical photos",
+    )
+    parser.add_argument(
+        "--max-stamp-difference",
+        type=float,
+        default=0.03,
+        help="The largest part of different strokes of the first lines of the stamps of nearly identical photos",
+    )
+    parser.add_argument(
+        "--plan",
+        type=Path,
+        default=None,
+        help="Write the manifest of moves (JSON Lines, or CSV for '.csv') instead of moving images",
+    )
+    parser.add_argument(
+        "--apply-plan",
+        type=Path,
+        default=None,
+        help="Move the images of the manifest written with --plan without OCR",
+    )
+    parser.add_argument(
+        "--run-journal",
+        type=Path,
+        default=None,
+        help="Path to the journal of statuses of images, a restart skips finished images and reuses recognized text",
+    )
+    parser.add_argument(
+        "--async-move",
+        action="store_true",
+        help="Move images in background threads by os.rename, or by a parallel copy between file systems",
+    )
+    parser.add_argument(
+        "--move-workers",
+        type=int,
+        default=4,
+        help="Amount of threads which move images in the async move mode",
+    )
+    parser.add_argument(
+        "--create-folders",
+        action="store_true",
+        help="Create missing folders of all keys of the dictionary in the async move mode",
+    )
+    parser.add_argument(
+        "--buffer-pool",
+        action="store_true",
+        help="Read images into reusable buffers and keep only a copy of the region of interest, not the full frame",
+    )
+    parser.add_argument(
+        "--max-frame-mb",
+        type=float,
+        default=None,
+        help="Cap of the decoded frame in the buffer pool mode, larger images are decoded with a reduced scale",
+    )
+    arguments: argparse.Namespace = parser.parse_args()
+
+    # Modes which move images themselves, the manifest would not be written
+    if arguments.plan is not None:
+        for option, is_used in (
+            ("--daemon", arguments.daemon),
+            ("--watch", arguments.watch),
+            ("--workers", arguments.workers > 0),
+            ("--pipeline", arguments.pipeline),
+            ("--apply-plan", arguments.apply_plan is not None),
+        ):
+            if is_used:
+                parser.error(f"--plan can not be used with {option}, this mode moves images")
+
+    # Options which the mode does not support would be ignored silently
+    is_mode_used: dict[str, bool] = {
+        "--batch-size": arguments.batch_size > 1,
+        "--workers": arguments.workers > 0,
+        "--pipeline": arguments.pipeline,
+        "--adaptive-roi": arguments.adaptive_roi,
+    }
+    for option, is_used, unsupported_modes in (
+        ("--ocr-cache", arguments.ocr_cache is not None, ("--pipeline",)),
+        ("--near-duplicates", arguments.near_duplicates, ("--batch-size", "--workers", "--pipeline")),
+        ("--run-journal", arguments.run_journal is not None, ("--batch-size", "--workers", "--pipeline")),
+        ("--buffer-pool", arguments.buffer_pool, ("--batch-size", "--workers", "--pipeline", "--adaptive-roi")),
+        ("--ocr-backend stamp", arguments.ocr_backend == "stamp", ("--batch-size", "--workers", "--pipeline")),
+        ("--localize-text", arguments.localize_text, ("--batch-size", "--workers", "--pipeline")),
+        ("--early-exit", arguments.early_exit, ("--batch-size", "--workers", "--pipeline")),
+        ("--adaptive-roi", arguments.adaptive_roi, ("--batch-size", "--workers", "--pipeline")),
+        ("--async-move", arguments.async_move, ("--workers", "--pipeline")),
+    ):
+        for mode in unsupported_modes:
+            if is_used and is_mode_used[mode]:
+                parser.error(f"{option} can not be used with {mode}")
+    return arguments
+
+
 def main() -> None:
+    arguments: argparse.Namespace = get_arguments()
+    path_to_file_with_locations_apartments_by_window_titles = Path(
+        "info/locations_apartments_by_window_titles.txt"
+    )
+    folder_with_target_folders_by_location_apartments = "folder_by_block_level_plot"
+
+    # Daemon mode - recognize images from requests with the OCR models loaded once
+    if arguments.daemon:
+        run_recognition_daemon(
+            arguments.port,
+            path_to_file_with_locations_apartments_by_window_titles,
+            folder_with_target_folders_by_location_apartments,
+            decode_scale=arguments.decode_scale,
+        )
+        return
+
+    # Apply mode - move the images of the manifest, recognized on another computer
+    if arguments.apply_plan is not None:
+        apply_move_plan(
+            arguments.apply_plan,
+            Path.cwd() / "images_for_recognize",
+            folder_with_target_folders_by_location_apartments,
+        )
+        return
+
+    # Watch mode - recognize images as they arrive, the folder can be empty at start
+    if arguments.watch:
+        dict_block_level_plot_watch, matcher_watch = get_compiled_dict_block_level_plot(
+            path_to_file_with_locations_apartments_by_window_titles
+        )
+        if arguments.fuzzy_match:
+            matcher_watch = FuzzyBlockLevelPlotMatcher(dict_block_level_plot_watch, arguments.min_match_score)
+        watch_folder(
+            Path.cwd() / "images_for_recognize",
+            get_paddle_ocr(),
+            matcher_watch,
+            folder_with_target_folders_by_location_apartments,
+            path_to_journal=arguments.journal,
+            poll_interval=arguments.poll_interval,
+            decode_scale=arguments.decode_scale,
+        )
+        return
+
     # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize')
     folder_images_full_path = get_folder_images(r"images_for_recognize")
     # print(f"{folder_images_full_path=}")
-    # use_angle_cls - определять угол текста
-    ocr: PaddleOCR = PaddleOCR(use_angle_cls=True, lang="en")
     # If folder_images_full_path not None
     if folder_images_full_path is not None:
-        path_to_file_with_locations_apartments_by_window_titles = Path(
-            "info/locations_apartments_by_window_titles.txt"
-        )
-        dict_block_level_plot: dict[str, tuple[str, ...]] = get_dict_block_level_plot(
+        # The dictionary and its inverted index are loaded from the compiled artifact,
+        # which is compiled again only when the text file changes
+        compiled_artifact: dict[str, object] = get_compiled_artifact(
             path_to_file_with_locations_apartments_by_window_titles
         )
+        dict_block_level_plot: dict[str, tuple[str, ...]] = compiled_artifact["dict_block_level_plot"]
+        matcher: BlockLevelPlotMatcher = compiled_artifact["matcher"]
+        if arguments.fuzzy_match:
+            matcher = FuzzyBlockLevelPlotMatcher(dict_block_level_plot, arguments.min_match_score)
         # print(f"{dict_block_level_plot=}")
 
-        folder_with_target_folders_by_location_apartments = "folder_by_block_level_plot"
+        img_full_paths: list[Path] = [
+            img_full_path
+            for img_full_path in folder_images_full_path.iterdir()
+            if img_full_path.suffix.lower() == ".jpg"
+        ]
+
+        # Durations of the stages of the recognition
+        metrics = StageMetrics()
+        start_run: float = perf_counter()
+        amount_images: int = 0
+        ocr_cache: OcrCache | None = OcrCache(arguments.ocr_cache) if arguments.ocr_cache else None
+        # Cap of the decoded frame of the buffer pool, larger images are recognized with the reduced resolution
+        max_frame_bytes: int | None = (
+            int(arguments.max_frame_mb * 1024 * 1024) if arguments.buffer_pool and arguments.max_frame_mb else None
+        )
+        parameters_hash: str = get_parameters_hash(
+            get_recognition_parameters(
+                arguments.decode_scale,
+                arguments.ocr_backend,
+                arguments.localize_text,
+                arguments.early_exit,
+                arguments.adaptive_roi,
+                # The hash of the text file is stored in the artifact, the file is not hashed again
+                compiled_artifact["source_hash"],
+                arguments.min_match_score if arguments.fuzzy_match else None,
+                max_frame_bytes,
+            )
+        )
+
+        # Parallel mode - OCR in worker processes, matching and moving in this process
+        if arguments.workers > 0:
+            run_parallel_recognition(
+                img_full_paths,
+                matcher,
+                folder_with_target_folders_by_location_apartments,
+                workers=arguments.workers,
+                decode_scale=arguments.decode_scale,
+                ocr_cache=ocr_cache,
+                metrics=metrics,
+            )
+            if ocr_cache is not None:
+                ocr_cache.close()
+            if arguments.metrics is not None:
+                metrics.export(arguments.metrics)
+            return
+
+        # Pipeline mode - loader threads, OCR in this thread and the mover thread
+        if arguments.pipeline:
+            run_pipeline_recognition(
+                img_full_paths,
+                get_paddle_ocr(),
+                matcher,
+                folder_with_target_folders_by_location_apartments,
+                loader_threads=arguments.loader_threads,
+                decode_scale=arguments.decode_scale,
+                metrics=metrics,
+            )
+            if arguments.metrics is not None:
+                metrics.export(arguments.metrics)
+            return
+
+        # PaddleOCR is created on the first image which is not in the cache or the journal
+        paddle_backend = PaddleOcrBackend(localize_text=arguments.localize_text)
+        # The fast recognizer of the stamp font, PaddleOCR only for images with low confidence
+        ocr_backend: OcrBackend | None = None
+        if arguments.ocr_backend == "stamp":
+            stamp_backend: StampTemplateOcrBackend
+            if (arguments.stamp_templates / "templates.json").exists():
+                stamp_backend = StampTemplateOcrBackend.from_folder(arguments.stamp_templates)
+            else:
+                # Templates of the camera font are saved by python -m helpers.ocr_backends
+                print(f"No templates in {arguments.stamp_templates}, the templates of the Hershey font are used")
+                stamp_backend = StampTemplateOcrBackend.from_hershey_font()
+            ocr_backend = FallbackOcrBackend(stamp_backend, paddle_backend, arguments.min_stamp_confidence)
+        elif arguments.localize_text or arguments.early_exit or arguments.adaptive_roi:
+            ocr_backend = paddle_backend
+        roi_presets: RoiPresets | None = RoiPresets(arguments.roi_presets) if arguments.adaptive_roi else None
+        # Statuses of images of the previous runs, an interrupted run resumes where it stopped
+        run_journal: RunJournal | None = RunJournal(arguments.run_journal) if arguments.run_journal else None
+        # Async move mode - the folders of the keys are checked once, images are moved in background threads
+        mover: AsyncImageMover | None = (
+            AsyncImageMover(
+                dict_block_level_plot,
+                folder_with_target_folders_by_location_apartments,
+                create_folders=arguments.create_folders,
+                max_workers=arguments.move_workers,
+            )
+            if arguments.async_move
+            else None
+        )
+        # Buffer pool mode - the regions of interest are read into reusable buffers with the capped frame
+        buffer_pool: RoiBufferPool | None = (
+            RoiBufferPool(arguments.decode_scale, max_frame_bytes)
+            if arguments.buffer_pool
+            else None
+        )
+        # Plan mode - records of the manifest instead of moves
+        move_plan_writer: MovePlanWriter | None = MovePlanWriter(arguments.plan) if arguments.plan else None
+        # Photo -> the first photo of its group of nearly identical photos, the text of the group is recognized once
+        representative_by_path: dict[Path, Path] = {}
+        recognized_text_by_representative: dict[Path, list[str]] = {}
+        amount_near_duplicates: int = 0
+        if arguments.near_duplicates:
+            with metrics.measure("near_duplicates"):
+                representative_by_path = get_representative_by_path(
+                    cluster_near_duplicate_images(
+                        img_full_paths, arguments.max_hash_distance, arguments.max_stamp_difference
+                    )
+                )
+        # Batch mode - OCR of several images together
+        if arguments.batch_size > 1:
+            for start in range(0, len(img_full_paths), arguments.batch_size):
+                img_full_paths_batch: list[Path] = img_full_paths[start:start + arguments.batch_size]
+                # Recognized text of the images from the cache, None - image is not in the cache
+                recognized_text_lists: list[list[str] | None] = [None] * len(img_full_paths_batch)
+                file_hashes: list[str] = []
+                if ocr_cache is not None:
+                    file_hashes = [get_file_hash(img_full_path) for img_full_path in img_full_paths_batch]
+                    recognized_text_lists = [
+                        ocr_cache.get(file_hash, parameters_hash) for file_hash in file_hashes
+                    ]
+                # Indexes of the images to recognize by OCR
+                indexes_to_recognize: list[int] = [
+                    index
+                    for index, recognized_text_list in enumerate(recognized_text_lists)
+                    if recognized_text_list is None
+                ]
+                coordinates_rois: list[NDArray[np.uint8]] = []
+                # Indexes of the images which were read, the broken images do not stop the run
+                indexes_read: list[int] = []
+                for index in indexes_to_recognize:
+                    try:
+                        with metrics.measure("read_decode"):
+                            coordinates_rois.append(
+                                get_coordinates_region_of_interest(img_full_paths_batch[index], arguments.decode_scale)
+                            )
+                    except ImageReadError as error:
+                        print(f"Error of reading image: {img_full_paths_batch[index]}: {error}")
+                        continue
+                    indexes_read.append(index)
+                recognized_text_lists_batch: list[list[str]] = []
+                if coordinates_rois:
+                    # The duration of OCR of the whole batch
+                    with metrics.measure("ocr_batch"):
+                        recognized_text_lists_batch = recognize_text_from_images(
+                            paddle_backend.get_ocr(), coordinates_rois
+                        )
+                for index, recognized_text_list in zip(indexes_read, recognized_text_lists_batch):
+                    recognized_text_lists[index] = recognized_text_list
+                    if ocr_cache is not None:
+                        ocr_cache.set(file_hashes[index], parameters_hash, recognized_text_list)
+
+                # The text of the whole batch is normalized and matched with the dictionary at once
+                folder_names: list[str | bool] = [False] * len(img_full_paths_batch)
+                if move_plan_writer is None:
+                    with metrics.measure("match_batch"):
+                        folder_names = match_batch(
+                            NormalizedBatch(
+                                [recognized_text_list or [] for recognized_text_list in recognized_text_lists]
+                            ),
+                            matcher,
+                        )[0]
+                for img_full_path, recognized_text_list, folder_name in zip(
+                    img_full_paths_batch, recognized_text_lists, folder_names
+                ):
+                    if recognized_text_list is None:
+                        continue
+                    print(f"Processing image: {img_full_path}")
+                    amount_images += 1
+                    if move_plan_writer is not None:
+                        move_plan_writer.write(
+                            get_move_plan_record(img_full_path, recognized_text_list, matcher, metrics)
+                        )
+                        continue
+                    move_recognized_image(
+                        img_full_path,
+                        recognized_text_list,
+                        matcher,
+                        folder_with_target_folders_by_location_apartments,
+                        metrics=metrics,
+                        mover=mover,
+                        folder_name=folder_name,
+                    )
+            if move_plan_writer is not None:
+                move_plan_writer.close()
+            if mover is not None:
+                mover.close()
+            if ocr_cache is not None:
+                ocr_cache.close()
+            metrics.print_summary(amount_images, perf_counter() - start_run)
+            if arguments.metrics is not None:
+                metrics.export(arguments.metrics)
+            return
 
         for img_full_path in folder_images_full_path.iterdir():
             # img_full_path:
@@ -326,51 +649,141 @@ def main() -> None:
                 # # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/images_for_recognize/recognized_AJLX6735.JPG')
                 # new_image_name = get_new_image_name(img_full_path, "recognized")
 
-                # roi - region of interest, type - NDArray[np.uint8]
-                coordinates_roi: NDArray[np.uint8] = get_coordinates_region_of_interest(
-                    img_full_path
-                )
-                # recognized_text_list: ['CUSTOMER', 'POSTCODE', 'LEEM', 'NO.OF PALLETS', 'LEY', 'K734', '42']
-                recognized_text_list: list[str] = recognize_text_from_image(
-                    ocr, coordinates_roi, only_horizontal=True
+                # 'AADC5918.JPG:2841934:1742832240000000000'
+                file_key: str = ""
+                if run_journal is not None:
+                    file_key = get_file_key(img_full_path)
+                    skip_reason: str | None = run_journal.get_skip_reason(file_key)
+                    if skip_reason is not None:
+                        print(f"Skip image by the run journal: {skip_reason}")
+                        continue
+
+                recognized_text_list: list[str] | None = recognized_text_by_representative.get(
+                    representative_by_path.get(img_full_path, img_full_path)
                 )
+                if recognized_text_list is not None:
+                    print(f"Near-duplicate of {representative_by_path[img_full_path].name}, OCR is skipped")
+                    amount_near_duplicates += 1
+                elif (
+                    run_journal is not None
+                    and run_journal.get_recognized_text_list(file_key, parameters_hash) is not None
+                ):
+                    print("Text recognized in the previous run, OCR is skipped")
+                    recognized_text_list = run_journal.get_recognized_text_list(file_key, parameters_hash)
+                elif ocr_cache is not None:
+                    file_hash: str = get_file_hash(img_full_path)
+                    recognized_text_list = ocr_cache.get(file_hash, parameters_hash)
+
+                if recognized_text_list is None:
+                    if run_journal is not None:
+                        run_journal.add(file_key, STATUS_STARTED)
+                    # Read, crop the region of interest and recognize text with the duration of each stage
+                    # recognized_text_list: ['CUSTOMER', 'POSTCODE', 'LEEM', 'NO.OF PALLETS', 'LEY', 'K734', '42']
+                    try:
+                        if roi_presets is not None:
+                            recognized_text_list = recognize_image_with_adaptive_roi(
+                                ocr_backend,
+                                img_full_path,
+                                matcher,
+                                roi_presets,
+                                metrics,
+                                arguments.decode_scale,
+                                early_exit=arguments.early_exit,
+                            )
+                        elif buffer_pool is not None:
+                            recognized_text_list = recognize_image_with_buffer_pool(
+                                buffer_pool,
+                                paddle_backend,
+                                img_full_path,
+                                metrics,
+                                ocr_backend,
+                                matcher=matcher if arguments.early_exit else None,
+                            )
+                        elif ocr_backend is not None:
+                            recognized_text_list = recognize_image_with_backend(
+                                ocr_backend,
+                                img_full_path,
+                                metrics,
+                                arguments.decode_scale,
+                                matcher=matcher if arguments.early_exit else None,
+                            )
+                        else:
+                            recognized_text_list = recognize_image_with_metrics(
+                                paddle_backend.get_ocr(), img_full_path, metrics, arguments.decode_scale
+                            )
+                    except ImageReadError as error:
+                        # The broken image does not stop the run, other errors of OCR are not hidden
+                        print(f"Error of reading image: {img_full_path}: {error}")
+                        if run_journal is not None:
+                            run_journal.add(file_key, STATUS_FAILED, error=str(error))
+                        continue
+                    # The text of the image decoded with the reduced scale by the cap is not cached,
+                    # a run without the cap or with a larger cap recognizes it with the full resolution
+                    is_reduced: bool = (
+                        buffer_pool is not None and buffer_pool.last_decode_scale != arguments.decode_scale
+                    )
+                    if ocr_cache is not None and not is_reduced:
+                        ocr_cache.set(file_hash, parameters_hash, recognized_text_list)
+                if representative_by_path.get(img_full_path) == img_full_path:
+                    recognized_text_by_representative[img_full_path] = recognized_text_list
+                if run_journal is not None and run_journal.get_recognized_text_list(file_key, parameters_hash) is None:
+                    run_journal.add(
+                        file_key,
+                        STATUS_RECOGNIZED,
+                        recognized_text=recognized_text_list,
+                        parameters_hash=parameters_hash,
+                    )
                 # print(f"recognized_text_list: {recognized_text_list}")
 
-                if len(recognized_text_list) > 0:
-                    # 'A_L2_Plot_11'
-                    folder_name_to_remove_image: str | bool = (
-                        get_folder_name_from_dict_block_level_plot(
-                            dict_block_level_plot, recognized_text_list
-                        )
+                folder_name: str | bool
+                if move_plan_writer is not None:
+                    move_plan_record: dict[str, object] = get_move_plan_record(
+                        img_full_path, recognized_text_list, matcher, metrics
                     )
-                    print(f"folder_name_to_remove_image: {folder_name_to_remove_image}")
-
-                    # Если folder_name_to_remove_image существует и это строка - 'A_L2_Plot_11'
-                    if (
-                        folder_name_to_remove_image
-                        and type(folder_name_to_remove_image) is str
-                    ):
-                        # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/recognize_images/folder_by_block_level_plot/A_L2_Plot_11')
-                        abs_path_folder_block_level_plot = (
-                            Path().cwd()
-                            / folder_with_target_folders_by_location_apartments
-                            / folder_name_to_remove_image
-                        )
-                        # Убедиться что папка abs_path_folder_block_level_plot существует
-                        # и переместить в неё распознанный файл изображения img_full_path
-                        if abs_path_folder_block_level_plot.exists():
-                            shutil.move(img_full_path, abs_path_folder_block_level_plot)
-                            print(
-                                f"Move image: {img_full_path} to folder: {abs_path_folder_block_level_plot}"
-                            )
-                            # TODO - записати у текстовий документ номер вікна розпізнаного з фото.
-                            # TODO - реалізувати можливість отримати список вікон з назвами папок де вони знаходяться
-                            # TODO - в текстовому файлі записувати які вікна є в яких квартирах і скільки вікон
-                            # TODO - автоматизувати додавання TODO - фото з D:\WORK\Horand_LTD\TASKS_DOING_NOW\recognize_images\folder_by_block_level_plot
-                            # TODO - у пункт side_rise 2.3 і procore
-
-                            # TODO - через 1-2 тиждні одним скриптом реалізувати завантаження фото із whatsapp групи
-                            # TODO - у side-rise на asite і в procore
+                    move_plan_writer.write(move_plan_record)
+                    folder_name = str(move_plan_record["key"]) if move_plan_record["key"] else False
+                else:
+                    folder_name = move_recognized_image(
+                        img_full_path,
+                        recognized_text_list,
+                        matcher,
+                        folder_with_target_folders_by_location_apartments,
+                        metrics=metrics,
+                        mover=mover,
+                    )
+                if run_journal is not None:
+                    # The image stays in the folder if no folder of the key exists,
+                    # the async mover can still be moving it, so a restart matches its text again
+                    is_moved: bool = bool(folder_name) and not img_full_path.exists()
+                    run_journal.add(file_key, STATUS_MOVED if is_moved else STATUS_MATCHED, folder_name=folder_name)
+                amount_images += 1
+                # TODO - записати у текстовий документ номер вікна розпізнаного з фото.
+                # TODO - реалізувати можливість отримати список вікон з назвами папок де вони знаходяться
+                # TODO - в текстовому файлі записувати які вікна є в яких квартирах і скільки вікон
+                # TODO - автоматизувати додавання TODO - фото з D:\WORK\Horand_LTD\TASKS_DOING_NOW\recognize_images\folder_by_block_level_plot
+                # TODO - у пункт side_rise 2.3 і procore
+
+                # TODO - через 1-2 тиждні одним скриптом реалізувати завантаження фото із whatsapp групи
+                # TODO - у side-rise на asite і в procore
+
+        if move_plan_writer is not None:
+            move_plan_writer.close()
+            print(f"Manifest of moves: {arguments.plan}")
+        if mover is not None:
+            mover.close()
+        if roi_presets is not None:
+            roi_presets.save()
+        if ocr_cache is not None:
+            ocr_cache.close()
+        metrics.print_summary(amount_images, perf_counter() - start_run)
+        if isinstance(ocr_backend, FallbackOcrBackend):
+            print(f"Images recognized by PaddleOCR after the stamp backend: {ocr_backend.amount_fallbacks}")
+        if arguments.near_duplicates:
+            print(f"Images with the text of a nearly identical photo: {amount_near_duplicates}")
+        if buffer_pool is not None:
+            buffer_pool.print_summary()
+        if arguments.metrics is not None:
+            metrics.export(arguments.metrics)
 
     # # Show image
     # cv2.imshow("gray", coordinates_roi)
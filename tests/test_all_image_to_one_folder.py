@@ -0,0 +1,53 @@
+"""Tests of the plan of moves of images from nested folders to one folder"""
+
+from pathlib import Path
+
+from helpers.all_image_to_one_folder import flatten_images_to_one_folder, get_flatten_plan
+
+
+def create_files(folder: Path, *relative_paths: str) -> None:
+    for relative_path in relative_paths:
+        path_to_file: Path = folder / relative_path
+        path_to_file.parent.mkdir(parents=True, exist_ok=True)
+        path_to_file.write_bytes(relative_path.encode("utf-8"))
+
+
+def get_target_names(plan: list[tuple[Path, Path, bool]]) -> set[str]:
+    return {target_file.name for _, target_file, _ in plan}
+
+
+def test_images_of_nested_folders_are_planned(tmp_path: Path) -> None:
+    create_files(tmp_path / "src", "A.jpg", "Pictures/B.JPG", "Pictures/2025/March/C.jpg", "Pictures/notes.txt")
+    (tmp_path / "target").mkdir()
+    plan = get_flatten_plan(tmp_path / "src", tmp_path / "target")
+    assert {path_obj.name for path_obj, _, _ in plan} == {"A.jpg", "B.JPG", "C.jpg"}
+    assert get_target_names(plan) == {"A.jpg", "B.JPG", "C.jpg"}
+    assert all(target_file.parent == tmp_path / "target" and is_same_device for _, target_file, is_same_device in plan)
+
+
+def test_same_names_get_copy_numbers(tmp_path: Path) -> None:
+    create_files(tmp_path / "src", "A.jpg", "first/A.jpg", "second/a.jpg")
+    (tmp_path / "target").mkdir()
+    plan = get_flatten_plan(tmp_path / "src", tmp_path / "target")
+    assert {name.lower() for name in get_target_names(plan)} == {"a.jpg", "a_copy1.jpg", "a_copy2.jpg"}
+
+
+def test_names_taken_in_target_folder_are_skipped(tmp_path: Path) -> None:
+    create_files(tmp_path / "src", "A.jpg", "first/A.jpg")
+    # Windows does not distinguish the case of the names
+    create_files(tmp_path / "target", "a.JPG", "A_copy1.jpg")
+    plan = get_flatten_plan(tmp_path / "src", tmp_path / "target")
+    assert get_target_names(plan) == {"A_copy2.jpg", "A_copy3.jpg"}
+
+
+def test_target_folder_inside_source_folder_is_not_walked(tmp_path: Path) -> None:
+    create_files(tmp_path / "src", "A.jpg", "target/B.jpg")
+    plan = get_flatten_plan(tmp_path / "src", tmp_path / "src" / "target")
+    assert [(path_obj.name, target_file.name) for path_obj, target_file, _ in plan] == [("A.jpg", "A.jpg")]
+
+
+def test_flatten_moves_every_image(tmp_path: Path) -> None:
+    create_files(tmp_path / "src", "A.jpg", "first/A.jpg", "first/second/B.jpg")
+    assert flatten_images_to_one_folder(tmp_path / "src", tmp_path / "target") == 3
+    assert sorted(path.name for path in (tmp_path / "target").iterdir()) == ["A.jpg", "A_copy1.jpg", "B.jpg"]
+    assert not any(path.is_file() for path in (tmp_path / "src").rglob("*"))
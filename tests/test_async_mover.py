@@ -0,0 +1,27 @@
+"""Tests of the background mover of recognized images"""
+
+from pathlib import Path
+
+import pytest
+
+from helpers import async_mover
+from helpers.async_mover import AsyncImageMover
+
+
+def test_failed_copy_removes_temporary_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def copy_file_part(path_src_file: Path, path_target_file: Path, *_: object) -> None:
+        path_target_file.write_bytes(path_src_file.read_bytes()[:2])
+        raise OSError("The network share is not available")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(async_mover, "copy_file_in_chunks", copy_file_part)
+    img_full_path: Path = tmp_path / "AADC5918.JPG"
+    img_full_path.write_bytes(b"image")
+    mover = AsyncImageMover(["C_L2_Plot_182"], create_folders=True)
+    # The image is on another file system than the folders of block-level plots
+    mover.target_device = -1
+    mover.submit(img_full_path, "C_L2_Plot_182")
+    mover.close()
+    assert mover.amount_errors == 1
+    assert img_full_path.exists()
+    assert list((tmp_path / "folder_by_block_level_plot" / "C_L2_Plot_182").iterdir()) == []
@@ -0,0 +1,88 @@
+"""Tests of the compiled artifact of the dictionary of block-level plots"""
+
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+import helpers.compiled_data as compiled_data
+from helpers.compiled_data import COMPILED_DICT_BLOCK_LEVEL_PLOT_VERSION, get_compiled_dict_block_level_plot
+
+DICTIONARY_TEXT: str = "BLOCK A Level 1\nPlot 1\n\tWA0101\n\tWA0102\nBLOCK C Level 2\nPlot 182\n\tWC0218\n"
+
+
+@pytest.fixture
+def path_to_dictionary(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # The parser of the text file resolves relative paths
+    monkeypatch.chdir(tmp_path)
+    path_to_file = Path("dictionary.txt")
+    path_to_file.write_text(DICTIONARY_TEXT)
+    return path_to_file
+
+
+def count_calls(monkeypatch: pytest.MonkeyPatch, name: str) -> list[int]:
+    calls: list[int] = [0]
+    function = getattr(compiled_data, name)
+
+    def counted(*args: object) -> object:
+        calls[0] += 1
+        return function(*args)
+
+    monkeypatch.setattr(compiled_data, name, counted)
+    return calls
+
+
+def test_unchanged_file_is_loaded_without_parsing_and_hashing(
+    path_to_dictionary: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    dict_block_level_plot, _ = get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert dict_block_level_plot == {"A_L1_Plot_1": ("WA0101", "WA0102"), "C_L2_Plot_182": ("WC0218",)}
+    parse_calls = count_calls(monkeypatch, "get_simple_dict_block_level_plot_from_file")
+    hash_calls = count_calls(monkeypatch, "get_source_hash")
+    loaded_dict, matcher = get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert loaded_dict == dict_block_level_plot
+    assert matcher.get_folder_name(["C L2 182"]) == "C_L2_Plot_182"
+    assert parse_calls == [0] and hash_calls == [0]
+
+
+def test_new_time_with_same_content_is_hashed_once(path_to_dictionary: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    get_compiled_dict_block_level_plot(path_to_dictionary)
+    source_stat = path_to_dictionary.stat()
+    os.utime(path_to_dictionary, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 10**9))
+    parse_calls = count_calls(monkeypatch, "get_simple_dict_block_level_plot_from_file")
+    hash_calls = count_calls(monkeypatch, "get_source_hash")
+    get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert parse_calls == [0] and hash_calls == [1]
+    # The artifact is saved with the new time, the next run does not hash the file
+    get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert hash_calls == [1]
+
+
+def test_changed_content_compiles_again(path_to_dictionary: Path) -> None:
+    get_compiled_dict_block_level_plot(path_to_dictionary)
+    path_to_dictionary.write_text(DICTIONARY_TEXT + "BLOCK E Level 10\nPlot 305\n\tWE1005\n")
+    dict_block_level_plot, matcher = get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert dict_block_level_plot["E_L10_Plot_305"] == ("WE1005",)
+    assert matcher.get_folder_name(["E L10 305"]) == "E_L10_Plot_305"
+
+
+def test_artifact_of_other_version_compiles_again(path_to_dictionary: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    get_compiled_dict_block_level_plot(path_to_dictionary)
+    path_to_artifact: Path = path_to_dictionary.with_suffix(".pickle")
+    with open(path_to_artifact, "rb") as file:
+        artifact: dict[str, object] = pickle.load(file)
+    artifact["version"] = COMPILED_DICT_BLOCK_LEVEL_PLOT_VERSION - 1
+    with open(path_to_artifact, "wb") as file:
+        pickle.dump(artifact, file)
+    parse_calls = count_calls(monkeypatch, "get_simple_dict_block_level_plot_from_file")
+    get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert parse_calls == [1]
+    with open(path_to_artifact, "rb") as file:
+        assert pickle.load(file)["version"] == COMPILED_DICT_BLOCK_LEVEL_PLOT_VERSION
+
+
+def test_broken_artifact_compiles_again(path_to_dictionary: Path) -> None:
+    path_to_dictionary.with_suffix(".pickle").write_bytes(b"not a pickle")
+    dict_block_level_plot, _ = get_compiled_dict_block_level_plot(path_to_dictionary)
+    assert "A_L1_Plot_1" in dict_block_level_plot
@@ -0,0 +1,67 @@
+"""Tests of the matching of recognized text with the dictionary tolerant of OCR errors"""
+
+import pytest
+
+from helpers.fuzzy_matcher import FuzzyBlockLevelPlotMatcher
+
+DICT_BLOCK_LEVEL_PLOT: dict[str, tuple[str, ...]] = {
+    "A_L1_Plot_1": ("WA0101",),
+    "C_L2_Plot_182": ("WC0214", "WC0215"),
+    "C_L2_Plot_18": ("WC0201",),
+}
+
+
+@pytest.fixture
+def matcher() -> FuzzyBlockLevelPlotMatcher:
+    return FuzzyBlockLevelPlotMatcher(DICT_BLOCK_LEVEL_PLOT)
+
+
+@pytest.mark.parametrize(
+    "recognized_word, folder_name",
+    [
+        ("C L2 182", "C_L2_Plot_182"),
+        ("C L2 I82", "C_L2_Plot_182"),
+        ("c l2 18Z", "C_L2_Plot_182"),
+        ("A L1 5 WAO1O1", "A_L1_Plot_1"),
+        ("C L2 999 wC02I4", "C_L2_Plot_182"),
+    ],
+)
+def test_confusable_characters_match(
+    matcher: FuzzyBlockLevelPlotMatcher, recognized_word: str, folder_name: str
+) -> None:
+    assert matcher.get_folder_name([recognized_word]) == folder_name
+
+
+@pytest.mark.parametrize(
+    "recognized_word",
+    [
+        # Other digit of the plot is another plot, not a typo
+        "C L2 183",
+        "A L1 7",
+        "A L1 11",
+        # The block and the level must be recognized exactly
+        "C L7 182",
+        "B L2 182",
+        "C 12 182",
+        # One character more or less is another plot
+        "C L2 1822",
+        # The window name with a digit substitution or of another level
+        "C L2 999 WC0216",
+        "C L1 999 WC0214",
+    ],
+)
+def test_other_substitutions_do_not_match(matcher: FuzzyBlockLevelPlotMatcher, recognized_word: str) -> None:
+    folder_name, score = matcher.get_folder_name_with_score([recognized_word])
+    assert folder_name is False
+    assert score == 0.0
+
+
+def test_score_is_calculated_for_the_token(matcher: FuzzyBlockLevelPlotMatcher) -> None:
+    # One confusion in the plot of 3 characters
+    assert matcher.get_folder_name_with_score(["C L2 I82"]) == ("C_L2_Plot_182", pytest.approx(1 - 0.25 / 3))
+    # Two confusions in the plot of 2 characters are below min_score
+    assert matcher.get_folder_name_with_score(["C L2 IB"])[0] is False
+
+
+def test_exact_match_has_score_1(matcher: FuzzyBlockLevelPlotMatcher) -> None:
+    assert matcher.get_folder_name_with_score(["Time", "C L2 18"]) == ("C_L2_Plot_18", 1.0)
@@ -0,0 +1,47 @@
+"""Tests of the matcher with the index of keys against the baseline search over the dictionary"""
+
+import pytest
+
+from helpers.matcher import BlockLevelPlotMatcher
+from main import get_folder_name_from_dict_block_level_plot
+
+DICT_BLOCK_LEVEL_PLOT: dict[str, tuple[str, ...]] = {
+    "A_L1_Plot_1": ("WA0101", "WA0102"),
+    "A_L1_Plot_10": ("WA0110",),
+    "C_L2_Plot_182": ("CV-05-60", "WC0218", "WC0219", "EDC0201"),
+    "C_L2_Plot_18": ("WC0214",),
+    "D_L3_Plot_7": (),
+    "E_L10_Plot_305": ("WE1005", "EDE1001"),
+}
+
+
+@pytest.mark.parametrize(
+    "recognized_text_list",
+    [
+        ["C L2 182", "Time", "Mon, 24/03/2025 16:04"],
+        ["c l2 182"],
+        ["C L2 182 wC0214"],
+        ["C L2 WC0218"],
+        ["Time", "A L1 10", "A L1 1"],
+        ["A L1 1", "C L2 182"],
+        ["C L2 18", "A L1 1"],
+        ["D L3 7"],
+        ["E L10 305"],
+        ["E L10 Plot 305"],
+        ["WC0219"],
+        ["Address", "265 Burlington Road, New"],
+        [""],
+        [],
+    ],
+)
+def test_same_folder_name_as_baseline(recognized_text_list: list[str], capsys: pytest.CaptureFixture[str]) -> None:
+    matcher = BlockLevelPlotMatcher(DICT_BLOCK_LEVEL_PLOT)
+    assert matcher.get_folder_name(recognized_text_list) == get_folder_name_from_dict_block_level_plot(
+        DICT_BLOCK_LEVEL_PLOT, recognized_text_list
+    )
+
+
+def test_first_key_of_dictionary_wins() -> None:
+    matcher = BlockLevelPlotMatcher(DICT_BLOCK_LEVEL_PLOT)
+    assert matcher.get_folder_name(["C L2 18", "A L1 1"]) == "A_L1_Plot_1"
+    assert matcher.get_folder_name(["D L3 7"]) is False
@@ -0,0 +1,63 @@
+"""Tests of the search of byte-identical files by size, partial hash and full hash"""
+
+from pathlib import Path
+
+import pytest
+
+import helpers.remove_duplicates as remove_duplicates
+from helpers.remove_duplicates import PARTIAL_HASH_BLOCK_SIZE, find_duplicate_files, remove_duplicate_files_by_content
+
+# Larger than the first and the last blocks of the partial hash together
+FILE_SIZE: int = 3 * PARTIAL_HASH_BLOCK_SIZE
+
+
+def count_hashed_paths(monkeypatch: pytest.MonkeyPatch, name: str) -> list[str]:
+    hashed_names: list[str] = []
+    function = getattr(remove_duplicates, name)
+
+    def counted(path_to_file: Path) -> str:
+        hashed_names.append(path_to_file.name)
+        return function(path_to_file)
+
+    monkeypatch.setattr(remove_duplicates, name, counted)
+    return hashed_names
+
+
+def get_content(middle: bytes = b"m", first: bytes = b"f") -> bytes:
+    return first * PARTIAL_HASH_BLOCK_SIZE + middle * PARTIAL_HASH_BLOCK_SIZE + b"l" * PARTIAL_HASH_BLOCK_SIZE
+
+
+def test_files_of_unique_size_are_not_hashed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "a.jpg").write_bytes(get_content())
+    (tmp_path / "b.jpg").write_bytes(get_content() + b"x")
+    partial_hashed = count_hashed_paths(monkeypatch, "get_partial_file_hash")
+    assert find_duplicate_files(tmp_path) == []
+    assert partial_hashed == []
+
+
+def test_different_partial_hash_skips_full_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "a.jpg").write_bytes(get_content(first=b"f"))
+    (tmp_path / "b.jpg").write_bytes(get_content(first=b"g"))
+    partial_hashed = count_hashed_paths(monkeypatch, "get_partial_file_hash")
+    full_hashed = count_hashed_paths(monkeypatch, "get_full_file_hash")
+    assert find_duplicate_files(tmp_path) == []
+    assert sorted(partial_hashed) == ["a.jpg", "b.jpg"]
+    assert full_hashed == []
+
+
+def test_full_hash_separates_files_differing_in_the_middle(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "a.jpg").write_bytes(get_content(middle=b"m"))
+    (tmp_path / "b.jpg").write_bytes(get_content(middle=b"n"))
+    (tmp_path / "c - Copy.jpg").write_bytes(get_content(middle=b"m"))
+    full_hashed = count_hashed_paths(monkeypatch, "get_full_file_hash")
+    assert find_duplicate_files(tmp_path) == [[tmp_path / "a.jpg", tmp_path / "c - Copy.jpg"]]
+    assert sorted(full_hashed) == ["a.jpg", "b.jpg", "c - Copy.jpg"]
+
+
+def test_copy_is_removed_and_original_is_kept(tmp_path: Path) -> None:
+    (tmp_path / "photo_1 - Copy.jpg").write_bytes(get_content())
+    (tmp_path / "photo_17.jpg").write_bytes(get_content())
+    remove_duplicate_files_by_content(tmp_path, dry_run=True)
+    assert len(list(tmp_path.iterdir())) == 2
+    remove_duplicate_files_by_content(tmp_path)
+    assert [path.name for path in tmp_path.iterdir()] == ["photo_17.jpg"]
@@ -0,0 +1,71 @@
+"""Tests of the resume of an interrupted run from the journal of statuses of images"""
+
+from pathlib import Path
+
+from helpers.run_journal import (
+    STATUS_FAILED,
+    STATUS_MATCHED,
+    STATUS_MOVED,
+    STATUS_RECOGNIZED,
+    STATUS_STARTED,
+    RunJournal,
+)
+
+FILE_KEY: str = "AADC5918.JPG:2841934:1742832240000000000"
+RECOGNIZED_TEXT: list[str] = ["C L2 182 wC0214", "Time"]
+
+
+def test_restart_reuses_text_recognized_with_same_parameters(tmp_path: Path) -> None:
+    path_to_journal: Path = tmp_path / "run.jsonl"
+    journal = RunJournal(path_to_journal)
+    journal.add(FILE_KEY, STATUS_STARTED)
+    journal.add(FILE_KEY, STATUS_RECOGNIZED, recognized_text=RECOGNIZED_TEXT, parameters_hash="p1")
+
+    restarted = RunJournal(path_to_journal)
+    assert restarted.get_skip_reason(FILE_KEY) is None
+    assert restarted.get_recognized_text_list(FILE_KEY, "p1") == RECOGNIZED_TEXT
+    assert restarted.get_recognized_text_list(FILE_KEY, "p2") is None
+    assert restarted.get_recognized_text_list("OTHER.JPG:1:1", "p1") is None
+
+
+def test_matched_image_is_matched_again_and_moved_image_is_skipped(tmp_path: Path) -> None:
+    path_to_journal: Path = tmp_path / "run.jsonl"
+    journal = RunJournal(path_to_journal)
+    journal.add(FILE_KEY, STATUS_RECOGNIZED, recognized_text=RECOGNIZED_TEXT, parameters_hash="p1")
+    journal.add(FILE_KEY, STATUS_MATCHED, folder_name="C_L2_Plot_182")
+    assert RunJournal(path_to_journal).get_skip_reason(FILE_KEY) is None
+    assert RunJournal(path_to_journal).get_recognized_text_list(FILE_KEY, "p1") == RECOGNIZED_TEXT
+
+    journal.add(FILE_KEY, STATUS_MOVED, folder_name="C_L2_Plot_182")
+    assert RunJournal(path_to_journal).get_skip_reason(FILE_KEY) == "moved to C_L2_Plot_182"
+
+
+def test_failed_image_is_skipped(tmp_path: Path) -> None:
+    path_to_journal: Path = tmp_path / "run.jsonl"
+    journal = RunJournal(path_to_journal)
+    journal.add(FILE_KEY, STATUS_STARTED)
+    journal.add(FILE_KEY, STATUS_FAILED, error="Image can not be read")
+    assert RunJournal(path_to_journal).get_skip_reason(FILE_KEY) == "failed: Image can not be read"
+
+
+def test_image_interrupted_max_attempts_times_is_skipped(tmp_path: Path) -> None:
+    path_to_journal: Path = tmp_path / "run.jsonl"
+    # The run crashed while the image was recognized
+    RunJournal(path_to_journal).add(FILE_KEY, STATUS_STARTED)
+    restarted = RunJournal(path_to_journal)
+    assert restarted.get_skip_reason(FILE_KEY) is None
+    restarted.add(FILE_KEY, STATUS_STARTED)
+    assert RunJournal(path_to_journal).get_skip_reason(FILE_KEY) == "recognition was interrupted 2 times"
+
+
+def test_broken_last_line_is_ignored(tmp_path: Path) -> None:
+    path_to_journal: Path = tmp_path / "run.jsonl"
+    RunJournal(path_to_journal).add(FILE_KEY, STATUS_MOVED, folder_name="C_L2_Plot_182")
+    with open(path_to_journal, "a", encoding="utf-8") as file:
+        file.write('{"file_key": "B.JPG:1:1", "status": "rec')
+    restarted = RunJournal(path_to_journal)
+    assert restarted.get_skip_reason(FILE_KEY) == "moved to C_L2_Plot_182"
+    assert restarted.get_skip_reason("B.JPG:1:1") is None
+    # The status after the broken line is read by the next restart
+    restarted.add("B.JPG:1:1", STATUS_FAILED, error="Image can not be read")
+    assert RunJournal(path_to_journal).get_skip_reason("B.JPG:1:1") == "failed: Image can not be read"
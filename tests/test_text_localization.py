@@ -0,0 +1,55 @@
+"""Tests of the localization of the stamp lines on the region of interest"""
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from helpers.text_localization import get_binary_text, get_text_line_bands, get_text_line_strips
+
+STAMP_LINES: list[str] = ["C L2 182 wC0214", "Time", "Mon, 24/03/2025 16:04", "Company"]
+
+
+def get_stamped_region(noise_pixels_per_row: int = 0, seed: int = 0) -> NDArray[np.uint8]:
+    """
+    The function draws the stamp lines as the camera does: white text with a dark outline on a noisy gradient.
+    With noise_pixels_per_row each row gets bright specks, as the texture of a real photo.
+    """
+    generator = np.random.default_rng(seed)
+    height, width = 900, 950
+    gradient: NDArray[np.float32] = np.linspace(40, 200, width, dtype=np.float32)[None, :] + np.linspace(
+        0, 40, height, dtype=np.float32
+    )[:, None]
+    region: NDArray[np.uint8] = np.clip(gradient + generator.normal(0, 12, (height, width)), 0, 255).astype(np.uint8)
+    y: int = 400
+    for line in STAMP_LINES:
+        cv2.putText(region, line, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 7)
+        cv2.putText(region, line, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 255, 3)
+        y += 100
+    for _ in range(noise_pixels_per_row):
+        region[np.arange(height), generator.integers(0, width, height)] = 255
+    return region
+
+
+def test_lines_of_clean_region() -> None:
+    bands: list[tuple[int, int]] = get_text_line_bands(get_binary_text(get_stamped_region()))
+    assert len(bands) == len(STAMP_LINES)
+    assert all(end - start < 100 for start, end in bands)
+
+
+def test_noise_in_every_row_does_not_merge_lines() -> None:
+    clean_bands: list[tuple[int, int]] = get_text_line_bands(get_binary_text(get_stamped_region()))
+    noisy_bands: list[tuple[int, int]] = get_text_line_bands(
+        get_binary_text(get_stamped_region(noise_pixels_per_row=2))
+    )
+    assert len(noisy_bands) == len(clean_bands)
+    for (clean_start, clean_end), (noisy_start, noisy_end) in zip(clean_bands, noisy_bands):
+        assert abs(clean_start - noisy_start) <= 3 and abs(clean_end - noisy_end) <= 3
+    assert len(get_text_line_strips(get_stamped_region(noise_pixels_per_row=2))) == len(STAMP_LINES)
+
+
+def test_no_strips_when_lines_are_not_localized() -> None:
+    # Only texture, the rows of the whole region have strokes
+    generator = np.random.default_rng(0)
+    texture: NDArray[np.uint8] = np.where(generator.random((300, 400)) < 0.1, 255, 60).astype(np.uint8)
+    assert get_text_line_strips(texture) == []
+    assert get_text_line_strips(np.full((300, 400), 100, dtype=np.uint8)) == []
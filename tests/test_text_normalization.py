@@ -0,0 +1,41 @@
+"""Tests of the matching of the normalized batch of recognized text with the dictionary"""
+
+from helpers.fuzzy_matcher import FuzzyBlockLevelPlotMatcher
+from helpers.matcher import BlockLevelPlotMatcher
+from helpers.text_normalization import NormalizedBatch, match_batch
+
+DICT_BLOCK_LEVEL_PLOT: dict[str, tuple[str, ...]] = {
+    "A_L1_Plot_1": ("WA0101",),
+    "C_L2_Plot_182": ("WC0214", "WC0215"),
+}
+RECOGNIZED_TEXT_LISTS: list[list[str]] = [
+    ["Time", "C L2 182"],
+    ["C L2 I82"],
+    ["C L2 183"],
+    [],
+]
+
+
+def test_batch_matches_as_matcher() -> None:
+    matcher = BlockLevelPlotMatcher(DICT_BLOCK_LEVEL_PLOT)
+    folder_names, matched_lines, confidences = match_batch(NormalizedBatch(RECOGNIZED_TEXT_LISTS), matcher)
+    assert folder_names == [matcher.get_folder_name(text_list) for text_list in RECOGNIZED_TEXT_LISTS]
+    assert matched_lines == ["C L2 182", None, None, None]
+    assert confidences == [1.0, 0.0, 0.0, 0.0]
+
+
+def test_unmatched_image_has_zero_confidence() -> None:
+    matcher = FuzzyBlockLevelPlotMatcher(DICT_BLOCK_LEVEL_PLOT)
+    folder_names, matched_lines, confidences = match_batch(NormalizedBatch(RECOGNIZED_TEXT_LISTS), matcher)
+    assert folder_names == ["C_L2_Plot_182", "C_L2_Plot_182", False, False]
+    assert matched_lines == ["C L2 182", "C L2 I82", None, None]
+    assert confidences[0] == 1.0
+    assert matcher.min_score <= confidences[1] < 1.0
+    assert confidences[2:] == [0.0, 0.0]
+
+
+def test_score_below_min_score_is_not_confidence() -> None:
+    # "I82" differs from "182" by a confusable character, its score is below the strict min_score
+    matcher = FuzzyBlockLevelPlotMatcher(DICT_BLOCK_LEVEL_PLOT, min_score=0.95)
+    assert 0.0 < matcher.get_folder_name_with_score(["C L2 I82"])[1] < 0.95
+    assert match_batch(NormalizedBatch([["C L2 I82"]]), matcher) == ([False], [None], [0.0])